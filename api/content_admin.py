@@ -5,12 +5,15 @@ import os
 from dataclasses import dataclass
 from typing import Any
 
+from visa_copilot_ai.content_cache import invalidate, load_json_optional
+
 
 @dataclass(frozen=True)
 class ContentLoadResult:
     data: dict[str, Any]
     source: str  # "override" | "embedded"
     path: str
+    version: int = 0  # change à chaque rechargement du pack (cache de contenu)
 
 
 def _ensure_dir(path: str) -> None:
@@ -27,13 +30,14 @@ def get_news_override_path() -> str:
 
 def load_offices_data() -> ContentLoadResult:
     override = get_offices_override_path()
-    if override and os.path.exists(override):
-        with open(override, "r", encoding="utf-8") as f:
-            return ContentLoadResult(data=json.load(f), source="override", path=override)
+    entry = load_json_optional(override) if override else None
+    if entry is not None:
+        return ContentLoadResult(data=entry.data, source="override", path=override, version=entry.version)
 
-    from visa_copilot_ai.offices import _load_offices  # noqa: WPS450 - internal acceptable in API layer
+    from visa_copilot_ai.offices import _offices_entry  # noqa: WPS450 - internal acceptable in API layer
 
-    return ContentLoadResult(data=_load_offices(), source="embedded", path="visa_copilot_ai/resources/offices.json")
+    embedded = _offices_entry()
+    return ContentLoadResult(data=embedded.data, source="embedded", path="visa_copilot_ai/resources/offices.json", version=embedded.version)
 
 
 def save_offices_override(data: dict[str, Any]) -> str:
@@ -42,6 +46,7 @@ def save_offices_override(data: dict[str, Any]) -> str:
     with open(override, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
         f.write("\n")
+    invalidate(override)
     return override
 
 
@@ -49,19 +54,21 @@ def delete_offices_override() -> bool:
     override = get_offices_override_path()
     if override and os.path.exists(override):
         os.remove(override)
+        invalidate(override)
         return True
     return False
 
 
 def load_news_data() -> ContentLoadResult:
     override = get_news_override_path()
-    if override and os.path.exists(override):
-        with open(override, "r", encoding="utf-8") as f:
-            return ContentLoadResult(data=json.load(f), source="override", path=override)
+    entry = load_json_optional(override) if override else None
+    if entry is not None:
+        return ContentLoadResult(data=entry.data, source="override", path=override, version=entry.version)
 
-    from visa_copilot_ai.news import _load_news  # noqa: WPS450 - internal acceptable in API layer
+    from visa_copilot_ai.news import _news_entry  # noqa: WPS450 - internal acceptable in API layer
 
-    return ContentLoadResult(data=_load_news(), source="embedded", path="visa_copilot_ai/resources/news.json")
+    embedded = _news_entry()
+    return ContentLoadResult(data=embedded.data, source="embedded", path="visa_copilot_ai/resources/news.json", version=embedded.version)
 
 
 def save_news_override(data: dict[str, Any]) -> str:
@@ -70,6 +77,8 @@ def save_news_override(data: dict[str, Any]) -> str:
     with open(override, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
         f.write("\n")
+    invalidate(override)
+    _refresh_news_view()
     return override
 
 
@@ -77,10 +86,23 @@ def delete_news_override() -> bool:
     override = get_news_override_path()
     if override and os.path.exists(override):
         os.remove(override)
+        invalidate(override)
+        _refresh_news_view()
         return True
     return False
 
 
+def _refresh_news_view() -> None:
+    # Import tardif: news_view dépend de ce module.
+    from .news_view import refresh_news_view
+
+    try:
+        refresh_news_view()
+    except Exception:
+        # La vue sera reconstruite à la prochaine lecture.
+        pass
+
+
 def validate_offices_data(data: dict[str, Any]) -> dict[str, Any]:
     errors: list[str] = []
     warnings: list[str] = []
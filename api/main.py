@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, AsyncIterator, Callable, Optional
 
 import os
 
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from visa_copilot_ai.appointments import appointment_cost_to_dict, estimate_costs
 from visa_copilot_ai.cost_engine import FeeInput, compute_cost_engine, cost_engine_to_dict
@@ -17,15 +22,20 @@ from visa_copilot_ai.eligibility import (
     LanguageEvidence,
     eligibility_to_dict,
     evaluate_visa_eligibility,
+    evaluate_visa_eligibility_batch,
+    score_visa_eligibility_batch,
 )
-from visa_copilot_ai.eligibility_engine import run_visa_eligibility_engine
+from visa_copilot_ai.eligibility_engine import parse_engine_input, run_visa_eligibility_engine
 from visa_copilot_ai.form_guidance import field_guidance_to_dict, get_field_guidance
 from visa_copilot_ai.models import EmploymentStatus, FinancialProfile, TravelPurpose, UserProfile
 from visa_copilot_ai.refusal import analyze_refusal, explain_refusal, refusal_decision_support_to_dict, refusal_to_dict
 from visa_copilot_ai.security import security_verdict_to_dict, verify_official_url
 from visa_copilot_ai.travel_intelligence import travel_plan_to_dict, generate_travel_plan
 from visa_copilot_ai.catalogs import get_form_template, list_portals, load_catalog, validate_form_draft
-from visa_copilot_ai.ocr import extract_from_base64
+from visa_copilot_ai.content_cache import cache_stats
+from visa_copilot_ai.ocr import extract_from_file, ocr_result_to_dict
+from visa_copilot_ai.ocr_cache import default_cache as ocr_disk_cache
+from visa_copilot_ai.ocr_classify import guess_document_type
 from visa_copilot_ai.procedure_timeline import generate_procedure_timeline, procedure_timeline_to_dict
 from visa_copilot_ai.final_verification import final_check_to_dict, run_final_verification
 
@@ -42,22 +52,39 @@ from .content_admin import (
 )
 
 from visa_copilot_ai.offices import list_offices
-from visa_copilot_ai.news import list_news
-from visa_copilot_ai.news_ingest import ingest_news, load_sources_list
-
 from .news_ingest_admin import (
     delete_sources_override,
+    ingested_store,
     load_ingested_cache,
     load_sources,
-    save_ingested_cache,
     save_sources_override,
     validate_sources,
 )
+from .news_scheduler import NewsIngestScheduler
+from .news_view import CursorError, news_delta, news_page, news_view, news_view_stats, query_etag
 
+from .ocr_jobs import WORKER_CRASHED, BrokenProcessPool, FutureTimeoutError, OcrJob, OcrJobNotFound, OcrJobQueue, OcrQueueFull
+from .ocr_upload import SpooledUpload, UploadRejected, spool_request, spool_request_files
 from .openai_responses import call_openai_responses
+from .response_cache import ResponseCache, canonical_key, encode_json
+
+
+RESPONSE_CACHE = ResponseCache.from_env()
+OCR_JOBS = OcrJobQueue.from_env()
+NEWS_SCHEDULER = NewsIngestScheduler.from_env()
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    NEWS_SCHEDULER.start()  # sans effet si GLOBALVISA_NEWS_SCHEDULER n'est pas activé
+    try:
+        yield
+    finally:
+        NEWS_SCHEDULER.stop()
+        OCR_JOBS.shutdown()
 
 
-app = FastAPI(title="Visa Copilot AI API", version="0.1.0")
+app = FastAPI(title="Visa Copilot AI API", version="0.1.0", lifespan=_lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -68,6 +95,32 @@ app.add_middleware(
 )
 
 
+def _cached_response(
+    endpoint: str,
+    key_input: Any,
+    compute: Callable[[], dict[str, Any]],
+    *,
+    version: Any = None,
+    today_sensitive: bool = False,
+) -> dict[str, Any] | Response:
+    """
+    Cache de réponses (opt-in) pour les moteurs déterministes.
+    Clé = hash canonique de l'entrée parsée + version des règles/contenu (+ date du jour si le
+    résultat dépend de "today", ex: expiration de documents).
+    """
+
+    if not RESPONSE_CACHE.enabled:
+        return compute()
+    day = date.today().isoformat() if today_sensitive else None
+    key = canonical_key(endpoint, app.version, version, day, key_input)
+    body = RESPONSE_CACHE.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+    body = encode_json(jsonable_encoder(compute()))
+    RESPONSE_CACHE.put(key, body)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
 def _parse_profile(data: dict[str, Any]) -> UserProfile:
     fp_data = data.get("financial_profile")
     fp = None
@@ -223,6 +276,46 @@ def forms_suggest(payload: dict[str, Any]) -> dict[str, Any]:
     return {"ok": True, "form_type": form_type, "suggestions": out}
 
 
+def _ocr_sync_timeout_sec() -> float:
+    try:
+        return max(1.0, float(os.getenv("GLOBALVISA_OCR_SYNC_TIMEOUT_SEC", "30") or 30))
+    except Exception:
+        return 30.0
+
+
+def _submit_ocr_job(payload: dict[str, Any]) -> OcrJob:
+    b64 = str(payload.get("content_base64", "") or "")
+    mime = str(payload.get("mime_type", "") or payload.get("mimeType", "") or "")
+    if not b64.strip():
+        raise HTTPException(status_code=400, detail="content_base64 requis.")
+    if not mime.strip():
+        mime = "application/octet-stream"
+    fields_raw = payload.get("fields")
+    fields = [str(x) for x in fields_raw] if isinstance(fields_raw, list) else None
+    mode = str(payload.get("mode", "") or "auto")
+    try:
+        return OCR_JOBS.submit(content_base64=b64, mime_type=mime, fields=fields, mode=mode, meta={"mime_type": mime})
+    except OcrQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+def _ocr_job_to_dict(job: OcrJob) -> dict[str, Any]:
+    status = job.status
+    out: dict[str, Any] = {
+        "ok": status != "failed",
+        "job_id": job.id,
+        "status": status,
+        "submitted_at": job.submitted_at,
+        "finished_at": job.finished_at,
+    }
+    if status == "done":
+        out["result"] = ocr_result_to_dict(job.future.result())
+    elif status == "failed":
+        err = None if job.future.cancelled() else job.future.exception()
+        out["error"] = job.error or (str(err) if err is not None else "Job annulé.")
+    return out
+
+
 @app.post("/ocr/extract")
 def ocr_extract(payload: dict[str, Any]) -> dict[str, Any]:
     """
@@ -231,29 +324,173 @@ def ocr_extract(payload: dict[str, Any]) -> dict[str, Any]:
     - sortie: texte + extracted{} (champs)
 
     Note:
-    - Sur PDF texte: extraction via pypdf.
+    - Sur PDF texte: extraction via pypdf (toutes les pages jusqu'au budget; `fields` optionnel
+      pour s'arrêter dès que les champs voulus sont trouvés).
     - Sur image: tente pytesseract si disponible (sinon warnings).
+    - mode="passport": OCR limité à la MRZ (bas de page), validée par chiffres de contrôle
+      -> passport_number, surname, given_name, expires_date, nationality.
+    - Exécuté via la file OCR (pool de processus); attend au plus GLOBALVISA_OCR_SYNC_TIMEOUT_SEC.
+      Au-delà: 504 avec job_id (le résultat reste consultable via GET /ocr/jobs/{id}).
     """
-    b64 = str(payload.get("content_base64", "") or "")
-    mime = str(payload.get("mime_type", "") or payload.get("mimeType", "") or "")
-    if not b64.strip():
-        raise HTTPException(status_code=400, detail="content_base64 requis.")
-    if not mime.strip():
-        mime = "application/octet-stream"
+    job = _submit_ocr_job(payload)
+    try:
+        res = OCR_JOBS.wait(job, _ocr_sync_timeout_sec())
+    except FutureTimeoutError:
+        raise HTTPException(status_code=504, detail={"message": "OCR trop long; consulter le job.", "job_id": job.id})
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail=WORKER_CRASHED, headers={"Retry-After": "5"})
+    return ocr_result_to_dict(res)
+
+
+@app.post("/ocr/upload")
+async def ocr_upload(request: Request, mime_type: str = "", wait: bool = True, fields: str = "", mode: str = "auto") -> Any:
+    """
+    OCR sur fichier binaire (alternative à content_base64, sans +33% ni copies en mémoire):
+    - corps brut avec Content-Type du document (ou ?mime_type=), ou multipart (champ `file`)
+    - écrit en streaming sur disque (max GLOBALVISA_OCR_UPLOAD_MAX_BYTES, sinon 413)
+    - wait=false: retourne un job_id (202) à consulter via GET /ocr/jobs/{id}
+    - fields=ending_balance_usd,...: arrêt de lecture PDF dès que ces champs sont trouvés
+    - mode=passport: OCR du seul bandeau MRZ (voir /ocr/extract)
+    """
+    try:
+        up = await spool_request(request, mime_type=mime_type)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    mime = up.mime_type or "application/octet-stream"
+    try:
+        wanted = [x.strip() for x in fields.split(",") if x.strip()] or None
+        job = OCR_JOBS.submit(fn=extract_from_file, path=up.path, mime_type=mime, sha256=up.sha256, fields=wanted, mode=mode, meta={"mime_type": mime, "size": up.size})
+    except OcrQueueFull as e:
+        up.discard()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    job.future.add_done_callback(up.discard)
+    if not wait:
+        return Response(content=encode_json({"ok": True, "job_id": job.id, "status": job.status}), status_code=202, media_type="application/json")
+    try:
+        res = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout=_ocr_sync_timeout_sec())
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail={"message": "OCR trop long; consulter le job.", "job_id": job.id})
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail=WORKER_CRASHED, headers={"Retry-After": "5"})
+    return ocr_result_to_dict(res)
+
+
+def _batch_line(index: int, up: SpooledUpload, job: OcrJob) -> dict[str, Any]:
+    name = os.path.basename(up.filename or "") or f"file_{index}"
+    out: dict[str, Any] = {"index": index, "filename": name, "job_id": job.id}
+    fut = job.future
+    err = None if fut.cancelled() else fut.exception()
+    if fut.cancelled() or err is not None:
+        out.update({"ok": False, "error": job.error or (str(err) if err is not None else "Job annulé.")})
+        return out
+    res = fut.result()
+    dtype, conf = guess_document_type(filename=name, text=res.text, extracted=res.extracted)
+    out.update(
+        {
+            "ok": bool(res.ok),
+            "doc_type": dtype.value,
+            "doc_type_confidence": conf,
+            # Directement réutilisable dans payload["documents"] (dossier/verify, final/verify, ...).
+            "document": {"doc_id": f"doc_{index}", "doc_type": dtype.value, "filename": name, "extracted": dict(res.extracted)},
+            "ocr": ocr_result_to_dict(res),
+        }
+    )
+    return out
 
-    res = extract_from_base64(content_base64=b64, mime_type=mime)
-    return {
-        "ok": bool(res.ok),
-        "engine": res.engine,
-        "took_ms": int(res.took_ms),
-        "warnings": list(res.warnings),
-        "text": res.text,
-        "extracted": dict(res.extracted),
-    }
+
+@app.post("/ocr/extract/batch")
+async def ocr_extract_batch(request: Request) -> Any:
+    """
+    OCR d'un dossier complet en une requête:
+    - multipart (plusieurs champs fichier) ou archive zip (multipart ou corps brut application/zip)
+    - max GLOBALVISA_OCR_BATCH_MAX_FILES fichiers / GLOBALVISA_OCR_BATCH_MAX_BYTES octets (sinon 413)
+    - fichiers traités en parallèle sur la file OCR; réponse NDJSON, une ligne par fichier
+      dans l'ordre de fin (champ `index` = position dans le lot), puis {"done": true, ...}
+    - chaque ligne porte un doc_type deviné et `document` au format attendu par `documents`
+    """
+    try:
+        files = await spool_request_files(request)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    timeout = _ocr_sync_timeout_sec()
+
+    async def _lines() -> Any:
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        queue = list(enumerate(files))
+        inflight: dict[asyncio.Future[Any], tuple[int, SpooledUpload, OcrJob]] = {}
+        count = 0
+        try:
+            while queue or inflight:
+                # Soumettre tant que la file OCR accepte; sinon attendre qu'un job se libère.
+                while queue:
+                    i, up = queue[0]
+                    hint, _ = guess_document_type(filename=up.filename)
+                    mode = "passport" if hint == DocumentType.PASSPORT else "auto"
+                    mime = up.mime_type or "application/octet-stream"
+                    try:
+                        job = OCR_JOBS.submit(fn=extract_from_file, path=up.path, mime_type=mime, sha256=up.sha256, mode=mode, meta={"mime_type": mime, "size": up.size, "batch_index": i})
+                    except OcrQueueFull:
+                        break
+                    queue.pop(0)
+                    job.future.add_done_callback(up.discard)
+                    inflight[asyncio.wrap_future(job.future)] = (i, up, job)
+                # Délai global du lot (pas par attente): au-delà, tout ce qui reste est rendu en erreur.
+                remaining = timeout - (loop.time() - t0)
+                if remaining <= 0:
+                    # Les jobs lancés continuent, consultables via GET /ocr/jobs/{id}.
+                    for i, up, job in sorted(inflight.values(), key=lambda x: x[0]):
+                        yield encode_json({"index": i, "filename": os.path.basename(up.filename or ""), "ok": False, "error": "OCR trop long; consulter le job.", "job_id": job.id}) + b"\n"
+                        count += 1
+                    inflight.clear()
+                    for i, up in queue:
+                        yield encode_json({"index": i, "filename": os.path.basename(up.filename or ""), "ok": False, "error": "File OCR pleine."}) + b"\n"
+                        count += 1
+                    break
+                if not inflight:
+                    # File saturée par d'autres requêtes: réveil à la fin d'un de leurs jobs.
+                    capacity = asyncio.wrap_future(OCR_JOBS.when_capacity())
+                    try:
+                        await asyncio.wait_for(capacity, timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                done, _ = await asyncio.wait(list(inflight), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for fut in sorted(done, key=lambda f: inflight[f][0]):
+                    i, up, job = inflight.pop(fut)
+                    yield encode_json(_batch_line(i, up, job)) + b"\n"
+                    count += 1
+            took_ms = int((loop.time() - t0) * 1000)
+            yield encode_json({"done": True, "count": count, "took_ms": took_ms}) + b"\n"
+        finally:
+            for _, up in queue:
+                up.discard()
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/ocr/jobs", status_code=202)
+def ocr_job_submit(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    OCR asynchrone: même entrée que /ocr/extract, retourne immédiatement un job_id.
+    429 si la file est pleine (GLOBALVISA_OCR_QUEUE_DEPTH).
+    """
+    job = _submit_ocr_job(payload)
+    return {"ok": True, "job_id": job.id, "status": job.status}
+
+
+@app.get("/ocr/jobs/{job_id}")
+def ocr_job_get(job_id: str) -> dict[str, Any]:
+    try:
+        job = OCR_JOBS.get(job_id)
+    except OcrJobNotFound:
+        raise HTTPException(status_code=404, detail="Job OCR introuvable (ou expiré).")
+    return _ocr_job_to_dict(job)
 
 
-@app.post("/procedure/timeline")
-def procedure_timeline(payload: dict[str, Any]) -> dict[str, Any]:
+@app.post("/procedure/timeline", response_model=None)
+def procedure_timeline(payload: dict[str, Any]) -> dict[str, Any] | Response:
     """
     Génère une timeline de procédure visa dynamique, basée sur:
     - profil + destination + visa_type
@@ -278,25 +515,29 @@ def procedure_timeline(payload: dict[str, Any]) -> dict[str, Any]:
     signals = payload.get("signals") if isinstance(payload.get("signals"), dict) else {}
     manual_completed = payload.get("manual_completed_step_ids") if isinstance(payload.get("manual_completed_step_ids"), list) else []
 
-    out = generate_procedure_timeline(
-        profile=profile,
-        destination_region=destination_region,
-        visa_type=visa_type,
-        document_types_present=doc_types_present,
-        dossier_ready=bool(signals.get("dossier_ready", False)),
-        travel_plan_ready=bool(signals.get("travel_plan_ready", False)),
-        costs_ready=bool(signals.get("costs_ready", False)),
-        appointment_ready=bool(signals.get("appointment_ready", False)),
-        submission_started=bool(signals.get("submission_started", False)),
-        manual_completed_step_ids=[str(x) for x in manual_completed],
-    )
-    resp = procedure_timeline_to_dict(out)
-    resp["ok"] = True
-    return resp
+    args: dict[str, Any] = {
+        "profile": profile,
+        "destination_region": destination_region,
+        "visa_type": visa_type,
+        "document_types_present": doc_types_present,
+        "dossier_ready": bool(signals.get("dossier_ready", False)),
+        "travel_plan_ready": bool(signals.get("travel_plan_ready", False)),
+        "costs_ready": bool(signals.get("costs_ready", False)),
+        "appointment_ready": bool(signals.get("appointment_ready", False)),
+        "submission_started": bool(signals.get("submission_started", False)),
+        "manual_completed_step_ids": [str(x) for x in manual_completed],
+    }
+
+    def compute() -> dict[str, Any]:
+        resp = procedure_timeline_to_dict(generate_procedure_timeline(**args))
+        resp["ok"] = True
+        return resp
+
+    return _cached_response("procedure_timeline", args, compute)
 
 
-@app.post("/final-check")
-def final_check(payload: dict[str, Any]) -> dict[str, Any]:
+@app.post("/final-check", response_model=None)
+def final_check(payload: dict[str, Any]) -> dict[str, Any] | Response:
     """
     Vérification finale avant soumission:
     - agrège: dossier (documents/cohérence), itinéraire, coûts, timeline
@@ -316,25 +557,29 @@ def final_check(payload: dict[str, Any]) -> dict[str, Any]:
     timeline_signals = payload.get("timeline_signals") if isinstance(payload.get("timeline_signals"), dict) else None
     completed = payload.get("completed_finding_ids") if isinstance(payload.get("completed_finding_ids"), list) else []
 
-    out = run_final_verification(
-        profile=profile,
-        destination_region=destination_region,
-        visa_type=visa_type,
-        documents=docs,
-        travel_signals=travel_signals,
-        cost_signals=cost_signals,
-        timeline_signals=timeline_signals,
-        completed_finding_ids=[str(x) for x in completed],
-    )
-    resp = final_check_to_dict(out)
-    resp["ok"] = True
-    return resp
+    args: dict[str, Any] = {
+        "profile": profile,
+        "destination_region": destination_region,
+        "visa_type": visa_type,
+        "documents": docs,
+        "travel_signals": travel_signals,
+        "cost_signals": cost_signals,
+        "timeline_signals": timeline_signals,
+        "completed_finding_ids": [str(x) for x in completed],
+    }
 
-@app.post("/diagnose")
-def diagnose(payload: dict[str, Any]) -> dict[str, Any]:
+    def compute() -> dict[str, Any]:
+        resp = final_check_to_dict(run_final_verification(**args))
+        resp["ok"] = True
+        return resp
+
+    # Dépend de la date du jour (expiration passeport, ancienneté des relevés...).
+    return _cached_response("final_check", args, compute, today_sensitive=True)
+
+@app.post("/diagnose", response_model=None)
+def diagnose(payload: dict[str, Any]) -> dict[str, Any] | Response:
     profile = _parse_profile(payload.get("profile") or payload)
-    result = run_visa_diagnostic(profile)
-    return diagnostic_to_dict(result)
+    return _cached_response("diagnose", profile, lambda: diagnostic_to_dict(run_visa_diagnostic(profile)))
 
 
 @app.post("/verify-url")
@@ -345,8 +590,8 @@ def verify_url(payload: dict[str, Any]) -> dict[str, Any]:
     return security_verdict_to_dict(verdict)
 
 
-@app.post("/verify-dossier")
-def verify_dossier_endpoint(payload: dict[str, Any]) -> dict[str, Any]:
+@app.post("/verify-dossier", response_model=None)
+def verify_dossier_endpoint(payload: dict[str, Any]) -> dict[str, Any] | Response:
     profile_raw = payload.get("profile")
     if not isinstance(profile_raw, dict):
         raise ValueError("profile doit être un objet.")
@@ -354,8 +599,12 @@ def verify_dossier_endpoint(payload: dict[str, Any]) -> dict[str, Any]:
     visa_type = str(payload.get("visa_type", "") or "")
     destination_region = str(payload.get("destination_region", "") or "")
     profile = _parse_profile(profile_raw)
-    result = verify_dossier(profile, docs, visa_type=visa_type, destination_region=destination_region)
-    return dossier_to_dict(result)
+    return _cached_response(
+        "verify_dossier",
+        [profile, docs, visa_type, destination_region],
+        lambda: dossier_to_dict(verify_dossier(profile, docs, visa_type=visa_type, destination_region=destination_region)),
+        today_sensitive=True,
+    )
 
 
 @app.post("/plan-trip")
@@ -439,8 +688,8 @@ def estimate_costs_endpoint(payload: dict[str, Any]) -> dict[str, Any]:
     return appointment_cost_to_dict(result)
 
 
-@app.post("/estimate-costs/engine")
-def estimate_costs_engine_endpoint(payload: dict[str, Any]) -> dict[str, Any]:
+@app.post("/estimate-costs/engine", response_model=None)
+def estimate_costs_engine_endpoint(payload: dict[str, Any]) -> dict[str, Any] | Response:
     """
     Cost Engine (frais visa):
     - accepte une saisie partielle (montants inconnus => total provisoire)
@@ -504,21 +753,25 @@ def estimate_costs_engine_endpoint(payload: dict[str, Any]) -> dict[str, Any]:
                     notes=list(x.get("notes") or []),
                 )
 
-    result = compute_cost_engine(
-        destination_region=str(payload.get("destination_region", "") or ""),
-        visa_type=str(payload.get("visa_type", "") or ""),
-        currency=str(payload.get("currency", "USD") or "USD"),
-        fees=fees,
-    )
-    out = cost_engine_to_dict(result)
-    out["disclaimer"] = "Estimation: les frais évoluent. Vérifiez toujours la source officielle avant paiement."
-    out["final_user_prompt"] = (
-        "Souhaitez-vous que je :\n"
-        "1) Sauvegarde cette estimation de coûts dans votre timeline visa ?\n"
-        "2) Configure des rappels pour les paiements à venir ?\n"
-        "3) Ajoute un rappel pour vérifier les mises à jour des frais officiels ?"
-    )
-    return out
+    args: dict[str, Any] = {
+        "destination_region": str(payload.get("destination_region", "") or ""),
+        "visa_type": str(payload.get("visa_type", "") or ""),
+        "currency": str(payload.get("currency", "USD") or "USD"),
+        "fees": fees,
+    }
+
+    def compute() -> dict[str, Any]:
+        out = cost_engine_to_dict(compute_cost_engine(**args))
+        out["disclaimer"] = "Estimation: les frais évoluent. Vérifiez toujours la source officielle avant paiement."
+        out["final_user_prompt"] = (
+            "Souhaitez-vous que je :\n"
+            "1) Sauvegarde cette estimation de coûts dans votre timeline visa ?\n"
+            "2) Configure des rappels pour les paiements à venir ?\n"
+            "3) Ajoute un rappel pour vérifier les mises à jour des frais officiels ?"
+        )
+        return out
+
+    return _cached_response("estimate_costs_engine", args, compute)
 
 
 @app.post("/guide-field")
@@ -684,30 +937,14 @@ def ai_respond(payload: dict[str, Any]) -> dict[str, Any]:
     return {"model": (model or os.getenv("OPENAI_MODEL") or "gpt-5-nano"), "text": text, "response": raw}
 
 
-@app.post("/eligibility/proposals")
-def eligibility_proposals(payload: dict[str, Any]) -> dict[str, Any]:
-    """
-    Module "Voir les propositions de visa auxquelles je suis éligible".
-
-    Entrée attendue:
-    {
-      "country": "canada",
-      "userProfile": {...}
-    }
-    """
-
-    country = str(payload.get("country", "") or "").strip() or str(payload.get("destination_country", "") or "").strip()
-    up = payload.get("userProfile") or payload.get("profile") or {}
-    if not isinstance(up, dict):
-        raise ValueError("userProfile doit être un objet.")
-
+def _parse_eligibility_profile(up: dict[str, Any], country: str) -> EligibilityUserProfile:
     language_raw = up.get("language") if isinstance(up.get("language"), dict) else {}
     lang = LanguageEvidence(
         band=language_raw.get("band") if language_raw else up.get("language_band"),
         exam=str(language_raw.get("exam") if language_raw else (up.get("language_exam") or "self")),
     )
 
-    user = EligibilityUserProfile(
+    return EligibilityUserProfile(
         age=int(up.get("age", 0) or 0),
         nationality=str(up.get("nationality", "") or ""),
         destination_country=country or str(up.get("destination_country", "") or ""),
@@ -722,38 +959,141 @@ def eligibility_proposals(payload: dict[str, Any]) -> dict[str, Any]:
         prior_visa_refusals=(int(up["prior_visa_refusals"]) if "prior_visa_refusals" in up and up["prior_visa_refusals"] is not None else None),
     )
 
+
+@app.post("/eligibility/proposals", response_model=None)
+def eligibility_proposals(payload: dict[str, Any]) -> dict[str, Any] | Response:
+    """
+    Module "Voir les propositions de visa auxquelles je suis éligible".
+
+    Entrée attendue:
+    {
+      "country": "canada",
+      "userProfile": {...}
+    }
+    """
+
+    country = str(payload.get("country", "") or "").strip() or str(payload.get("destination_country", "") or "").strip()
+    up = payload.get("userProfile") or payload.get("profile") or {}
+    if not isinstance(up, dict):
+        raise ValueError("userProfile doit être un objet.")
+
+    user = _parse_eligibility_profile(up, country)
+
     # IA "rules reasoner" : le scoring est piloté par des règles configurables,
     # et enrichi d’un raisonnement explicable (forces/faiblesses) basé sur ces règles.
     rules_pack = load_rules()
-    results = evaluate_visa_eligibility(user, country=country or "default", rules=rules_pack.rules)
+
+    def compute() -> dict[str, Any]:
+        results = evaluate_visa_eligibility(user, country=country or "default", rules=rules_pack.rules)
+        return {
+            "country": country or "default",
+            "engine": {
+                "type": "ai_rules_reasoner",
+                "rules_source": rules_pack.source,
+                "rules_path": rules_pack.path,
+            },
+            "disclaimer": "Scores heuristiques (IA explicable): ils n’impliquent pas une décision. Vérifiez toujours les règles officielles.",
+            "results": [eligibility_to_dict(r) for r in results],
+        }
+
+    return _cached_response(
+        "eligibility_proposals",
+        [user, country],
+        compute,
+        version=[rules_pack.source, rules_pack.path, rules_pack.version],
+    )
+
+
+def _eligibility_batch_max() -> int:
+    try:
+        return max(1, int(os.getenv("GLOBALVISA_ELIGIBILITY_BATCH_MAX", "100000") or 100000))
+    except Exception:
+        return 100000
+
+
+@app.post("/eligibility/proposals/batch")
+def eligibility_proposals_batch(payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Version cohorte de /eligibility/proposals (re-scoring de leads).
+
+    Entrée attendue:
+    {
+      "country": "canada",
+      "profiles": [{...userProfile...}, ...],
+      "detail": "full" | "scores"
+    }
+    - full: mêmes résultats que /eligibility/proposals, profil par profil
+    - scores: matrice compacte profils x types de visa
+    """
+
+    country = str(payload.get("country", "") or "").strip() or str(payload.get("destination_country", "") or "").strip()
+    raw_profiles = payload.get("profiles") if isinstance(payload.get("profiles"), list) else payload.get("userProfiles")
+    if not isinstance(raw_profiles, list):
+        raise HTTPException(status_code=400, detail="profiles requis (liste).")
+    if len(raw_profiles) > _eligibility_batch_max():
+        raise HTTPException(status_code=400, detail=f"Trop de profils (max {_eligibility_batch_max()}).")
+    detail = str(payload.get("detail", "full") or "full").strip().lower()
+    if detail not in {"full", "scores"}:
+        raise HTTPException(status_code=400, detail="detail doit être 'full' ou 'scores'.")
+
+    users: list[EligibilityUserProfile] = []
+    for i, up in enumerate(raw_profiles):
+        if not isinstance(up, dict):
+            raise ValueError(f"profiles[{i}] doit être un objet.")
+        users.append(_parse_eligibility_profile(up, country))
+
+    rules_pack = load_rules()
+    engine = {
+        "type": "ai_rules_reasoner",
+        "rules_source": rules_pack.source,
+        "rules_path": rules_pack.path,
+    }
+    disclaimer = "Scores heuristiques (IA explicable): ils n’impliquent pas une décision. Vérifiez toujours les règles officielles."
+
+    if detail == "scores":
+        batch = score_visa_eligibility_batch(users, country=country or "default", rules=rules_pack.rules)
+        return {
+            "country": country or "default",
+            "engine": {**engine, "batch_engine": batch.engine},
+            "disclaimer": disclaimer,
+            "visa_types": batch.visa_types,
+            "scores": batch.scores,
+        }
+
+    results = evaluate_visa_eligibility_batch(users, country=country or "default", rules=rules_pack.rules)
     return {
         "country": country or "default",
-        "engine": {
-            "type": "ai_rules_reasoner",
-            "rules_source": rules_pack.source,
-            "rules_path": rules_pack.path,
-        },
-        "disclaimer": "Scores heuristiques (IA explicable): ils n’impliquent pas une décision. Vérifiez toujours les règles officielles.",
-        "results": [eligibility_to_dict(r) for r in results],
+        "engine": engine,
+        "disclaimer": disclaimer,
+        "results": [[eligibility_to_dict(r) for r in rs] for rs in results],
     }
 
 
-@app.post("/eligibility/engine")
-def eligibility_engine(payload: dict[str, Any]) -> dict[str, Any]:
+@app.post("/eligibility/engine", response_model=None)
+def eligibility_engine(payload: dict[str, Any]) -> dict[str, Any] | Response:
     """
     Visa Eligibility Engine (decision-support):
     - Entrée flexible (champs requis + optionnels).
     - Sortie structurée (Top options / Pathways / Score / Recos).
     """
     rules_pack = load_rules()
-    out = run_visa_eligibility_engine(payload, rules=rules_pack.rules)
-    # enrich with engine meta
-    out["engine"] = {
-        "type": "visa_eligibility_engine",
-        "rules_source": rules_pack.source,
-        "rules_path": rules_pack.path,
-    }
-    return out
+
+    def compute() -> dict[str, Any]:
+        out = run_visa_eligibility_engine(payload, rules=rules_pack.rules)
+        # enrich with engine meta
+        out["engine"] = {
+            "type": "visa_eligibility_engine",
+            "rules_source": rules_pack.source,
+            "rules_path": rules_pack.path,
+        }
+        return out
+
+    return _cached_response(
+        "eligibility_engine",
+        [parse_engine_input(payload), payload.get("top_k")],
+        compute,
+        version=[rules_pack.source, rules_pack.path, rules_pack.version],
+    )
 
 
 @app.get("/offices")
@@ -789,38 +1129,51 @@ def offices(
     }
 
 
-@app.get("/news")
+@app.get("/news", response_model=None)
 def news(
+    response: Response,
     country: Optional[str] = None,
     category: Optional[str] = None,
     tag: Optional[str] = None,
     q: Optional[str] = None,
     limit: int = 30,
-) -> dict[str, Any]:
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    if_none_match: str | None = Header(default=None),
+) -> dict[str, Any] | Response:
     """
     Actualités Visa & Lois:
     - feed par pays + catégories (visa_news/law_change) + tags
+    - servi depuis la vue fusionnée (pack + cache d'ingestion), reconstruite seulement quand une source change
+    - q: recherche plein texte FR/EN (BM25 + fraîcheur + fiabilité), résultats par pertinence
+    - pagination: `next_cursor` -> `cursor=` (curseurs opaques, liés aux filtres)
+    - synchronisation: `sync` -> `since=` renvoie seulement les items ajoutés/modifiés et les ids à retirer
+      (`reset`: true = repartir de la liste complète)
+    - ETag par requête: If-None-Match identique -> 304 sans corps
     """
 
-    pack = load_news_data()
-    cache = load_ingested_cache()
-    merged_items = []
-    if isinstance(pack.data.get("items"), list):
-        merged_items.extend(pack.data["items"])
-    if isinstance(cache.data.get("items"), list):
-        merged_items.extend(cache.data["items"])
-    items = list_news(
-        country=country,
-        category=category,
-        tag=tag,
-        q=q,
-        limit=limit,
-        data={"items": merged_items},
-    )
+    view = news_view()
+    params = {"country": country, "category": category, "tag": tag, "q": q, "limit": limit, "cursor": cursor, "since": since}
+    etag = query_etag(view, params)
+    if if_none_match and etag in [x.strip() for x in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        if since:
+            if (q or "").strip():
+                raise CursorError("since et q ne se combinent pas.")
+            page = news_delta(view, since=since, country=country, category=category, tag=tag, limit=limit)
+        else:
+            page = news_page(view, country=country, category=category, tag=tag, q=q, limit=limit, cursor=cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response.headers["ETag"] = etag
     return {
-        "source": {"type": "content_pack", "source": pack.source, "path": pack.path},
-        "ingested_cache": {"path": cache.path, "updated_at": cache.data.get("updated_at")},
-        "items": items,
+        "source": {"type": "content_pack", "source": view.pack_source, "path": view.pack_path},
+        "ingested_cache": {"path": view.cache_path, "updated_at": view.cache_updated_at},
+        "version": view.etag.strip('"'),
+        **page,
     }
 
 
@@ -832,6 +1185,12 @@ def _require_admin_key(x_admin_key: str | None) -> None:
         raise HTTPException(status_code=403, detail="Clé admin invalide.")
 
 
+@app.get("/admin/cache/stats")
+def admin_cache_stats(x_admin_key: str | None = Header(default=None)) -> dict[str, Any]:
+    _require_admin_key(x_admin_key)
+    return {"content": cache_stats(), "responses": RESPONSE_CACHE.stats(), "ocr_jobs": OCR_JOBS.stats(), "ocr_disk": ocr_disk_cache().stats(), "news_view": news_view_stats()}
+
+
 @app.get("/admin/eligibility/rules")
 def admin_get_rules(x_admin_key: str | None = Header(default=None)) -> dict[str, Any]:
     _require_admin_key(x_admin_key)
@@ -977,43 +1336,45 @@ def admin_delete_news_sources(x_admin_key: str | None = Header(default=None)) ->
 
 
 @app.get("/admin/news/ingest/status")
-def admin_news_ingest_status(x_admin_key: str | None = Header(default=None)) -> dict[str, Any]:
+def admin_news_ingest_status(run_id: str = "", x_admin_key: str | None = Header(default=None)) -> dict[str, Any]:
+    """
+    État du cache d'ingestion et du scheduler (échéances par source, runs en cours et récents, tous workers).
+    run_id=...: détail d'un run lancé par POST /admin/news/ingest/run (404 si inconnu).
+    """
     _require_admin_key(x_admin_key)
     cache = load_ingested_cache()
-    return {
+    out: dict[str, Any] = {
         "cache_path": cache.path,
         "updated_at": cache.data.get("updated_at"),
         "last_ingest": cache.data.get("last_ingest"),
         "items_count": len(cache.data.get("items") or []) if isinstance(cache.data.get("items"), list) else 0,
+        "store": ingested_store().stats(),
+        "scheduler": NEWS_SCHEDULER.status(),
     }
+    if run_id:
+        run = NEWS_SCHEDULER.get_run(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="Run d'ingestion introuvable.")
+        out["run"] = run
+    return out
 
 
-@app.post("/admin/news/ingest/run")
+@app.post("/admin/news/ingest/run", status_code=202)
 def admin_news_ingest_run(payload: dict[str, Any] | None = None, x_admin_key: str | None = Header(default=None)) -> dict[str, Any]:
+    """
+    Lance une ingestion maintenant (toutes les sources, ou `sources`: [ids]) et retourne immédiatement un run_id.
+    Le run attend la fin d'un éventuel run en cours (scheduler ou autre worker); suivi via
+    GET /admin/news/ingest/status?run_id=...
+    Sans `max_total`, la rétention configurée du store s'applique (GLOBALVISA_NEWS_RETENTION_MAX_ITEMS).
+    """
     _require_admin_key(x_admin_key)
     body = payload or {}
     max_per_source = int(body.get("max_per_source", 20) or 20)
-    max_total = int(body.get("max_total", 400) or 400)
-
-    src_pack = load_sources()
-    srcs = load_sources_list(src_pack.data)
-
-    cache = load_ingested_cache()
-    existing = cache.data.get("items") if isinstance(cache.data, dict) else []
-
-    items, meta = ingest_news(sources=srcs, existing_items=existing, max_per_source=max_per_source, max_total=max_total)
-    saved_payload = {
-        "updated_at": meta.updated_at,
-        "items": items,
-        "last_ingest": {
-            "ok": meta.ok,
-            "fetched_sources": meta.fetched_sources,
-            "new_items": meta.new_items,
-            "total_items": meta.total_items,
-            "errors": meta.errors,
-            "updated_at": meta.updated_at,
-        },
-    }
-    saved_to = save_ingested_cache(saved_payload)
-    return {"ok": meta.ok, "saved_to": saved_to, "last_ingest": saved_payload["last_ingest"], "sources": {"source": src_pack.source, "path": src_pack.path}}
+    max_total = int(body["max_total"]) if body.get("max_total") else None
+    ids = body.get("sources") if isinstance(body.get("sources"), list) else None
+    try:
+        run = NEWS_SCHEDULER.trigger(source_ids=ids, max_per_source=max_per_source, max_total=max_total)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "run_id": run.id, "status": run.status, "sources": run.sources}
 
@@ -3,7 +3,11 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
+
+from visa_copilot_ai.content_cache import invalidate, load_json_optional
+
+from .news_store import IngestedNewsStore, get_store
 
 
 @dataclass(frozen=True)
@@ -11,6 +15,7 @@ class LoadResult:
     data: dict[str, Any]
     source: str  # "override" | "embedded" | "cache"
     path: str
+    version: int = 0  # change à chaque rechargement du pack (cache de contenu)
 
 
 def get_sources_override_path() -> str:
@@ -23,13 +28,14 @@ def get_ingested_cache_path() -> str:
 
 def load_sources() -> LoadResult:
     override = get_sources_override_path()
-    if override and os.path.exists(override):
-        with open(override, "r", encoding="utf-8") as f:
-            return LoadResult(data=json.load(f), source="override", path=override)
+    entry = load_json_optional(override) if override else None
+    if entry is not None:
+        return LoadResult(data=entry.data, source="override", path=override, version=entry.version)
 
-    from visa_copilot_ai.news_ingest import _load_sources  # noqa: WPS450 - internal acceptable in API layer
+    from visa_copilot_ai.news_ingest import _sources_entry  # noqa: WPS450 - internal acceptable in API layer
 
-    return LoadResult(data=_load_sources(), source="embedded", path="visa_copilot_ai/resources/news_sources.json")
+    embedded = _sources_entry()
+    return LoadResult(data=embedded.data, source="embedded", path="visa_copilot_ai/resources/news_sources.json", version=embedded.version)
 
 
 def save_sources_override(data: dict[str, Any]) -> str:
@@ -38,6 +44,7 @@ def save_sources_override(data: dict[str, Any]) -> str:
     with open(override, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
         f.write("\n")
+    invalidate(override)
     return override
 
 
@@ -45,6 +52,7 @@ def delete_sources_override() -> bool:
     override = get_sources_override_path()
     if override and os.path.exists(override):
         os.remove(override)
+        invalidate(override)
         return True
     return False
 
@@ -78,19 +86,99 @@ def validate_sources(data: dict[str, Any]) -> dict[str, Any]:
     return {"ok": len(errors) == 0, "errors": errors, "warnings": warnings}
 
 
-def load_ingested_cache() -> LoadResult:
-    path = get_ingested_cache_path()
-    if path and os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return LoadResult(data=json.load(f), source="cache", path=path)
-    return LoadResult(data={"updated_at": None, "items": [], "last_ingest": None}, source="cache", path=path)
+def get_feed_validators_path() -> str:
+    """
+    ETag / Last-Modified / hash par source, à côté du cache d'ingestion.
+    """
 
+    explicit = os.getenv("GLOBALVISA_NEWS_FEED_VALIDATORS_PATH", "").strip()
+    if explicit:
+        return explicit
+    return os.path.splitext(get_ingested_cache_path())[0] + ".validators.json"
 
-def save_ingested_cache(payload: dict[str, Any]) -> str:
-    path = get_ingested_cache_path()
+
+def load_feed_validators() -> dict[str, dict[str, str]]:
+    path = get_feed_validators_path()
+    try:
+        entry = load_json_optional(path) if path else None
+    except Exception:
+        return {}
+    data = entry.data if entry is not None and isinstance(entry.data, dict) else {}
+    sources = data.get("sources")
+    return dict(sources) if isinstance(sources, dict) else {}
+
+
+def save_feed_validators(validators: dict[str, dict[str, str]]) -> str:
+    path = get_feed_validators_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2, sort_keys=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"sources": validators}, f, ensure_ascii=False, indent=2, sort_keys=True)
         f.write("\n")
+    os.replace(tmp, path)
+    invalidate(path)
+    return path
+
+
+def get_ingested_store_path() -> str:
+    explicit = os.getenv("GLOBALVISA_NEWS_INGESTED_STORE_PATH", "").strip()
+    if explicit:
+        return explicit
+    return os.path.splitext(get_ingested_cache_path())[0] + ".jsonl"
+
+
+def ingested_store() -> IngestedNewsStore:
+    store = get_store(get_ingested_store_path())
+    legacy = get_ingested_cache_path()
+    if not store.exists() and legacy and os.path.exists(legacy):
+        # Migration unique depuis l'ancien cache JSON (réécrit en entier à chaque ingestion).
+        with open(legacy, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if isinstance(old, dict) and not store.exists():
+            items = old.get("items") if isinstance(old.get("items"), list) else []
+            meta = {"updated_at": old.get("updated_at"), "last_ingest": old.get("last_ingest")}
+            store.sync(items, meta=meta, max_items=0, max_age_days=0)
+    return store
+
+
+def load_ingested_cache() -> LoadResult:
+    """
+    Items ingérés + `stamps` (horodatages d'écriture, suppressions) de la même version du store.
+    """
+
+    store = ingested_store()
+    while True:
+        version, items, meta = store.snapshot()
+        stamped, modified, deleted, tombstones_from = store.snapshot_stamps()
+        if stamped == version:  # sinon une écriture s'est intercalée: relire
+            break
+    data = {
+        "updated_at": meta.get("updated_at"),
+        "items": items,
+        "last_ingest": meta.get("last_ingest"),
+        "stamps": {"modified": modified, "deleted": deleted, "tombstones_from": tombstones_from},
+    }
+    return LoadResult(data=data, source="cache", path=store.path, version=version)
+
+
+def save_ingested_cache(
+    payload: dict[str, Any],
+    *,
+    max_items: Optional[int] = None,
+    max_age_days: Optional[float] = None,
+) -> str:
+    """
+    Enregistre l'état ingéré: seuls les items nouveaux / modifiés / supprimés sont ajoutés au store
+    (append-only), puis rétention (GLOBALVISA_NEWS_RETENTION_MAX_ITEMS / _DAYS par défaut).
+    """
+
+    store = ingested_store()
+    items = payload.get("items") if isinstance(payload.get("items"), list) else []
+    meta = {k: v for k, v in payload.items() if k != "items"}
+    store.sync(items, meta=meta, max_items=max_items, max_age_days=max_age_days)
+    path = store.path
+    from .content_admin import _refresh_news_view  # noqa: WPS450 - import tardif (cycle news_view)
+
+    _refresh_news_view()
     return path
 
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Iterator, Optional
+
+try:  # pragma: no cover - absent sous Windows
+    import fcntl
+except Exception:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+from visa_copilot_ai.news_ingest import ingest_news, load_sources_list
+
+from .news_ingest_admin import (
+    get_ingested_store_path,
+    load_feed_validators,
+    load_ingested_cache,
+    load_sources,
+    save_feed_validators,
+    save_ingested_cache,
+)
+
+# Historique des runs gardé dans l'état partagé (et en mémoire pour les runs locaux).
+_MAX_RUNS = 20
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").strip().split())
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "on"}
+
+
+def _env_float(name: str, default: float, minimum: float) -> float:
+    try:
+        return max(minimum, float(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """
+    - enabled: scheduler actif dans ce processus (GLOBALVISA_NEWS_SCHEDULER=1)
+    - tick_sec: fréquence à laquelle les sources échues sont cherchées
+    - interval_gov_sec / interval_default_sec: période par source (sources "government" plus fréquentes);
+      une source peut fixer la sienne avec `poll_interval_sec`
+    - jitter: fraction aléatoire (+/-) appliquée aux périodes et aux ticks (workers et sources désynchronisés)
+    """
+
+    enabled: bool = False
+    tick_sec: float = 30.0
+    interval_gov_sec: float = 900.0
+    interval_default_sec: float = 3600.0
+    jitter: float = 0.1
+    max_per_source: int = 20
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        return cls(
+            enabled=_env_bool("GLOBALVISA_NEWS_SCHEDULER", False),
+            tick_sec=_env_float("GLOBALVISA_NEWS_SCHEDULER_TICK_SEC", 30.0, 1.0),
+            interval_gov_sec=_env_float("GLOBALVISA_NEWS_INTERVAL_GOV_SEC", 900.0, 60.0),
+            interval_default_sec=_env_float("GLOBALVISA_NEWS_INTERVAL_DEFAULT_SEC", 3600.0, 60.0),
+            jitter=min(0.5, _env_float("GLOBALVISA_NEWS_SCHEDULER_JITTER", 0.1, 0.0)),
+            max_per_source=int(_env_float("GLOBALVISA_NEWS_SCHEDULER_MAX_PER_SOURCE", 20, 1)),
+        )
+
+
+def source_key(source: dict[str, Any]) -> str:
+    return _norm(source.get("id")) or _norm(source.get("feed_url"))
+
+
+def source_interval(source: dict[str, Any], config: SchedulerConfig) -> float:
+    try:
+        explicit = float(source.get("poll_interval_sec") or 0)
+    except Exception:
+        explicit = 0.0
+    if explicit > 0:
+        return max(60.0, explicit)
+    if _norm(source.get("source_type")).lower() == "government":
+        return config.interval_gov_sec
+    return config.interval_default_sec
+
+
+def run_ingestion(
+    sources: Optional[list[dict[str, Any]]] = None,
+    *,
+    max_per_source: int = 20,
+    max_total: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Une ingestion complète: flux de `sources` (défaut: toutes) fusionnés avec les items déjà ingérés, puis store.
+    Sans `max_total`, la rétention du store s'applique (GLOBALVISA_NEWS_RETENTION_MAX_ITEMS).
+    """
+
+    src_pack = load_sources()
+    srcs = sources if sources is not None else load_sources_list(src_pack.data)
+
+    cache = load_ingested_cache()
+    existing = cache.data.get("items") if isinstance(cache.data, dict) else []
+
+    # Les nouveaux items entrent toujours; la rétention du store garde ensuite les `max_total` plus récents.
+    items, meta = ingest_news(
+        sources=srcs,
+        existing_items=existing,
+        max_per_source=max_per_source,
+        max_total=len(existing or []) + (max_total or 400),
+        validators=load_feed_validators(),
+    )
+    saved_payload = {
+        "updated_at": meta.updated_at,
+        "items": items,
+        "last_ingest": {
+            "ok": meta.ok,
+            "fetched_sources": meta.fetched_sources,
+            "new_items": meta.new_items,
+            "total_items": meta.total_items,
+            "errors": meta.errors,
+            "updated_at": meta.updated_at,
+            "took_ms": meta.took_ms,
+            "bytes_transferred": meta.bytes_transferred,
+            "skipped_sources": meta.skipped_sources,
+            "duplicate_items": meta.duplicate_items,
+        },
+    }
+    saved_to = save_ingested_cache(saved_payload, max_items=max_total)
+    save_feed_validators(meta.validators)
+    return {"ok": meta.ok, "saved_to": saved_to, "last_ingest": saved_payload["last_ingest"], "sources": {"source": src_pack.source, "path": src_pack.path}}
+
+
+@dataclass
+class IngestRun:
+    id: str
+    trigger: str  # "schedule" | "admin"
+    sources: list[str]
+    queued_at: float
+    status: str = "queued"  # queued | running | done | failed
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    worker_pid: int = 0
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    done_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "trigger": self.trigger,
+            "sources": list(self.sources),
+            "queued_at": self.queued_at,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "worker_pid": self.worker_pid,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class NewsIngestScheduler:
+    """
+    Ingestion périodique des flux news dans le processus de l'API.
+
+    - Un thread par processus réveillé tous les `tick_sec` (+/- jitter); seules les sources échues sont
+      ingérées, chacune avec sa période (+/- jitter)
+    - Un seul runner à la fois, tous workers uvicorn confondus: verrou fichier (flock) à côté du store.
+      Un tick qui ne l'obtient pas passe son tour; un run admin attend son tour (deux runs concurrents
+      réécriraient le store chacun depuis leur propre lecture)
+    - Échéances par source et historique des runs dans un fichier JSON partagé (remplacé atomiquement):
+      un worker voit ce qu'un autre a ingéré et le statut est le même quel que soit le worker interrogé
+    - `trigger()` rend la main immédiatement avec un id de run (statut via `status(run_id)`)
+    """
+
+    def __init__(
+        self,
+        config: Optional[SchedulerConfig] = None,
+        *,
+        runner: Callable[..., dict[str, Any]] = run_ingestion,
+        sources_loader: Optional[Callable[[], list[dict[str, Any]]]] = None,
+        base_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.config = config or SchedulerConfig()
+        self.runner = runner
+        self.sources_loader = sources_loader or (lambda: load_sources_list(load_sources().data))
+        self._base_path = base_path
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._runs: dict[str, IngestRun] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._ticks = 0
+        self._skipped_ticks = 0
+
+    @classmethod
+    def from_env(cls) -> "NewsIngestScheduler":
+        return cls(SchedulerConfig.from_env())
+
+    # --- chemins / état partagé ---
+
+    def _base(self) -> str:
+        return os.path.splitext(self._base_path or get_ingested_store_path())[0]
+
+    @property
+    def state_path(self) -> str:
+        return self._base() + ".schedule.json"
+
+    @property
+    def lock_path(self) -> str:
+        return self._base() + ".ingest.lock"
+
+    def _read_state(self) -> dict[str, Any]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        if not isinstance(data.get("sources"), dict):
+            data["sources"] = {}
+        if not isinstance(data.get("runs"), list):
+            data["runs"] = []
+        return data
+
+    def _write_state(self, state: dict[str, Any]) -> None:
+        path = self.state_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, path)
+
+    def _record(self, state: dict[str, Any], run: IngestRun) -> None:
+        runs = [r for r in state["runs"] if isinstance(r, dict) and r.get("id") != run.id]
+        runs.append(run.to_dict())
+        state["runs"] = runs[-_MAX_RUNS:]
+
+    @contextmanager
+    def _runner_lock(self, *, blocking: bool) -> Iterator[bool]:
+        # Verrou de processus (threads) puis verrou fichier (workers); flock est libéré si le processus meurt.
+        if not self._run_lock.acquire(blocking=blocking):
+            yield False
+            return
+        try:
+            os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                    try:
+                        fcntl.flock(lock_file.fileno(), flags)
+                    except OSError:
+                        yield False
+                        return
+                try:
+                    yield True
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._run_lock.release()
+
+    # --- planification ---
+
+    def _jittered(self, seconds: float) -> float:
+        j = self.config.jitter
+        return seconds * (1.0 + self.rng.uniform(-j, j)) if j > 0 else seconds
+
+    def due_sources(self, state: dict[str, Any], sources: list[dict[str, Any]], now: float) -> list[dict[str, Any]]:
+        out = []
+        for s in sources:
+            key = source_key(s)
+            if not key or not _norm(s.get("feed_url")):
+                continue
+            entry = state["sources"].get(key)
+            try:
+                next_due = float(entry.get("next_due", 0)) if isinstance(entry, dict) else 0.0
+            except Exception:
+                next_due = 0.0
+            if next_due <= now:
+                out.append(s)
+        return out
+
+    def _schedule_next(self, state: dict[str, Any], sources: list[dict[str, Any]], now: float) -> None:
+        for s in sources:
+            key = source_key(s)
+            if key:
+                state["sources"][key] = {"last_run": now, "next_due": now + self._jittered(source_interval(s, self.config))}
+
+    def _execute(self, run: IngestRun, sources: list[dict[str, Any]], runner_kwargs: dict[str, Any]) -> None:
+        # Appelé verrou détenu.
+        now = self.clock()
+        run.status, run.started_at, run.worker_pid = "running", now, os.getpid()
+        state = self._read_state()
+        self._record(state, run)
+        self._write_state(state)
+        try:
+            final = replace(run, result=self.runner(sources, **runner_kwargs), status="done")
+        except Exception as e:
+            final = replace(run, status="failed", error=f"{type(e).__name__}: {e}")
+        final.finished_at = self.clock()
+        state = self._read_state()
+        # Échéances repoussées même en cas d'échec: pas de nouvel essai à chaque tick.
+        self._schedule_next(state, sources, now)
+        self._record(state, final)
+        self._write_state(state)
+        # Publié après l'écriture de l'état: un run "done" a déjà ses échéances visibles.
+        run.result, run.error, run.finished_at = final.result, final.error, final.finished_at
+        run.status = final.status
+
+    def _abort(self, run: IngestRun, error: str) -> None:
+        # Run interrompu hors du runner (verrou indisponible, état illisible...): jamais "running" à vie.
+        run.error, run.finished_at = error, self.clock()
+        run.status = "failed"
+        try:
+            state = self._read_state()
+            self._record(state, run)
+            self._write_state(state)
+        except Exception:
+            pass  # l'état local (get_run) suffit à ce worker
+
+    def _new_run(self, trigger: str, sources: list[dict[str, Any]]) -> IngestRun:
+        run = IngestRun(id=uuid.uuid4().hex, trigger=trigger, sources=[source_key(s) for s in sources], queued_at=self.clock())
+        with self._lock:
+            self._runs[run.id] = run
+            for old in list(self._runs)[:-_MAX_RUNS]:
+                if self._runs[old].done_event.is_set():
+                    del self._runs[old]
+        return run
+
+    def tick(self) -> Optional[IngestRun]:
+        """
+        Ingère les sources échues si aucun autre runner n'est actif; None si rien à faire ou verrou pris.
+        """
+
+        with self._lock:
+            self._ticks += 1
+        run: Optional[IngestRun] = None
+        try:
+            with self._runner_lock(blocking=False) as acquired:
+                if not acquired:
+                    with self._lock:
+                        self._skipped_ticks += 1
+                    return None
+                # Relu sous verrou: un autre worker vient peut-être d'ingérer ces sources.
+                due = self.due_sources(self._read_state(), self.sources_loader(), self.clock())
+                if not due:
+                    return None
+                run = self._new_run("schedule", due)
+                try:
+                    self._execute(run, due, {"max_per_source": self.config.max_per_source})
+                except Exception as e:
+                    self._abort(run, f"{type(e).__name__}: {e}")
+                    raise
+        finally:
+            if run is not None:
+                run.done_event.set()  # verrou libéré: le suivant peut démarrer
+        return run
+
+    def trigger(self, *, source_ids: Optional[list[str]] = None, max_per_source: int = 20, max_total: Optional[int] = None) -> IngestRun:
+        """
+        Run admin immédiat (toutes les sources, ou `source_ids`) dans un thread: retourne le run "queued".
+        Lève ValueError si un id de `source_ids` ne correspond à aucune source (rien n'est lancé).
+        """
+
+        sources = [s for s in self.sources_loader() if _norm(s.get("feed_url"))]
+        if source_ids:
+            wanted = {_norm(x) for x in source_ids}
+            unknown = sorted(wanted - {source_key(s) for s in sources})
+            if unknown:
+                raise ValueError(f"Sources inconnues (ou sans feed_url): {', '.join(unknown)}.")
+            sources = [s for s in sources if source_key(s) in wanted]
+        run = self._new_run("admin", sources)
+
+        def work() -> None:
+            try:
+                with self._runner_lock(blocking=True) as acquired:
+                    if not acquired:
+                        self._abort(run, "verrou d'ingestion indisponible")
+                        return
+                    self._execute(run, sources, {"max_per_source": max_per_source, "max_total": max_total})
+            except Exception as e:
+                self._abort(run, f"{type(e).__name__}: {e}")
+            finally:
+                run.done_event.set()
+
+        threading.Thread(target=work, name=f"news-ingest-{run.id[:8]}", daemon=True).start()
+        return run
+
+    # --- cycle de vie ---
+
+    def _loop(self) -> None:
+        # Premier tick décalé au hasard: des workers démarrés ensemble ne se disputent pas le verrou.
+        delay = self.rng.uniform(0, self.config.tick_sec)
+        while not self._stop.wait(delay):
+            try:
+                self.tick()
+            except Exception:
+                pass  # un tick raté ne doit pas arrêter le scheduler (état relu au suivant)
+            delay = self._jittered(self.config.tick_sec)
+
+    def start(self) -> bool:
+        if not self.config.enabled or (self._thread is not None and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="news-ingest-scheduler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # --- statut ---
+
+    def get_run(self, run_id: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            local = self._runs.get(run_id)
+        if local is not None:
+            return local.to_dict()
+        for r in self._read_state()["runs"]:
+            if isinstance(r, dict) and r.get("id") == run_id:
+                return r
+        return None
+
+    def status(self) -> dict[str, Any]:
+        state = self._read_state()
+        runs = {r["id"]: r for r in state["runs"] if isinstance(r, dict) and r.get("id")}
+        with self._lock:
+            for run in self._runs.values():
+                runs[run.id] = run.to_dict()
+            ticks, skipped = self._ticks, self._skipped_ticks
+        ordered = sorted(runs.values(), key=lambda r: r.get("queued_at") or 0, reverse=True)[:_MAX_RUNS]
+        try:
+            sources = self.sources_loader()
+        except Exception:
+            sources = []
+        per_source = {}
+        for s in sources:
+            key = source_key(s)
+            if not key or not _norm(s.get("feed_url")):
+                continue
+            entry = state["sources"].get(key) if isinstance(state["sources"].get(key), dict) else {}
+            per_source[key] = {
+                "interval_sec": source_interval(s, self.config),
+                "last_run": entry.get("last_run"),
+                "next_due": entry.get("next_due"),
+            }
+        return {
+            "enabled": self.config.enabled,
+            "running_here": self._thread is not None and self._thread.is_alive(),
+            "config": asdict(self.config),
+            "ticks": ticks,
+            "skipped_ticks": skipped,
+            "active": [r for r in ordered if r.get("status") in {"queued", "running"}],
+            "recent_runs": ordered,
+            "sources": per_source,
+        }
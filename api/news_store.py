@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from itertools import count
+from typing import Any, Iterator, Optional
+
+from visa_copilot_ai.news import item_sort_ts
+
+try:  # POSIX: verrou inter-processus (plusieurs workers uvicorn)
+    import fcntl
+except Exception:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+_VERSIONS = count(1)
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, "") or default))
+    except Exception:
+        return default
+
+
+def tombstone_days() -> float:
+    """
+    Durée de conservation des suppressions (tombstones) à travers les compactions: un client qui
+    synchronise en delta (/news?since=) plus rarement que cela repart d'une liste complète.
+    """
+
+    return _env_num("GLOBALVISA_NEWS_TOMBSTONE_DAYS", 30)
+
+
+def default_retention() -> tuple[int, float]:
+    """
+    (nombre max d'items, âge max en jours depuis l'ingestion; 0 = illimité).
+    """
+
+    return int(_env_num("GLOBALVISA_NEWS_RETENTION_MAX_ITEMS", 2000)), _env_num("GLOBALVISA_NEWS_RETENTION_DAYS", 365)
+
+
+def _stamp(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (int(st.st_ino), int(st.st_size), int(st.st_mtime_ns))
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+class IngestedNewsStore:
+    """
+    Store append-only (JSONL) des news ingérées.
+
+    - Une ligne = un enregistrement: {"op": "put", "id", "item", "at", "mt"} ou {"op": "del", "id", "at"}
+      (`at` = epoch de première ingestion, sert à la rétention par âge; `mt` = epoch d'écriture); première ligne
+      {"op": "hdr", "file_id", "tombstones_from"} propre à chaque fichier
+    - Horodatages de modification (`mt`) et suppressions (tombstones, gardées `tombstone_days` à la
+      compaction) exposés par `snapshot_stamps`: base du flux delta de /news, identique d'un worker à l'autre
+    - Index id -> item en mémoire; lecture incrémentale: seules les lignes ajoutées depuis le
+      dernier offset sont lues. Rechargement complet si le fichier a été remplacé par une compaction
+      (file_id différent: le numéro d'inode seul peut être réutilisé)
+    - Écritures: verrou fichier (flock) + un seul write O_APPEND par lot; une ligne incomplète en fin
+      de fichier (crash) est ignorée jusqu'à ce qu'elle soit complétée
+    - Compaction: réécriture des seuls items vivants dans un fichier temporaire puis os.replace (atomique)
+    - Métadonnées (updated_at, last_ingest) dans un fichier JSON voisin, remplacé atomiquement
+    """
+
+    def __init__(self, path: str, *, compact_min_garbage: int = 200) -> None:
+        self.path = path
+        base = os.path.splitext(path)[0]
+        self.meta_path = base + ".meta.json"
+        self.lock_path = base + ".lock"
+        self.compact_min_garbage = max(0, int(compact_min_garbage))
+        self._lock = threading.RLock()
+        self._items: dict[str, dict[str, Any]] = {}
+        self._ingested_at: dict[str, float] = {}
+        self._modified_at: dict[str, float] = {}
+        self._deleted: dict[str, float] = {}
+        self._tombstones_from = 0.0
+        self._last_stamp = 0.0
+        self._ino: Optional[int] = None
+        self._file_id = ""
+        self._offset = 0
+        self._lines = 0
+        self._meta: dict[str, Any] = {}
+        self._meta_stamp: Optional[tuple[int, int, int]] = None
+        self._version = 0
+        self._snapshot: list[dict[str, Any]] = []
+        self._stamps: tuple[dict[str, float], dict[str, float]] = ({}, {})
+        self._compactions = 0
+
+    # --- lecture ---
+
+    def _reset(self) -> None:
+        self._items = {}
+        self._ingested_at = {}
+        self._modified_at = {}
+        self._deleted = {}
+        self._tombstones_from = 0.0
+        self._last_stamp = 0.0
+        self._ino = None
+        self._file_id = ""
+        self._offset = 0
+        self._lines = 0
+
+    def _head_file_id(self, f: Any) -> str:
+        f.seek(0)
+        line = f.readline(4096)
+        try:
+            rec = json.loads(line)
+        except Exception:
+            return ""
+        return str(rec.get("file_id") or "") if isinstance(rec, dict) and rec.get("op") == "hdr" else ""
+
+    def _apply(self, rec: dict[str, Any]) -> None:
+        if rec.get("op") == "hdr":
+            self._file_id = str(rec.get("file_id") or "")
+            self._tombstones_from = float(rec.get("tombstones_from") or 0.0)
+            return
+        item_id = str(rec.get("id") or "")
+        if not item_id:
+            return
+        if rec.get("op") == "del":
+            self._items.pop(item_id, None)
+            self._ingested_at.pop(item_id, None)
+            self._modified_at.pop(item_id, None)
+            self._deleted[item_id] = float(rec.get("at") or 0.0)
+            self._last_stamp = max(self._last_stamp, self._deleted[item_id])
+        elif isinstance(rec.get("item"), dict):
+            self._items[item_id] = rec["item"]
+            self._ingested_at.setdefault(item_id, float(rec.get("at") or 0.0))
+            self._modified_at[item_id] = float(rec.get("mt") or rec.get("at") or 0.0)
+            self._last_stamp = max(self._last_stamp, self._modified_at[item_id])
+            self._deleted.pop(item_id, None)
+
+    def _read_tail(self) -> bool:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            changed = self._ino is not None
+            self._reset()
+            return changed
+        with f:
+            # fstat du fichier ouvert: inode et taille cohérents avec ce qui est lu.
+            st = os.fstat(f.fileno())
+            ino, size = int(st.st_ino), int(st.st_size)
+            replaced = ino != self._ino or size < self._offset or (self._offset > 0 and self._head_file_id(f) != self._file_id)
+            if replaced:
+                had_data = self._ino is not None
+                self._reset()
+                self._ino = ino
+                if size == 0:
+                    return had_data
+            elif size == self._offset:
+                return False
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        end = data.rfind(b"\n")
+        if end < 0:
+            return replaced
+        for line in data[: end + 1].splitlines():
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue  # ligne corrompue: ignorée
+            if isinstance(rec, dict):
+                self._apply(rec)
+                self._lines += 1
+        self._offset += end + 1
+        return True
+
+    def _read_meta(self) -> bool:
+        stamp = _stamp(self.meta_path)
+        if stamp == self._meta_stamp:
+            return False
+        meta: dict[str, Any] = {}
+        if stamp is not None:
+            try:
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                meta = loaded if isinstance(loaded, dict) else {}
+            except Exception:
+                meta = {}
+        self._meta, self._meta_stamp = meta, stamp
+        return True
+
+    def refresh(self) -> bool:
+        with self._lock:
+            items_changed = self._read_tail()
+            meta_changed = self._read_meta()
+            if items_changed or meta_changed or self._version == 0:
+                self._version = next(_VERSIONS)
+                ordered = sorted(self._items.values(), key=item_sort_ts, reverse=True)
+                self._snapshot = ordered
+                self._stamps = (dict(self._modified_at), dict(self._deleted))
+            return items_changed or meta_changed
+
+    def snapshot(self) -> tuple[int, list[dict[str, Any]], dict[str, Any]]:
+        """
+        (version, items du plus récent au plus ancien, métadonnées). La liste est partagée: lecture seule.
+        """
+
+        with self._lock:
+            self.refresh()
+            return self._version, self._snapshot, dict(self._meta)
+
+    def snapshot_stamps(self) -> tuple[int, dict[str, float], dict[str, float], float]:
+        """
+        (version, {id: epoch de dernière écriture}, {id supprimé: epoch de suppression}, tombstones_from).
+        Les suppressions antérieures à `tombstones_from` ont pu être oubliées (compaction).
+        Mêmes versions que `snapshot` (dictionnaires partagés: lecture seule).
+        """
+
+        with self._lock:
+            self.refresh()
+            return self._version, self._stamps[0], self._stamps[1], self._tombstones_from
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path) or os.path.exists(self.meta_path)
+
+    # --- écriture ---
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    # Rattraper les écritures des autres workers avant de calculer le lot.
+                    self.refresh()
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _repair_tail(fd: int) -> int:
+        """
+        Tronque une dernière ligne incomplète (écriture interrompue par un crash): sinon le lot suivant
+        y serait collé et sa première ligne illisible. Appelé verrou détenu; retourne la taille finale.
+        """
+
+        size = os.fstat(fd).st_size
+        if size == 0 or os.pread(fd, 1, size - 1) == b"\n":
+            return size
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            nl = os.pread(fd, end - start, start).rfind(b"\n")
+            if nl >= 0:
+                keep = start + nl + 1
+                break
+            end = start
+        else:
+            keep = 0
+        os.ftruncate(fd, keep)
+        return keep
+
+    def _append(self, records: list[dict[str, Any]]) -> None:
+        if not records:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if self._repair_tail(fd) == 0:
+                records = [{"op": "hdr", "file_id": uuid.uuid4().hex, "tombstones_from": time.time()}] + records
+            data = "".join(_dumps(r) + "\n" for r in records).encode("utf-8")
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_meta(self, meta: dict[str, Any]) -> None:
+        tmp = f"{self.meta_path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, self.meta_path)
+
+    def _retention_drops(self, live: dict[str, dict[str, Any]], ingested_at: dict[str, float], *, max_items: int, max_age_days: float, now: float) -> set[str]:
+        drops: set[str] = set()
+        if max_age_days > 0:
+            cutoff = now - max_age_days * 86400
+            drops.update(k for k in live if ingested_at.get(k, now) < cutoff)
+        if max_items > 0:
+            kept = [k for k in live if k not in drops]
+            if len(kept) > max_items:
+                kept.sort(key=lambda k: (item_sort_ts(live[k]), ingested_at.get(k, now)), reverse=True)
+                drops.update(kept[max_items:])
+        return drops
+
+    def sync(
+        self,
+        items: list[dict[str, Any]],
+        *,
+        meta: Optional[dict[str, Any]] = None,
+        max_items: Optional[int] = None,
+        max_age_days: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> dict[str, int]:
+        """
+        Aligne le store sur `items` (liste complète): n'ajoute que les items nouveaux ou modifiés
+        et des suppressions pour les absents, puis applique la rétention (nombre / âge).
+        """
+
+        ts = time.time() if now is None else float(now)
+        default_max, default_age = default_retention()
+        lim_items = default_max if max_items is None else int(max_items)
+        lim_age = default_age if max_age_days is None else float(max_age_days)
+        with self._write_lock():
+            wanted: dict[str, dict[str, Any]] = {}
+            for it in items:
+                if isinstance(it, dict) and str(it.get("id") or "").strip():
+                    wanted[str(it["id"]).strip()] = it
+            ingested_at = {k: self._ingested_at.get(k, ts) for k in wanted}
+            drops = self._retention_drops(wanted, ingested_at, max_items=lim_items, max_age_days=lim_age, now=ts)
+
+            # Horodatages strictement croissants dans l'ordre du fichier: un lecteur qui n'a vu qu'une
+            # partie d'un lot a un watermark inférieur au reste du lot (flux delta sans trou).
+            stamps = count()
+            base = max(ts, self._last_stamp + 1e-6)
+
+            def stamp() -> float:
+                return base + next(stamps) * 1e-6
+
+            records: list[dict[str, Any]] = []
+            for k in self._items:
+                if k not in wanted or k in drops:
+                    records.append({"op": "del", "id": k, "at": stamp()})
+            puts = 0
+            for k, it in wanted.items():
+                if k in drops:
+                    continue
+                if self._items.get(k) != it:
+                    records.append({"op": "put", "id": k, "item": it, "at": ingested_at[k], "mt": stamp()})
+                    puts += 1
+            self._append(records)
+            if meta is not None:
+                self._write_meta(meta)
+            self.refresh()
+            compacted = self._maybe_compact()
+        return {"appended": len(records), "put": puts, "deleted": len(records) - puts, "dropped_by_retention": len(drops), "compacted": int(compacted)}
+
+    def _maybe_compact(self) -> bool:
+        garbage = self._lines - len(self._items) - len(self._deleted)
+        if garbage <= max(self.compact_min_garbage, len(self._items)):
+            return False
+        self._compact_locked()
+        return True
+
+    def compact(self) -> None:
+        with self._write_lock():
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        tmp = f"{self.path}.compact{os.getpid()}"
+        horizon = time.time() - tombstone_days() * 86400
+        tombstones_from = max(self._tombstones_from, horizon)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(_dumps({"op": "hdr", "file_id": uuid.uuid4().hex, "tombstones_from": tombstones_from}) + "\n")
+            for k, at in self._deleted.items():
+                if at >= horizon:
+                    f.write(_dumps({"op": "del", "id": k, "at": at}) + "\n")
+            for k, it in self._items.items():
+                at = self._ingested_at.get(k, 0.0)
+                f.write(_dumps({"op": "put", "id": k, "item": it, "at": at, "mt": self._modified_at.get(k, at)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._compactions += 1
+        self.refresh()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self.refresh()
+            return {
+                "path": self.path,
+                "items": len(self._items),
+                "lines": self._lines,
+                "garbage_lines": self._lines - len(self._items) - len(self._deleted),
+                "tombstones": len(self._deleted),
+                "bytes": self._offset,
+                "compactions": self._compactions,
+            }
+
+
+_STORES: dict[str, IngestedNewsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(path: str) -> IngestedNewsStore:
+    key = os.path.abspath(path)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = IngestedNewsStore(path)
+            _STORES[key] = store
+        return store
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import math
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from visa_copilot_ai.news import NewsIndex, _norm, news_to_dict
+
+from .content_admin import load_news_data
+from .news_ingest_admin import load_ingested_cache
+
+
+@dataclass(frozen=True)
+class NewsView:
+    """
+    Vue fusionnée (pack éditorial + cache d'ingestion), dédupliquée par id et triée par date.
+
+    Instantané immuable: un lecteur garde sa vue même si une reconstruction a lieu entre-temps.
+    - key: versions des deux sources (process-local, sert à détecter un changement)
+    - etag: empreinte du contenu fusionné (identique d'un worker à l'autre)
+    - changes: journal (horodatage d'écriture, id) trié, des items ingérés visibles et des suppressions;
+      watermark = dernier horodatage. Issus du store: identiques d'un worker à l'autre (flux delta)
+    - pack_digest: empreinte du pack éditorial (non horodaté: s'il change, le client repart de zéro)
+    """
+
+    key: tuple[Any, ...]
+    etag: str
+    items: tuple[dict[str, Any], ...]
+    index: NewsIndex
+    pack_source: str
+    pack_path: str
+    cache_path: str
+    cache_updated_at: Optional[str]
+    built_at: float
+    changes: tuple[tuple[float, str], ...] = ()
+    watermark: float = 0.0
+    tombstones_from: float = 0.0
+    pack_digest: str = ""
+    rank_of_id: Optional[dict[str, int]] = None
+
+
+_LOCK = threading.Lock()
+_CURRENT: Optional[NewsView] = None
+_REBUILDS = 0
+
+
+def _merge(*lists: Any) -> list[dict[str, Any]]:
+    seen: set[str] = set()
+    out: list[dict[str, Any]] = []
+    for items in lists:
+        if not isinstance(items, list):
+            continue
+        for raw in items:
+            if not isinstance(raw, dict):
+                continue
+            # Le pack passe en premier: à id égal, la version éditoriale l'emporte.
+            item_id = str(raw.get("id") or "").strip()
+            if item_id:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+            out.append(raw)
+    return out
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha256(json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _changes(pack_items: Any, stamps: Any) -> tuple[tuple[tuple[float, str], ...], float, float]:
+    stamps = stamps if isinstance(stamps, dict) else {}
+    modified = stamps.get("modified") or {}
+    deleted = stamps.get("deleted") or {}
+    # À id égal le pack l'emporte: les écritures du cache sur ces ids ne changent rien pour le client.
+    shadowed = {_norm(x.get("id")) for x in pack_items if isinstance(x, dict)} if isinstance(pack_items, list) else set()
+    log = [(float(ts), k) for k, ts in modified.items() if k not in shadowed]
+    log += [(float(ts), k) for k, ts in deleted.items() if k not in shadowed]
+    log.sort()
+    watermark = log[-1][0] if log else 0.0
+    return tuple(log), watermark, float(stamps.get("tombstones_from") or 0.0)
+
+
+def _build(pack: Any, cache: Any, key: tuple[Any, ...], previous: Optional[NewsView]) -> NewsView:
+    merged = _merge(pack.data.get("items"), cache.data.get("items"))
+    # Index plein texte repris de la vue précédente: seuls les items ingérés depuis sont tokenisés.
+    index = NewsIndex(merged, previous=previous.index if previous is not None else None)
+    ordered = tuple(index.raw)
+    digest = _digest(ordered)
+    changes, watermark, tombstones_from = _changes(pack.data.get("items"), cache.data.get("stamps"))
+    return NewsView(
+        key=key,
+        etag=f'"{digest[:32]}"',
+        items=ordered,
+        index=index,
+        pack_source=pack.source,
+        pack_path=pack.path,
+        cache_path=cache.path,
+        cache_updated_at=cache.data.get("updated_at"),
+        built_at=time.time(),
+        changes=changes,
+        watermark=watermark,
+        tombstones_from=tombstones_from,
+        pack_digest=_digest(pack.data.get("items"))[:16],
+        rank_of_id={n.id: r for r, n in enumerate(index.items)},
+    )
+
+
+def news_view() -> NewsView:
+    """
+    Vue courante. Les sources sont servies par le cache de contenu (revalidation par stat):
+    tant que leurs versions ne changent pas, la même vue est retournée sans aucun travail.
+    """
+
+    global _CURRENT, _REBUILDS
+    pack = load_news_data()
+    cache = load_ingested_cache()
+    key = (pack.path, pack.version, cache.path, cache.version)
+    view = _CURRENT
+    if view is not None and view.key == key:
+        return view
+    with _LOCK:
+        view = _CURRENT
+        if view is not None and view.key == key:
+            return view
+        view = _build(pack, cache, key, _CURRENT)
+        _CURRENT = view
+        _REBUILDS += 1
+        return view
+
+
+def refresh_news_view() -> NewsView:
+    """
+    Reconstruit la vue tout de suite (appelé après save/delete d'une source),
+    pour que la première requête suivante ne paie pas la reconstruction.
+    """
+
+    return news_view()
+
+
+def news_view_stats() -> dict[str, Any]:
+    view = _CURRENT
+    return {
+        "rebuilds": _REBUILDS,
+        "items": len(view.items) if view is not None else 0,
+        "search_docs": len(view.index.text.doc_len) if view is not None else 0,
+        "etag": view.etag if view is not None else None,
+        "built_at": view.built_at if view is not None else None,
+    }
+
+
+# --- Pagination par curseur et flux delta (/news) ---
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(payload: dict[str, Any]) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, kind: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise CursorError("Curseur invalide.") from e
+    if not isinstance(data, dict) or data.get("v") != 1 or data.get("k") != kind:
+        raise CursorError("Curseur invalide.")
+    # Champs lus tels quels par news_page / news_delta: types vérifiés ici (jeton forgé => 400, pas 500).
+    pos = data.get("a")
+    valid = (
+        all(isinstance(data.get(k, ""), str) for k in ("f", "p"))
+        and ("w" not in data or _is_number(data["w"]))
+        and ("o" not in data or (isinstance(data["o"], int) and not isinstance(data["o"], bool) and data["o"] >= 0))
+        and (
+            pos is None
+            or (
+                isinstance(pos, list)
+                and len(pos) == 2
+                and (_is_number(pos[0]) or (pos[0] is None and kind == "page"))
+                and isinstance(pos[1], str)
+            )
+        )
+    )
+    if not valid:
+        raise CursorError("Curseur invalide.")
+    return data
+
+
+def _is_number(x: Any) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool) and math.isfinite(x)
+
+
+def _filters_fp(country: str, category: str, tag: str, q: str) -> str:
+    return hashlib.sha1(json.dumps([country, category, tag, q]).encode("utf-8")).hexdigest()[:10]
+
+
+def _norm_filters(country: Optional[str], category: Optional[str], tag: Optional[str], q: Optional[str]) -> tuple[str, str, str, str]:
+    return _norm(country).lower(), _norm(category).lower(), _norm(tag).lower(), _norm(q).lower()
+
+
+def _sync_token(fp: str, watermark: float, pack_digest: str) -> str:
+    return encode_cursor({"v": 1, "k": "sync", "f": fp, "w": watermark, "p": pack_digest})
+
+
+def news_page(
+    view: NewsView,
+    *,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 30,
+    cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Une page du feed:
+    - sans q: ordre chronologique, curseur = position (date, id) du dernier item servi (stable si
+      des items plus récents arrivent entre deux pages)
+    - avec q: ordre de pertinence, curseur = décalage
+    `sync` (jeton pour `since`) reflète l'état au moment de la première page.
+    """
+
+    country_n, category_n, tag_n, q_n = _norm_filters(country, category, tag, q)
+    fp = _filters_fp(country_n, category_n, tag_n, q_n)
+    lim = max(1, min(int(limit or 30), 200))
+    # Rien d'antérieur à tombstones_from n'est connu: le jeton part au plus tôt de là.
+    state = {"w": max(view.watermark, view.tombstones_from), "p": view.pack_digest}
+    if cursor:
+        c = decode_cursor(cursor, "page")
+        if c.get("f") != fp:
+            raise CursorError("Curseur émis pour d'autres filtres.")
+        state = {"w": float(c.get("w") or 0.0), "p": str(c.get("p") or "")}
+
+    filters = {"country": country_n, "category": category_n, "tag": tag_n}
+    if q_n:
+        offset = int(c.get("o") or 0) if cursor else 0
+        found = view.index.search(q=q_n, limit=lim + 1, offset=offset, **filters)
+        more = len(found) > lim
+        items = found[:lim]
+        nxt = {"o": offset + lim}
+    else:
+        start = 0
+        if cursor:
+            pos = c.get("a")
+            if not isinstance(pos, list) or len(pos) != 2:
+                raise CursorError("Curseur invalide.")
+            start = view.index.rank_after(pos[0], str(pos[1]))
+        ranks, more = view.index.page(start=start, limit=lim, **filters)
+        items = [view.index.items[r] for r in ranks]
+        last = ranks[-1] if ranks else None
+        ts = view.index.sort_ts[last] if last is not None else None
+        nxt = {"a": [ts if ts not in (None, float("-inf")) else None, items[-1].id if items else ""]}
+
+    next_cursor = encode_cursor({"v": 1, "k": "page", "f": fp, **state, **nxt}) if more else None
+    return {
+        "mode": "full",
+        "items": [news_to_dict(n) for n in items],
+        "next_cursor": next_cursor,
+        "sync": _sync_token(fp, state["w"], state["p"]),
+    }
+
+
+def news_delta(
+    view: NewsView,
+    *,
+    since: str,
+    country: Optional[str] = None,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = 30,
+) -> dict[str, Any]:
+    """
+    Items ajoutés ou modifiés depuis le jeton `since` (ordre des écritures) + ids à retirer
+    (supprimés, ou ne passant plus les filtres, ex. passés en doublon).
+
+    Repli sur une liste complète (`reset`: true) si le pack éditorial a changé ou si le jeton est
+    plus ancien que la conservation des suppressions.
+    """
+
+    country_n, category_n, tag_n, _ = _norm_filters(country, category, tag, None)
+    fp = _filters_fp(country_n, category_n, tag_n, "")
+    lim = max(1, min(int(limit or 30), 200))
+    try:
+        c = decode_cursor(since, "sync")
+        after: tuple[float, str] = (float(c.get("w") or 0.0), "\U0010ffff")
+    except CursorError:
+        c = decode_cursor(since, "delta")
+        pos = c.get("a")
+        if not isinstance(pos, list) or len(pos) != 2:
+            raise CursorError("Curseur invalide.")
+        after = (float(pos[0]), str(pos[1]))
+    if c.get("f") != fp:
+        raise CursorError("Jeton émis pour d'autres filtres.")
+
+    if c.get("p") != view.pack_digest or after[0] < view.tombstones_from:
+        out = news_page(view, country=country, category=category, tag=tag, limit=limit)
+        return {**out, "reset": True}
+
+    i = bisect_right(view.changes, after)
+    chunk = view.changes[i : i + lim]
+    more = i + lim < len(view.changes)
+    items: list[dict[str, Any]] = []
+    removed: list[str] = []
+    rank_of_id = view.rank_of_id or {}
+    for _, item_id in chunk:
+        r = rank_of_id.get(item_id)
+        n = view.index.items[r] if r is not None else None
+        if n is not None and view.index.matches(n, country=country_n, category=category_n, tag=tag_n):
+            items.append(news_to_dict(n))
+        else:
+            removed.append(item_id)
+
+    out: dict[str, Any] = {"mode": "delta", "reset": False, "items": items, "removed": removed}
+    if more:
+        last = chunk[-1]
+        out["next_cursor"] = encode_cursor({"v": 1, "k": "delta", "f": fp, "p": view.pack_digest, "a": [last[0], last[1]]})
+        out["sync"] = None
+    else:
+        out["next_cursor"] = None
+        out["sync"] = _sync_token(fp, max(view.watermark, view.tombstones_from, after[0]), view.pack_digest)
+    return out
+
+
+def query_etag(view: NewsView, params: dict[str, Any]) -> str:
+    """
+    ETag d'une réponse /news: contenu de la vue + paramètres (chaque requête a le sien).
+    """
+
+    digest = hashlib.sha256(json.dumps([view.etag, params], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from visa_copilot_ai.ocr import extract_from_base64
+
+
+WORKER_CRASHED = "Worker OCR interrompu (crash ou mémoire insuffisante); réessayer."
+
+
+class OcrQueueFull(Exception):
+    """File OCR pleine: le client doit réessayer plus tard (HTTP 429)."""
+
+
+class OcrJobNotFound(KeyError):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+@dataclass
+class OcrJob:
+    id: str
+    submitted_at: float
+    future: Future
+    finished_at: Optional[float] = None
+    meta: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return "running" if self.future.running() else "queued"
+        if self.future.cancelled() or self.future.exception() is not None:
+            return "failed"
+        return "done"
+
+
+class OcrJobQueue:
+    """
+    File de jobs OCR bornée, exécutée sur un pool de processus (pypdf/tesseract sont CPU-bound).
+
+    - `submit()` lève OcrQueueFull au-delà de `max_pending` jobs non terminés (backpressure).
+    - Les jobs terminés sont conservés `result_ttl_sec` secondes (polling), puis purgés.
+    - Les ids sont locaux au processus: avec plusieurs workers uvicorn, le polling doit
+      revenir sur le même worker (un seul worker par instance dans le Dockerfile).
+    - Un worker tué (OOM, segfault) casse tout le pool: les jobs en cours échouent (`error`),
+      le pool est recréé au prochain `submit()`.
+    """
+
+    def __init__(
+        self,
+        *,
+        worker: Callable[..., Any] = extract_from_base64,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        result_ttl_sec: float = 600.0,
+        executor_kind: str = "process",
+    ) -> None:
+        self.worker = worker
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.result_ttl_sec = max(1.0, float(result_ttl_sec))
+        self.executor_kind = executor_kind if executor_kind in {"process", "thread"} else "process"
+        self._executor: Optional[Executor] = None
+        self._jobs: dict[str, OcrJob] = {}
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._completed = 0
+        self._capacity_waiters: list[Future] = []
+
+    @classmethod
+    def from_env(cls) -> "OcrJobQueue":
+        return cls(
+            max_workers=_env_int("GLOBALVISA_OCR_WORKERS", 2),
+            max_pending=_env_int("GLOBALVISA_OCR_QUEUE_DEPTH", 16),
+            result_ttl_sec=float(_env_int("GLOBALVISA_OCR_JOB_TTL_SEC", 600)),
+            executor_kind=os.getenv("GLOBALVISA_OCR_EXECUTOR", "process").strip().lower() or "process",
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr")
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _discard_executor(self, executor: Executor) -> None:
+        # Seulement si c'est encore le pool courant: un autre job a peut-être déjà déclenché la recréation.
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pending_count(self) -> int:
+        return sum(1 for j in self._jobs.values() if not j.future.done())
+
+    def _purge(self, now: float) -> None:
+        expired = [jid for jid, j in self._jobs.items() if j.finished_at is not None and now - j.finished_at > self.result_ttl_sec]
+        for jid in expired:
+            self._jobs.pop(jid, None)
+
+    def submit(self, meta: Optional[dict[str, Any]] = None, fn: Optional[Callable[..., Any]] = None, **kwargs: Any) -> OcrJob:
+        """
+        `fn` remplace le worker par défaut (doit rester picklable: fonction de module).
+        """
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            if self._pending_count() >= self.max_pending:
+                self._rejected += 1
+                raise OcrQueueFull(f"File OCR pleine ({self.max_pending} jobs en cours).")
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn or self.worker, **kwargs)
+            except BrokenProcessPool:
+                # Pool cassé par un worker mort: recréé une fois, le job n'a pas démarré.
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = self._get_executor()
+                future = executor.submit(fn or self.worker, **kwargs)
+            job = OcrJob(id=uuid.uuid4().hex, submitted_at=now, future=future, meta=dict(meta or {}))
+            self._jobs[job.id] = job
+        job.future.add_done_callback(lambda _f, j=job, ex=executor: self._on_done(j, ex))
+        return job
+
+    def _on_done(self, job: OcrJob, executor: Executor) -> None:
+        broken = not job.future.cancelled() and isinstance(job.future.exception(), BrokenProcessPool)
+        if broken:
+            self._discard_executor(executor)
+        with self._lock:
+            job.finished_at = time.time()
+            if broken:
+                job.error = WORKER_CRASHED
+            self._completed += 1
+            waiters, self._capacity_waiters = self._capacity_waiters, []
+        for w in waiters:
+            if not w.done():  # attente abandonnée (délai, client parti): future annulée
+                w.set_result(None)
+
+    def when_capacity(self) -> Future:
+        """
+        Future résolue dès qu'une place se libère dans la file (immédiatement s'il y en a une).
+        Pas de réservation: `submit()` peut encore lever OcrQueueFull si un autre appelant passe avant.
+        """
+
+        fut: Future = Future()
+        with self._lock:
+            if self._pending_count() < self.max_pending:
+                fut.set_result(None)
+            else:
+                self._capacity_waiters.append(fut)
+        return fut
+
+    def get(self, job_id: str) -> OcrJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise OcrJobNotFound(job_id)
+        return job
+
+    def wait(self, job: OcrJob, timeout_sec: float) -> Any:
+        """
+        Attend le résultat (lève concurrent.futures.TimeoutError; le job continue en arrière-plan).
+        """
+
+        return job.future.result(timeout=timeout_sec)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": self.executor_kind,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending_count(),
+                "tracked_jobs": len(self._jobs),
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+__all__ = ["BrokenProcessPool", "FutureTimeoutError", "OcrJob", "OcrJobNotFound", "OcrJobQueue", "OcrQueueFull", "WORKER_CRASHED"]
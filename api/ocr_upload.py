@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+_CHUNK = 256 * 1024
+
+
+class UploadRejected(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def max_upload_bytes() -> int:
+    try:
+        return max(1, int(os.getenv("GLOBALVISA_OCR_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)) or 0))
+    except Exception:
+        return 20 * 1024 * 1024
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def batch_limits() -> tuple[int, int]:
+    """
+    (nombre max de fichiers, octets max au total) pour /ocr/extract/batch.
+    """
+
+    return _env_int("GLOBALVISA_OCR_BATCH_MAX_FILES", 20), _env_int("GLOBALVISA_OCR_BATCH_MAX_BYTES", 100 * 1024 * 1024)
+
+
+def _spool_dir() -> Optional[str]:
+    return os.getenv("GLOBALVISA_OCR_SPOOL_DIR", "") or None
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    """
+    Fichier téléversé, écrit sur disque par morceaux (jamais entièrement en mémoire).
+    `path` est passé aux workers OCR (processus séparés) qui l'ouvrent eux-mêmes.
+    """
+
+    path: str
+    size: int
+    sha256: str
+    mime_type: str
+    filename: str = ""
+
+    def discard(self, *_: Any) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def _write_chunks(chunks: AsyncIterator[bytes], *, max_bytes: int, mime_type: str, filename: str) -> SpooledUpload:
+    h = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="ocr-upload-", dir=_spool_dir())
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(413, f"Fichier trop volumineux (max {max_bytes} octets).")
+                h.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    if size == 0:
+        os.remove(path)
+        raise UploadRejected(400, "Fichier vide.")
+    return SpooledUpload(path=path, size=size, sha256=h.hexdigest(), mime_type=mime_type, filename=filename)
+
+
+async def _iter_upload_file(upload: Any) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+_MULTIPART_SLACK = 64 * 1024  # en-têtes de parties et boundaries
+
+
+def _check_multipart_length(request: Request, limit: int) -> None:
+    """
+    Le parseur multipart de Starlette écrit chaque partie en entier (fichier temporaire) avant que
+    `_write_chunks` ne voie un octet: sans Content-Length (transfert chunked), aucune limite ne
+    s'appliquerait pendant la réception. Content-Length exigé et borné ici; le serveur HTTP garantit
+    ensuite que le corps ne le dépasse pas.
+    """
+
+    declared = request.headers.get("content-length")
+    if not declared or not declared.isdigit():
+        raise UploadRejected(411, "multipart sans Content-Length refusé; envoyer le fichier en corps brut (streaming) ou avec Content-Length.")
+    if int(declared) > limit + _MULTIPART_SLACK:
+        raise UploadRejected(413, f"Fichier trop volumineux (max {limit} octets).")
+
+
+async def spool_request(request: Request, *, mime_type: str = "", max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Accepte:
+    - corps brut (Content-Type: application/pdf, image/jpeg, ... ou ?mime_type=), limite appliquée en streaming
+    - multipart/form-data avec un champ `file` (nécessite python-multipart; Content-Length obligatoire)
+    """
+
+    limit = max_upload_bytes() if max_bytes is None else int(max_bytes)
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > limit + _MULTIPART_SLACK:
+        raise UploadRejected(413, f"Fichier trop volumineux (max {limit} octets).")
+
+    ctype = (request.headers.get("content-type") or "").strip()
+    if ctype.lower().startswith("multipart/form-data"):
+        _check_multipart_length(request, limit)
+        try:
+            form = await request.form(max_files=1)
+        except AssertionError:
+            raise UploadRejected(415, "multipart indisponible sur le serveur (python-multipart manquant); envoyer le fichier en corps brut.")
+        try:
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise UploadRejected(400, "Champ multipart `file` requis.")
+            mime = mime_type or str(getattr(upload, "content_type", "") or "")
+            return await _write_chunks(_iter_upload_file(upload), max_bytes=limit, mime_type=mime, filename=str(upload.filename or ""))
+        finally:
+            await form.close()
+
+    mime = mime_type or ctype.split(";", 1)[0].strip()
+    return await _write_chunks(request.stream(), max_bytes=limit, mime_type=mime, filename="")
+
+
+def _is_zip(mime_type: str, filename: str) -> bool:
+    mt = (mime_type or "").lower()
+    return "zip" in mt or (filename or "").lower().endswith(".zip")
+
+
+def _guess_mime(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def _sync_chunks(f: Any) -> Iterator[bytes]:
+    while True:
+        chunk = f.read(_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _spool_sync(chunks: Iterator[bytes], *, max_bytes: int, mime_type: str, filename: str) -> SpooledUpload:
+    h = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="ocr-upload-", dir=_spool_dir())
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(413, f"Lot trop volumineux une fois décompressé (max {max_bytes} octets).")
+                h.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    return SpooledUpload(path=path, size=size, sha256=h.hexdigest(), mime_type=mime_type, filename=filename)
+
+
+def explode_zip(archive: SpooledUpload, *, max_files: int, max_bytes: int) -> list[SpooledUpload]:
+    """
+    Extrait les fichiers d'une archive zip (en streaming, taille réelle bornée: anti zip-bomb).
+    Ignore dossiers, fichiers cachés et métadonnées macOS.
+    """
+
+    out: list[SpooledUpload] = []
+    budget = max_bytes
+    try:
+        with zipfile.ZipFile(archive.path) as zf:
+            members = [
+                i
+                for i in zf.infolist()
+                if not i.is_dir() and not os.path.basename(i.filename).startswith(".") and not i.filename.startswith("__MACOSX/")
+            ]
+            if len(members) > max_files:
+                raise UploadRejected(413, f"Trop de fichiers dans l'archive (max {max_files}).")
+            for info in members:
+                with zf.open(info) as f:
+                    up = _spool_sync(_sync_chunks(f), max_bytes=budget, mime_type=_guess_mime(info.filename), filename=info.filename)
+                budget -= up.size
+                if up.size == 0:
+                    up.discard()
+                    continue
+                out.append(up)
+    except zipfile.BadZipFile:
+        for up in out:
+            up.discard()
+        raise UploadRejected(400, "Archive zip invalide.")
+    except BaseException:
+        for up in out:
+            up.discard()
+        raise
+    return out
+
+
+async def spool_request_files(request: Request) -> list[SpooledUpload]:
+    """
+    Lot de fichiers pour l'OCR batch:
+    - multipart/form-data (Content-Length obligatoire): tous les champs fichier (`files`, `file`, ...);
+      un .zip y est décompressé
+    - corps brut application/zip: archive décompressée
+    - autre corps brut: un seul fichier
+    """
+
+    max_files, max_bytes = batch_limits()
+    ctype = (request.headers.get("content-type") or "").strip()
+    raw: list[SpooledUpload] = []
+    try:
+        if ctype.lower().startswith("multipart/form-data"):
+            _check_multipart_length(request, max_bytes)
+            try:
+                form = await request.form(max_files=max_files)
+            except AssertionError:
+                raise UploadRejected(415, "multipart indisponible sur le serveur (python-multipart manquant); envoyer un zip en corps brut.")
+            try:
+                uploads = [v for _, v in form.multi_items() if not isinstance(v, str)]
+                remaining = max_bytes
+                for upload in uploads:
+                    name = str(upload.filename or "")
+                    mime = str(getattr(upload, "content_type", "") or "") or _guess_mime(name)
+                    up = await _write_chunks(_iter_upload_file(upload), max_bytes=remaining, mime_type=mime, filename=name)
+                    remaining -= up.size
+                    raw.append(up)
+            finally:
+                await form.close()
+        else:
+            body = await spool_request(request, max_bytes=max_bytes)
+            raw.append(body)
+
+        out: list[SpooledUpload] = []
+        remaining = max_bytes
+        for up in raw:
+            if _is_zip(up.mime_type, up.filename):
+                members = await run_in_threadpool(explode_zip, up, max_files=max_files - len(out), max_bytes=remaining)
+                up.discard()
+                out.extend(members)
+                remaining -= sum(m.size for m in members)
+            else:
+                out.append(up)
+                remaining -= up.size
+        raw = []
+        if not out:
+            raise UploadRejected(400, "Aucun fichier à traiter.")
+        if len(out) > max_files:
+            for up in out:
+                up.discard()
+            raise UploadRejected(413, f"Trop de fichiers (max {max_files}).")
+        return out
+    finally:
+        for up in raw:
+            up.discard()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _canon(o: Any) -> Any:
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return {f.name: getattr(o, f.name) for f in dataclasses.fields(o)}
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, (set, frozenset)):
+        return sorted(o, key=str)
+    if isinstance(o, tuple):
+        return list(o)
+    return str(o)
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Hash stable d'une entrée parsée (dataclasses, enums, dicts...): l'ordre des clés ne compte pas.
+    """
+
+    raw = json.dumps(list(parts), sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_canon)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def encode_json(obj: Any) -> bytes:
+    # Même encodage que fastapi.responses.JSONResponse.
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class ResponseCache:
+    """
+    Cache LRU borné (nombre d'entrées + octets) avec TTL, pour réponses JSON déjà encodées.
+    Opt-in: GLOBALVISA_RESPONSE_CACHE=1.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        ttl_sec: float = 300.0,
+        max_entries: int = 2048,
+        max_bytes: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.enabled = bool(enabled)
+        self.ttl_sec = max(0.0, float(ttl_sec))
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._items: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._too_large = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            enabled=os.getenv("GLOBALVISA_RESPONSE_CACHE", "").strip().lower() in {"1", "true", "yes", "on"},
+            ttl_sec=_env_float("GLOBALVISA_RESPONSE_CACHE_TTL_SEC", 300.0),
+            max_entries=_env_int("GLOBALVISA_RESPONSE_CACHE_MAX_ENTRIES", 2048),
+            max_bytes=_env_int("GLOBALVISA_RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self._misses += 1
+                return None
+            expires_at, body = item
+            if now >= expires_at:
+                self._drop(key)
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._items.move_to_end(key)
+            self._hits += 1
+            return body
+
+    def put(self, key: str, body: bytes) -> None:
+        size = len(body)
+        with self._lock:
+            if size > self.max_bytes:
+                self._too_large += 1
+                return
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (time.monotonic() + self.ttl_sec, body)
+            self._bytes += size
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._items))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        _, body = self._items.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_sec": self.ttl_sec,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "expired": self._expired,
+                "evictions": self._evictions,
+                "too_large": self._too_large,
+            }
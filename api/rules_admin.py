@@ -5,6 +5,8 @@ import os
 from dataclasses import dataclass
 from typing import Any
 
+from visa_copilot_ai.content_cache import invalidate, load_json_optional
+
 
 DEFAULT_EMBEDDED_HINT = "visa_copilot_ai/resources/visa_rules.json"
 
@@ -14,6 +16,7 @@ class RulesLoadResult:
     rules: dict[str, Any]
     source: str  # "override" | "embedded"
     path: str
+    version: int = 0  # change à chaque rechargement du pack (cache de contenu)
 
 
 def get_override_path() -> str:
@@ -23,14 +26,15 @@ def get_override_path() -> str:
 
 def load_rules() -> RulesLoadResult:
     override = get_override_path()
-    if override and os.path.exists(override):
-        with open(override, "r", encoding="utf-8") as f:
-            return RulesLoadResult(rules=json.load(f), source="override", path=override)
+    entry = load_json_optional(override) if override else None
+    if entry is not None:
+        return RulesLoadResult(rules=entry.data, source="override", path=override, version=entry.version)
     # Fallback: rely on embedded rules via eligibility._load_rules environment default
     # We return empty marker path to be explicit.
-    from visa_copilot_ai.eligibility import _load_rules  # noqa: WPS450 - internal but acceptable for API layer
+    from visa_copilot_ai.eligibility import _rules_entry  # noqa: WPS450 - internal but acceptable for API layer
 
-    return RulesLoadResult(rules=_load_rules(), source="embedded", path=DEFAULT_EMBEDDED_HINT)
+    embedded = _rules_entry()
+    return RulesLoadResult(rules=embedded.data, source="embedded", path=DEFAULT_EMBEDDED_HINT, version=embedded.version)
 
 
 def save_override_rules(rules: dict[str, Any]) -> str:
@@ -39,6 +43,7 @@ def save_override_rules(rules: dict[str, Any]) -> str:
     with open(override, "w", encoding="utf-8") as f:
         json.dump(rules, f, ensure_ascii=False, indent=2, sort_keys=True)
         f.write("\n")
+    invalidate(override)
     return override
 
 
@@ -46,6 +51,7 @@ def delete_override_rules() -> bool:
     override = get_override_path()
     if override and os.path.exists(override):
         os.remove(override)
+        invalidate(override)
         return True
     return False
 
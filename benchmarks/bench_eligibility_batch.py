@@ -0,0 +1,97 @@
+"""
+Benchmark: scoring d'éligibilité en cohorte.
+
+Compare, pour N profils synthétiques (défaut: 10k et 100k):
+- boucle evaluate_visa_eligibility (équivalent d'appels /eligibility/proposals en série)
+- evaluate_visa_eligibility_batch (résultats complets, identiques)
+- score_visa_eligibility_batch (scores seuls, une multiplication matricielle)
+
+Usage:
+    python3 benchmarks/bench_eligibility_batch.py --sizes 10000 100000 --country canada
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visa_copilot_ai.eligibility import (  # noqa: E402
+    EligibilityUserProfile,
+    LanguageEvidence,
+    _load_rules,
+    evaluate_visa_eligibility,
+    evaluate_visa_eligibility_batch,
+    score_visa_eligibility_batch,
+)
+
+
+def _profiles(n: int, seed: int) -> list[EligibilityUserProfile]:
+    rnd = random.Random(seed)
+    out: list[EligibilityUserProfile] = []
+    for _ in range(n):
+        out.append(
+            EligibilityUserProfile(
+                age=rnd.randint(16, 65),
+                nationality="Maroc",
+                destination_country=rnd.choice(["canada", "france", ""]),
+                education_level=rnd.choice(["", "high_school", "bachelor", "master", "phd"]),
+                field_of_study=rnd.choice(["", "IT", "Informatique", "Médecine"]),
+                years_experience=round(rnd.uniform(0, 15), 1),
+                marital_status=rnd.choice(["", "single", "married"]),
+                language=LanguageEvidence(band=rnd.choice([None, 4.5, 5.5, 6, 6.5, 7, 8]), exam="IELTS"),
+                financial_capacity_usd=rnd.choice([None, 500.0, 2500.0, 6000.0, 15000.0, 40000.0]),
+                sponsor_available=rnd.choice([None, True, False]),
+                travel_history_trips_last_5y=rnd.choice([None, 0, 1, 3, 8]),
+                prior_visa_refusals=rnd.choice([None, 0, 0, 1, 2]),
+            )
+        )
+    return out
+
+
+def _timed(fn):  # type: ignore[no-untyped-def]
+    start = time.perf_counter()
+    res = fn()
+    return res, time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--country", default="canada")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--skip-loop-above", type=int, default=0, help="ne pas mesurer la boucle scalaire au-delà de N (0 = toujours)")
+    args = ap.parse_args()
+
+    rules = _load_rules()
+    for n in args.sizes:
+        users = _profiles(n, args.seed)
+        print(f"N={n} country={args.country}")
+
+        scores, t_scores = _timed(lambda: score_visa_eligibility_batch(users, args.country, rules=rules))
+        print(f"  batch scores ({scores.engine:6s}) : {t_scores:8.3f}s  ({n / t_scores:,.0f} profils/s)")
+
+        full, t_full = _timed(lambda: evaluate_visa_eligibility_batch(users, args.country, rules=rules))
+        print(f"  batch full              : {t_full:8.3f}s  ({n / t_full:,.0f} profils/s)")
+
+        if args.skip_loop_above and n > args.skip_loop_above:
+            print("  loop evaluate           :  (skipped)")
+            continue
+        loop, t_loop = _timed(lambda: [evaluate_visa_eligibility(u, args.country, rules=rules) for u in users])
+        print(f"  loop evaluate           : {t_loop:8.3f}s  ({n / t_loop:,.0f} profils/s)")
+        print(f"  speedup scores/loop     : {t_loop / t_scores:8.1f}x")
+
+        sample = random.Random(args.seed).sample(range(n), min(n, 200))
+        same = all(
+            [(r.visaType, r.score, r.color) for r in full[i]] == [(r.visaType, r.score, r.color) for r in loop[i]]
+            for i in sample
+        )
+        print(f"  résultats identiques (échantillon): {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: parsing d'un flux RSS volumineux (archive gouvernementale synthétique, ~--mb Mo).
+
+Chaque mode tourne dans un sous-processus isolé (pic mémoire VmHWM):
+- legacy: décodage -> ET.fromstring (arbre complet) -> tous les items -> tranche [:max_per_source]
+  (parseur historique copié ci-dessous tel quel)
+- stream: iter_feed_items sur le flux complet (items retirés de l'arbre au fil de l'eau)
+- stream_limit: iter_feed_items arrêté à --max-per-source items (chemin d'ingestion)
+
+Usage:
+    python3 benchmarks/bench_news_feed_parse.py --mb 20 --max-per-source 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from visa_copilot_ai.news_ingest import _norm, iter_feed_items  # noqa: E402
+
+
+def _peak_mb() -> float:
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _first_text(elem: Optional[ET.Element], tags: list[str]) -> str:
+    if elem is None:
+        return ""
+    for t in tags:
+        x = elem.find(t)
+        if x is not None and x.text:
+            return _norm(x.text)
+    return ""
+
+
+def _decode(raw: bytes) -> str:
+    # best-effort utf-8 (décodage historique, avant le parsing en streaming)
+    try:
+        return raw.decode("utf-8")
+    except Exception:
+        return raw.decode("latin-1", errors="ignore")
+
+
+def legacy_parse(xml_text: str) -> list[dict[str, Any]]:
+    if not _norm(xml_text):
+        return []
+    try:
+        root = ET.fromstring(xml_text)
+    except Exception:
+        return []
+    channel = root.find("channel")
+    if channel is None:
+        channel = root.find("./rss/channel")
+    if channel is None:
+        return []
+    return [
+        {"title": _first_text(it, ["title"]), "link": _first_text(it, ["link"]), "published_at": _first_text(it, ["pubDate", "published", "dc:date"])}
+        for it in channel.findall("item")
+    ]
+
+
+def _make_feed(path: str, target_mb: float) -> int:
+    rnd = random.Random(5)
+    words = ["visa", "permis", "étudiant", "travail", "résidence", "décret", "arrêté", "frais", "délai", "biométrie"]
+    n = 0
+    size = 0
+    target = int(target_mb * 1024 * 1024)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel><title>Archive</title>\n')
+        while size < target:
+            desc = " ".join(rnd.choices(words, k=60))
+            chunk = (
+                f"<item><title>Communiqué {n}: {' '.join(rnd.choices(words, k=6))}</title>"
+                f"<link>https://gov.example.org/news/{n}</link><pubDate>Mon, 0{1 + n % 9} Dec 2025 10:00:00 GMT</pubDate>"
+                f"<description>{desc}</description></item>\n"
+            )
+            f.write(chunk)
+            size += len(chunk.encode("utf-8"))
+            n += 1
+        f.write("</channel></rss>\n")
+    return n
+
+
+def _child(mode: str, path: str, max_per_source: int) -> None:
+    with open(path, "rb") as f:
+        raw = f.read()  # corps HTTP complet en mémoire dans les deux cas
+    base = _peak_mb()
+    t0 = time.perf_counter()
+    if mode == "legacy":
+        items = legacy_parse(_decode(raw))[:max_per_source]
+    elif mode == "stream":
+        items = list(iter_feed_items(raw))
+    else:
+        items = list(iter_feed_items(raw, limit=max_per_source))
+    took = time.perf_counter() - t0
+    print(json.dumps({"mode": mode, "items": len(items), "peak_mb": round(_peak_mb(), 1), "delta_mb": round(_peak_mb() - base, 1), "ms": round(took * 1000, 1)}))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, default=20.0)
+    ap.add_argument("--max-per-source", type=int, default=20)
+    ap.add_argument("--child", nargs=3, metavar=("MODE", "PATH", "MAX"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(args.child[0], args.child[1], int(args.child[2]))
+        return
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "feed.xml")
+        n = _make_feed(path, args.mb)
+        print(f"Flux: {os.path.getsize(path) / (1024 * 1024):.1f} Mo, {n} items, max_per_source={args.max_per_source}")
+        for mode in ("legacy", "stream", "stream_limit"):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, path, str(args.max_per_source)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(f"{mode:13s} items={r['items']:6d}  pic {r['peak_mb']:7.1f} Mo  (+{r['delta_mb']:.1f} Mo pendant le parsing)  {r['ms']:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark: recherche plein texte /news (BM25) sur un corpus synthétique (défaut: 100k items).
+
+Mesure:
+- construction complète de NewsIndex (tokenisation de tous les items)
+- reconstruction incrémentale après une ingestion de --new items (index texte repris: previous=)
+- latence des requêtes (p50 / p95 / max) avec et sans filtre pays, comparée à l'ancien
+  test de sous-chaîne sur le texte concaténé (balayage linéaire, ordre chronologique)
+
+Usage:
+    python3 benchmarks/bench_news_search.py --n 100000 --new 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visa_copilot_ai.news import NewsIndex  # noqa: E402
+
+_WORDS_FR = "visa permis travail étudiant étudiants séjour titre résidence décret arrêté frais délai biométrie rendez-vous consulat regroupement familial renouvellement".split()
+_WORDS_EN = "visa permit work student students study residence rule fees processing delay biometrics appointment embassy family sponsorship renewal cap".split()
+_QUERIES = ["student work permit", "permis de travail étudiant", "biometrics appointment delay", "regroupement familial", "visa fees", "renouvellement titre de séjour"]
+
+
+def _vocab(size: int, seed: int) -> list[str]:
+    rnd = random.Random(seed)
+    syll = ["ra", "to", "mi", "sel", "con", "dé", "pro", "ven", "lu", "tir", "ga", "mon", "ré", "pa", "qui", "ber"]
+    return ["".join(rnd.choices(syll, k=rnd.randint(2, 4))) for _ in range(size)]
+
+
+def _items(n: int, seed: int, start: int = 0, vocab_size: int = 20_000) -> list[dict[str, Any]]:
+    """
+    Texte: mots du domaine (FR ou EN) mêlés à un vocabulaire de remplissage en loi de Zipf
+    (un vrai corpus a des milliers de termes; un vocabulaire minuscule ferait de chaque posting la moitié du corpus).
+    """
+
+    rnd = random.Random(seed)
+    filler = _vocab(vocab_size, 1)
+    cum = list(itertools.accumulate(1.0 / (k + 1) for k in range(vocab_size)))
+
+    def text(words: list[str], k: int) -> str:
+        out = rnd.choices(filler, cum_weights=cum, k=k)
+        for i in range(0, k, 3):
+            out[i] = rnd.choice(words)
+        return " ".join(out)
+
+    out = []
+    for i in range(start, start + n):
+        words = _WORDS_FR if rnd.random() < 0.5 else _WORDS_EN
+        out.append(
+            {
+                "id": f"n{i}",
+                "category": rnd.choice(["visa_news", "law_change"]),
+                "country": rnd.choice(["Canada", "France", "Maroc", "Belgique", "UK"]),
+                "tags": rnd.sample(["students", "work", "fees", "biometrics", "family"], k=rnd.randint(0, 2)),
+                "title": text(words, rnd.randint(6, 12)),
+                "summary": text(words, rnd.randint(0, 40)),
+                "source_name": rnd.choice(["IRCC", "Service-Public", "Gov.uk", "Blog"]),
+                "published_ts": 1_700_000_000 + i * 60,
+                "reliability_score": rnd.choice([0.65, 0.85]),
+            }
+        )
+    return out
+
+
+def _legacy_search(idx: NewsIndex, q: str, country: str, limit: int) -> list[int]:
+    out = []
+    for r, n in enumerate(idx.items):
+        if country and n.country.lower() != country:
+            continue
+        hay = " ".join([n.title, n.summary, n.country, n.category, " ".join(n.tags), n.source_name]).lower()
+        if q in hay:
+            out.append(r)
+            if len(out) >= limit:
+                break
+    return out
+
+
+def _latencies(fn: Any, rounds: int) -> list[float]:
+    out = []
+    for _ in range(rounds):
+        for q in _QUERIES:
+            t0 = time.perf_counter()
+            fn(q)
+            out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def _report(label: str, ms: list[float]) -> None:
+    ms = sorted(ms)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"  {label:28s} p50 {statistics.median(ms):7.2f} ms  p95 {p95:7.2f} ms  max {ms[-1]:7.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--new", type=int, default=200, help="items ajoutés par l'ingestion simulée")
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--vocab", type=int, default=20_000, help="taille du vocabulaire de remplissage")
+    args = ap.parse_args()
+
+    items = _items(args.n, args.seed, vocab_size=args.vocab)
+    t0 = time.perf_counter()
+    idx = NewsIndex(items)
+    print(f"N={args.n}  construction complète: {time.perf_counter() - t0:.2f}s  ({len(idx.text.postings)} termes)")
+
+    more = items + _items(args.new, args.seed + 1, start=args.n, vocab_size=args.vocab)
+    for q in _QUERIES:
+        idx.search(q=q)  # index précédent déjà interrogé (cas d'un serveur en marche)
+    t0 = time.perf_counter()
+    idx2 = NewsIndex(more, previous=idx)
+    print(f"  +{args.new} items, reconstruction incrémentale: {time.perf_counter() - t0:.2f}s  (index texte repris: {idx2.text is idx.text})")
+
+    # Première requête après reconstruction: tableaux de l'instantané + fin des postings à convertir.
+    _report("BM25 q (1re passe, froid)", _latencies(lambda q: idx2.search(q=q, limit=30), 1))
+    _report("BM25 q", _latencies(lambda q: idx2.search(q=q, limit=30), args.rounds))
+    _report("BM25 q + country", _latencies(lambda q: idx2.search(q=q, country="france", limit=30), args.rounds))
+    _report("sous-chaîne (ancien)", _latencies(lambda q: _legacy_search(idx2, q, "", 30), 1))
+    hits = {q: len(_legacy_search(idx2, q, "", 30)) for q in _QUERIES}
+    print(f"  résultats sous-chaîne (max 30): {hits}")
+    print(f"  résultats BM25 (max 30): { {q: len(idx2.search(q=q, limit=30)) for q in _QUERIES} }")
+
+
+if __name__ == "__main__":
+    main()
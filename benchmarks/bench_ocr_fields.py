@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: extraction de champs sur le texte d'un relevé bancaire de 50 pages.
+
+Compare l'extracteur historique (un re.search par champ + finditer de toutes les dates,
+copié ci-dessous tel quel) à l'extracteur compilé en un seul passage (ocr_fields).
+
+Usage:
+    python3 benchmarks/bench_ocr_fields.py --pages 50 --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visa_copilot_ai.ocr_fields import _norm, _parse_float, _to_iso_date, extract_field_matches, extract_fields  # noqa: E402
+
+
+def legacy_extract_fields(text: str) -> dict[str, Any]:
+    t = text or ""
+    tl = t.lower()
+    out: dict[str, Any] = {}
+    for pat in [
+        r"(passport\s*(no|number|n°)\s*[:\-]?\s*([A-Z0-9]{6,12}))",
+        r"(num[eé]ro\s+de\s+passeport\s*[:\-]?\s*([A-Z0-9]{6,12}))",
+    ]:
+        m = re.search(pat, t, flags=re.IGNORECASE)
+        if m:
+            cand = m.group(m.lastindex or 0)
+            cand = re.sub(r"[^A-Z0-9]", "", cand.upper())
+            if 6 <= len(cand) <= 12:
+                out["passport_number"] = cand
+                break
+    if "passport_number" not in out:
+        m = re.search(r"\b([A-Z]{1,2}\d{5,10})\b", t.upper())
+        if m:
+            out["passport_number"] = m.group(1)
+    date_hits: list[tuple[str, str]] = []
+    for m in re.finditer(r"\b(\d{4}-\d{2}-\d{2})\b|\b(\d{1,2}[\/\.]\d{1,2}[\/\.]\d{4})\b", t):
+        iso = _to_iso_date(m.group(0)) or ""
+        if not iso:
+            continue
+        date_hits.append((iso, tl[max(0, m.start() - 25) : min(len(t), m.end() + 25)]))
+    for iso, ctx in date_hits:
+        if any(k in ctx for k in ["expire", "expiry", "exp.", "date of expiry", "date d'expiration", "valid until", "valide jusqu"]):
+            out.setdefault("expires_date", iso)
+        if any(k in ctx for k in ["issue", "issued", "date of issue", "date d'emission", "date d'émission", "délivr", "deliver"]):
+            out.setdefault("issued_date", iso)
+    if "issued_date" not in out and "expires_date" not in out and date_hits:
+        out["issued_date"] = date_hits[0][0]
+    m = re.search(r"(full\s+name|nom\s+complet)\s*[:\-]?\s*([A-Z][A-Z \-']{3,})", t, flags=re.IGNORECASE)
+    if m:
+        out["full_name"] = _norm(m.group(2))
+    m = re.search(r"(ending\s+balance|solde\s+final|closing\s+balance)\s*[:\-]?\s*([0-9][0-9\s,\.]+)", t, flags=re.IGNORECASE)
+    if m:
+        val = _parse_float(m.group(2))
+        if val is not None:
+            out["ending_balance_usd"] = val
+    m = re.search(r"(account\s+holder|titulaire\s+du\s+compte)\s*[:\-]?\s*([A-Z][A-Z \-']{3,})", t, flags=re.IGNORECASE)
+    if m:
+        out["account_holder_name"] = _norm(m.group(2))
+    m = re.search(r"(coverage|couverture)\s*[:\-]?\s*(EUR|USD|\€|\$)?\s*([0-9][0-9\s,\.]+)", t, flags=re.IGNORECASE)
+    if m:
+        val = _parse_float(m.group(3))
+        if val is not None:
+            out["coverage_amount"] = val
+    return out
+
+
+def statement_text(pages: int, seed: int = 3) -> str:
+    rnd = random.Random(seed)
+    out = ["BANQUE EXEMPLE - RELEVE DE COMPTE", "Titulaire du compte: SARA EL AMRANI", "Date d'émission: 02/01/2026"]
+    for p in range(pages):
+        out.append(f"Page {p + 1}/{pages}")
+        for _ in range(45):
+            d = f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2025"
+            out.append(f"{d}  VIR SEPA {rnd.choice(['LOYER', 'SALAIRE', 'CARTE', 'PRLV'])} {rnd.randint(1000, 9999)}  {rnd.randint(1, 5000)},{rnd.randint(0, 99):02d}")
+    out.append("Solde final: 12 345,67")
+    return "\n".join(out)
+
+
+def _bench(fn, text: str, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=50)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    text = statement_text(args.pages)
+    legacy = legacy_extract_fields(text)
+    compiled = extract_fields(text)
+    print(f"Texte: {args.pages} pages, {len(text) / 1024:.0f} Ko, {text.count(chr(10)) + 1} lignes")
+    print(f"résultats identiques: {legacy == compiled}  {compiled}")
+    t_old = _bench(legacy_extract_fields, text, args.repeat)
+    t_new = _bench(extract_field_matches, text, args.repeat)
+    print(f"historique  {1000 * t_old:7.2f} ms")
+    print(f"compilé     {1000 * t_new:7.2f} ms  (x{t_old / t_new:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: presets de prétraitement image avant tesseract (temps + précision d'extraction).
+
+Génère localement un corpus de "photos" de documents (12 MP, JPEG, orientation EXIF variable,
+légère inclinaison, bruit), avec des champs connus (numéro de passeport, dates, solde...).
+Pour chaque preset (none, fast, balanced, accurate): temps de décodage+prétraitement, temps
+tesseract, et part des champs attendus correctement extraits par _extract_fields_from_text.
+
+Sans binaire tesseract, seuls les temps de prétraitement sont mesurés.
+
+Usage:
+    python3 benchmarks/bench_ocr_preprocess.py --docs 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visa_copilot_ai.ocr import _extract_fields_from_text  # noqa: E402
+from visa_copilot_ai.ocr_preprocess import PRESETS, preprocess_image  # noqa: E402
+
+
+def _make_doc(rnd: random.Random) -> tuple[bytes, dict[str, object]]:
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    W, H = 3024, 4032
+    img = Image.new("L", (W, H), 235)
+    d = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=64)
+    passport = f"{rnd.choice('ABCDEFGH')}{rnd.choice('KLMNPR')}{rnd.randint(1000000, 9999999)}"
+    year = rnd.randint(2027, 2034)
+    expires = f"{year}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+    balance = rnd.randint(1000, 99000) + rnd.choice([0.0, 0.5, 0.25])
+    lines = [
+        "REPUBLIC OF TESTLAND",
+        f"Passport No: {passport}",
+        f"Date of expiry: {expires}",
+        "Full name: AMINA BENALI",
+        "",
+        f"Closing balance: {balance:,.2f}",
+    ] + [f"Transaction {i:03d}   REF{rnd.randint(100000, 999999)}   {rnd.randint(1, 900)}.00" for i in range(24)]
+    for i, line in enumerate(lines):
+        d.text((220, 260 + i * 120), line, fill=25, font=font)
+    img = img.rotate(rnd.uniform(-3, 3), resample=Image.BICUBIC, fillcolor=235)
+    img = img.filter(ImageFilter.GaussianBlur(1.2))
+    noise = Image.effect_noise((W, H), 18)
+    img = Image.blend(img, noise, 0.12).convert("RGB")
+
+    exif = Image.Exif()
+    orientation = rnd.choice([1, 1, 6, 8])
+    if orientation == 6:
+        img = img.transpose(Image.ROTATE_90)
+    elif orientation == 8:
+        img = img.transpose(Image.ROTATE_270)
+    exif[0x0112] = orientation
+    buf = BytesIO()
+    img.save(buf, "JPEG", quality=88, exif=exif)
+    truth = {"passport_number": passport, "expires_date": expires, "ending_balance_usd": round(balance, 2)}
+    return buf.getvalue(), truth
+
+
+def _tesseract():
+    try:
+        import pytesseract  # type: ignore
+
+        pytesseract.get_tesseract_version()
+        return pytesseract
+    except Exception:
+        return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=12)
+    ap.add_argument("--presets", nargs="+", default=list(PRESETS))
+    args = ap.parse_args()
+
+    rnd = random.Random(11)
+    corpus = [_make_doc(rnd) for _ in range(args.docs)]
+    tess = _tesseract()
+    print(f"Corpus: {len(corpus)} images 12 MP, {sum(len(b) for b, _ in corpus) / 1e6:.1f} Mo JPEG")
+    if tess is None:
+        print("tesseract absent: précision non mesurée (temps de prétraitement uniquement).")
+
+    for name in args.presets:
+        cfg = PRESETS[name]
+        t_pre = 0.0
+        t_ocr = 0.0
+        hits = 0
+        expected = 0
+        size = (0, 0)
+        for data, truth in corpus:
+            t0 = time.perf_counter()
+            img = preprocess_image(BytesIO(data), cfg)
+            img.load()
+            t_pre += time.perf_counter() - t0
+            size = img.size
+            if tess is None:
+                continue
+            t0 = time.perf_counter()
+            text = tess.image_to_string(img) or ""
+            t_ocr += time.perf_counter() - t0
+            got = _extract_fields_from_text(text)
+            for k, v in truth.items():
+                expected += 1
+                hits += int(got.get(k) == v)
+        n = len(corpus)
+        line = f"{name:9s} prétraitement {1000 * t_pre / n:7.1f} ms/doc  (sortie {size[0]}x{size[1]})"
+        if tess is not None:
+            line += f"  tesseract {1000 * t_ocr / n:7.1f} ms/doc  précision {hits}/{expected} ({100 * hits / max(1, expected):.0f}%)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: pic de mémoire (RSS) OCR base64-in-JSON vs upload binaire streamé.
+
+Pour un PDF synthétique (pages image, ~--mb Mo), chaque mode tourne dans un sous-processus isolé:
+- base64: corps JSON reçu -> json.loads -> extract_from_base64 (chemin /ocr/extract)
+- upload: corps lu par morceaux -> fichier temporaire + SHA-256 -> extract_from_file (chemin /ocr/upload)
+
+Le cache OCR disque est désactivé pour mesurer l'extraction complète.
+
+Usage:
+    python3 benchmarks/bench_ocr_upload_memory.py --mb 8 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _rss_mb() -> float:
+    # VmHWM (Linux) est remis à zéro par exec, contrairement à ru_maxrss hérité du parent.
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss: Ko sous Linux, octets sous macOS.
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / (1024 * 1024) if sys.platform == "darwin" else r / 1024
+
+
+def _make_pdf(path: str, target_mb: float) -> None:
+    from io import BytesIO
+
+    from PIL import Image
+
+    rnd = random.Random(7)
+    side = 900
+    page = Image.frombytes("RGB", (side, side), rnd.randbytes(side * side * 3))  # bruit: JPEG peu compressible
+    probe = BytesIO()
+    page.save(probe, "PDF", quality=95)
+    n = max(1, round(target_mb * 1024 * 1024 / len(probe.getvalue())))
+    pages = [page.rotate(90 * (i % 4)) for i in range(n)]
+    pages[0].save(path, "PDF", save_all=True, append_images=pages[1:], quality=95)
+
+
+def _child(mode: str, pdf_path: str, body_path: str) -> None:
+    from visa_copilot_ai.ocr import extract_from_base64, extract_from_file
+    from visa_copilot_ai.ocr_cache import OcrDiskCache
+
+    no_cache = OcrDiskCache("", enabled=False)
+    base = _rss_mb()
+    t0 = time.perf_counter()
+    if mode == "base64":
+        with open(body_path, "rb") as f:
+            body = f.read()  # FastAPI garde le corps complet en mémoire
+        payload = json.loads(body)
+        res = extract_from_base64(content_base64=payload["content_base64"], mime_type=payload["mime_type"], cache=no_cache)
+    else:
+        h = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(prefix="bench-upload-")
+        with open(pdf_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            for chunk in iter(lambda: src.read(256 * 1024), b""):
+                h.update(chunk)
+                dst.write(chunk)
+        try:
+            res = extract_from_file(path=tmp, mime_type="application/pdf", sha256=h.hexdigest(), cache=no_cache)
+        finally:
+            os.remove(tmp)
+    took = time.perf_counter() - t0
+    print(json.dumps({"mode": mode, "peak_rss_mb": round(_rss_mb(), 1), "delta_mb": round(_rss_mb() - base, 1), "s": round(took, 3), "engine": res.engine}))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, nargs="+", default=[8.0, 20.0])
+    ap.add_argument("--child", nargs=3, metavar=("MODE", "PDF", "BODY"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as d:
+        for mb in args.mb:
+            pdf_path = os.path.join(d, f"doc-{mb}.pdf")
+            body_path = os.path.join(d, f"body-{mb}.json")
+            _make_pdf(pdf_path, mb)
+            with open(pdf_path, "rb") as f:
+                b64 = base64.b64encode(f.read()).decode("ascii")
+            with open(body_path, "w", encoding="utf-8") as f:
+                json.dump({"content_base64": b64, "mime_type": "application/pdf"}, f)
+            del b64
+            size = os.path.getsize(pdf_path) / (1024 * 1024)
+            print(f"\n=== PDF {size:.1f} Mo (corps JSON {os.path.getsize(body_path) / (1024 * 1024):.1f} Mo) ===")
+            for mode in ("base64", "upload"):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", mode, pdf_path, body_path],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.strip().splitlines()[-1]
+                r = json.loads(out)
+                print(f"{mode:7s} pic RSS {r['peak_rss_mb']:7.1f} Mo  (+{r['delta_mb']:.1f} Mo après imports)  {r['s']:.3f}s  engine={r['engine']}")
+
+
+if __name__ == "__main__":
+    main()
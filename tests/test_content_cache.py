@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+import unittest
+
+from visa_copilot_ai.content_cache import ContentCache, DerivedCache
+
+
+class TestContentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "pack.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, data):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_hit_returns_same_object(self):
+        self._write({"items": [1]})
+        cache = ContentCache(revalidate_sec=60)
+        a = cache.load_json(self.path)
+        b = cache.load_json(self.path)
+        self.assertIs(a.data, b.data)
+        self.assertEqual(a.version, b.version)
+        stats = cache.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["stat_calls"], 1)
+
+    def test_reload_when_file_changes(self):
+        self._write({"items": [1]})
+        cache = ContentCache(revalidate_sec=0)
+        a = cache.load_json(self.path)
+        self._write({"items": [1, 2, 3]})
+        b = cache.load_json(self.path)
+        self.assertEqual(b.data["items"], [1, 2, 3])
+        self.assertNotEqual(a.version, b.version)
+
+    def test_missing_file_and_invalidate(self):
+        cache = ContentCache(revalidate_sec=60)
+        self.assertIsNone(cache.load_json_optional(self.path))
+        self._write({"ok": True})
+        # negative entry still fresh
+        self.assertIsNone(cache.load_json_optional(self.path))
+        cache.invalidate(self.path)
+        self.assertEqual(cache.load_json_optional(self.path).data, {"ok": True})
+
+
+    def test_derived_cache_is_keyed_by_identity(self):
+        built = []
+        cache = DerivedCache(lambda src: built.append(src) or len(built), size=2)
+        a, b, c = [1], [1], [2]
+        self.assertEqual(cache.get(a), 1)
+        self.assertEqual(cache.get(a), 1)
+        self.assertEqual(cache.get(b), 2)  # égal mais autre objet (rechargement): reconstruit
+        cache.get(c)
+        self.assertEqual(cache.get(a), 4)  # évincé (LRU de 2)
+        self.assertEqual(len(built), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,17 @@
 import unittest
 
-from visa_copilot_ai.eligibility import EligibilityUserProfile, LanguageEvidence, evaluate_visa_eligibility
+import copy
+
+from visa_copilot_ai.eligibility import (
+    EligibilityUserProfile,
+    LanguageEvidence,
+    _load_rules,
+    compile_rules,
+    eligibility_to_dict,
+    evaluate_visa_eligibility,
+    evaluate_visa_eligibility_batch,
+    score_visa_eligibility_batch,
+)
 
 
 class TestEligibility(unittest.TestCase):
@@ -40,6 +51,55 @@ class TestEligibility(unittest.TestCase):
         res = evaluate_visa_eligibility(user, country="default")
         self.assertIn(res[0].color, {"green", "orange", "red"})
 
+    def test_compiled_rules_reused_per_rules_object(self) -> None:
+        rules = _load_rules()
+        self.assertIs(compile_rules(rules), compile_rules(rules))
+        c = compile_rules(rules).country("canada")
+        self.assertIs(c, compile_rules(rules).country(" Canada "))
+        self.assertEqual(compile_rules(rules).country("atlantis").key, "default")
+
+    def test_compiled_rules_rebuilt_when_rules_change(self) -> None:
+        rules = copy.deepcopy(_load_rules())
+        user = EligibilityUserProfile(age=30, nationality="Maroc", destination_country="canada")
+        before = {r.visaType: r.score for r in evaluate_visa_eligibility(user, country="canada", rules=rules)}
+
+        changed = copy.deepcopy(rules)
+        for vt in changed["countries"]["default"]["visa_types"].values():
+            vt["thresholds"] = {"green": 0, "orange": 0}
+        self.assertIsNot(compile_rules(changed), compile_rules(rules))
+        res = evaluate_visa_eligibility(user, country="canada", rules=changed)
+        self.assertTrue(all(r.color == "green" for r in res))
+        self.assertEqual({r.visaType: r.score for r in res}, before)
+
+    def test_batch_matches_single_evaluation(self) -> None:
+        users = [
+            EligibilityUserProfile(
+                age=age,
+                nationality="Maroc",
+                destination_country=dest,
+                education_level=edu,
+                years_experience=years,
+                language=LanguageEvidence(band=band),
+                financial_capacity_usd=funds,
+                sponsor_available=sponsor,
+                travel_history_trips_last_5y=trips,
+                prior_visa_refusals=refusals,
+            )
+            for age, dest, edu, years, band, funds, sponsor, trips, refusals in [
+                (28, "canada", "bachelor", 3, 6, 6000, False, 2, 0),
+                (17, "", "", 0, None, None, None, None, None),
+                (50, "france", "phd", 12, 8.5, 40000, True, 8, 3),
+                (36, "canada", "master", 1.5, 4, 500, None, 0, 1),
+            ]
+        ]
+        for country in ["canada", "default", "atlantis"]:
+            batch = evaluate_visa_eligibility_batch(users, country=country)
+            scores = score_visa_eligibility_batch(users, country=country)
+            for i, u in enumerate(users):
+                single = evaluate_visa_eligibility(u, country=country)
+                self.assertEqual([eligibility_to_dict(r) for r in batch[i]], [eligibility_to_dict(r) for r in single])
+                self.assertEqual(dict(zip(scores.visa_types, scores.scores[i])), {r.visaType: r.score for r in single})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -23,6 +23,26 @@ class TestEligibilityEngine(unittest.TestCase):
         self.assertTrue(isinstance(out.get("top_visa_options"), list))
         self.assertIn("profile_strength_score", out)
 
+    def test_engine_all_countries_global_top_k(self) -> None:
+        rules = _load_rules()
+        out = run_visa_eligibility_engine(
+            {
+                "identity": {"nationality": "Maroc", "country_of_residence": "Maroc", "age_range": "26–35"},
+                "objective": {"purpose": "Study", "destinations": ["all"]},
+                "top_k": 3,
+            },
+            rules=rules,
+        )
+        self.assertTrue(out.get("ok"))
+        supported = [k for k in rules["countries"] if k != "default"]
+        self.assertEqual(out["input_summary"]["destinations_considered"], supported)
+        top = out["top_visa_options"]
+        self.assertEqual(len(top), 3)
+        rank = {"High": 0, "Medium": 1, "Low": 2}
+        keys = [rank[o["estimated_approval_likelihood"]] for o in top]
+        self.assertEqual(keys, sorted(keys))
+        self.assertTrue(all("étudiant" in o["visa_type"].lower() for o in top))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+import base64
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from visa_copilot_ai import ocr
+from visa_copilot_ai.mrz import check_digit, find_td3, parse_td3
+from visa_copilot_ai.ocr_cache import OcrDiskCache
+
+# Spécimen ICAO 9303.
+L1 = "P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<"
+L2 = "L898902C36UTO7408122F1204159ZE184226B<<<<<10"
+
+
+class TestMrz(unittest.TestCase):
+    def test_check_digit(self):
+        self.assertEqual(check_digit("L898902C3"), 6)
+        self.assertEqual(check_digit("740812"), 2)
+        self.assertEqual(check_digit("ZE184226B<<<<<"), 1)
+
+    def test_parse_td3_specimen(self):
+        m = parse_td3(L1, L2)
+        self.assertTrue(m.valid)
+        out = m.to_extracted()
+        self.assertEqual(out["passport_number"], "L898902C3")
+        self.assertEqual(out["surname"], "ERIKSSON")
+        self.assertEqual(out["given_name"], "ANNA MARIA")
+        self.assertEqual(out["nationality"], "UTO")
+        self.assertEqual(out["expires_date"], "2012-04-15")
+        self.assertEqual(out["birth_date"], "1974-08-12")
+
+    def test_ocr_confusions_and_bad_check_digit(self):
+        # "O" lu à la place de "0" dans une date: corrigé; un numéro altéré est détecté.
+        noisy = L2.replace("7408122", "74O8122")
+        self.assertTrue(parse_td3(L1, noisy).valid)
+        bad = parse_td3(L1, "L898902C46" + L2[10:])
+        self.assertFalse(bad.checks["passport_number"])
+
+    def test_find_td3_in_ocr_text(self):
+        text = f"PASSPORT\nSurname ERIKSSON\n{L1[:20]} {L1[20:]}\n{L2}\n"
+        self.assertEqual(find_td3(text).passport_number, "L898902C3")
+        self.assertIsNone(find_td3("Closing balance: 10.00"))
+
+
+class TestPassportMode(unittest.TestCase):
+    def _png(self, w=1200, h=800) -> str:
+        from PIL import Image
+
+        buf = BytesIO()
+        Image.new("RGB", (w, h), "white").save(buf, "PNG")
+        return base64.b64encode(buf.getvalue()).decode("ascii")
+
+    def test_passport_mode_ocrs_only_mrz_strip(self):
+        calls = []
+
+        def fake_ocr(img, config=""):
+            calls.append((img.size, config))
+            return f"{L1}\n{L2}\n"
+
+        with mock.patch("pytesseract.image_to_string", side_effect=fake_ocr):
+            res = ocr.extract_from_base64(content_base64=self._png(), mime_type="image/png", mode="passport", cache=OcrDiskCache("", enabled=False))
+        self.assertEqual(res.engine, "tesseract_mrz")
+        self.assertEqual(len(calls), 1)
+        (w, h), config = calls[0]
+        self.assertLess(h, 800 * 0.3)
+        self.assertIn("whitelist", config)
+        self.assertEqual(res.extracted["passport_number"], "L898902C3")
+        self.assertEqual(res.extracted["full_name"], "ANNA MARIA ERIKSSON")
+        self.assertTrue(res.extracted["mrz_valid"])
+
+    def test_valid_mrz_overrides_regex_guess(self):
+        text = f"Ref AB123456\n{L1}\n{L2}"
+        extracted = ocr._extract_fields_from_text(text)
+        self.assertEqual(extracted.get("passport_number"), "AB123456")
+        ocr._apply_mrz(find_td3(text), extracted)
+        self.assertEqual(extracted["passport_number"], "L898902C3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,11 @@
+import hashlib
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-from visa_copilot_ai.news_ingest import ingest_news
+from visa_copilot_ai.news import list_news
+from visa_copilot_ai.news_ingest import FetchLimits, _fetch_feed, ingest_news, iter_feed_items
 
 
 class TestNewsIngest(unittest.TestCase):
@@ -65,6 +70,226 @@ class TestNewsIngest(unittest.TestCase):
         self.assertEqual(len(second_items), len(first_items))
         self.assertEqual(meta2.new_items, 0)
 
+    def test_concurrent_fetch_is_bounded_and_deterministic(self):
+        # 12 sources sur 3 hôtes, latence simulée; h2 très lent (timeout), h3 en erreur.
+        sources = [
+            {"id": f"s{i}", "country": "Canada", "feed_url": f"https://h{i % 3}.example.org/rss{i}", "source_type": "government"}
+            for i in range(12)
+        ]
+        lock = threading.Lock()
+        state = {"active": 0, "max_active": 0, "per_host": {}, "max_per_host": 0}
+
+        def fetcher(url: str) -> str:
+            host = url.split("/")[2]
+            with lock:
+                state["active"] += 1
+                state["per_host"][host] = state["per_host"].get(host, 0) + 1
+                state["max_active"] = max(state["max_active"], state["active"])
+                state["max_per_host"] = max(state["max_per_host"], state["per_host"][host])
+            try:
+                if host.startswith("h2"):
+                    time.sleep(0.6)
+                else:
+                    time.sleep(0.05)
+                if host.startswith("h1") and url.endswith("rss1"):
+                    raise RuntimeError("boom")
+                return f"<rss><channel><item><title>T {url}</title><link>{url}/a</link><pubDate>2025-12-20T10:00:00Z</pubDate></item></channel></rss>"
+            finally:
+                with lock:
+                    state["active"] -= 1
+                    state["per_host"][host] -= 1
+
+        limits = FetchLimits(concurrency=4, per_host=2, timeout_sec=0.2, deadline_sec=5)
+        t0 = time.monotonic()
+        items, meta = ingest_news(sources=sources, existing_items=[], fetcher=fetcher, limits=limits)
+        took = time.monotonic() - t0
+
+        self.assertLessEqual(state["max_active"], 4)
+        self.assertLessEqual(state["max_per_host"], 2)
+        self.assertLess(took, 1.8)  # en série: 8 x 0.05 + 4 x 0.6 = 2.8 s
+        self.assertEqual(meta.fetched_sources, 7)  # 4 sources h2 en timeout, s1 en erreur
+        self.assertEqual(len(meta.errors), 5)
+        self.assertTrue(meta.errors[0].startswith("s1: fetch failed: boom"))
+        self.assertTrue(all("timeout" in e for e in meta.errors[1:]))
+
+        items2, _ = ingest_news(sources=sources, existing_items=[], fetcher=fetcher, limits=limits)
+        self.assertEqual([x["id"] for x in items], [x["id"] for x in items2])
+
+    def test_deadline_reports_unfinished_sources(self):
+        sources = [{"id": f"s{i}", "country": "Canada", "feed_url": f"https://h{i}.example.org/rss"} for i in range(3)]
+
+        def fetcher(_url: str) -> str:
+            time.sleep(0.3)
+            return "<rss><channel></channel></rss>"
+
+        _, meta = ingest_news(sources=sources, fetcher=fetcher, limits=FetchLimits(concurrency=1, timeout_sec=5, deadline_sec=0.1))
+        self.assertFalse(meta.ok)
+        self.assertEqual(len(meta.errors), 3)
+        self.assertTrue(all("deadline" in e for e in meta.errors))
+
+    def test_conditional_get_and_hash_short_circuit(self):
+        feed = b"<rss><channel><item><title>News A</title><link>https://example.org/a</link></item></channel></rss>"
+        big = b"<rss><channel>" + b"".join(b"<item><title>N%d</title></item>" % i for i in range(20000)) + b"</channel></rss>"
+        hits = {"/etag": 0, "/plain": 0, "/etag_304": 0}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802
+                hits[self.path] = hits.get(self.path, 0) + 1
+                body = big if self.path == "/big" else feed
+                if self.path == "/etag":
+                    if self.headers.get("If-None-Match") == '"v1"':
+                        hits["/etag_304"] += 1
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("ETag", '"v1"')
+                else:
+                    # Pas de validateurs HTTP: seul le hash du corps permet d'éviter le parsing.
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        sources = [
+            {"id": "etag", "country": "Canada", "feed_url": f"{base}/etag"},
+            {"id": "plain", "country": "France", "feed_url": f"{base}/plain"},
+        ]
+        try:
+            items, meta = ingest_news(sources=sources, existing_items=[])
+            self.assertEqual((meta.fetched_sources, meta.skipped_sources), (2, 0))
+            self.assertEqual(meta.bytes_transferred, 2 * len(feed))
+            self.assertEqual(meta.validators["etag"]["etag"], '"v1"')
+            self.assertEqual(len(items), 2)
+
+            items2, meta2 = ingest_news(sources=sources, existing_items=items, validators=meta.validators)
+            self.assertEqual(hits["/etag_304"], 1)
+            self.assertEqual(meta2.skipped_sources, 2)
+            self.assertEqual(meta2.bytes_transferred, len(feed))  # seul /plain retransfère son corps
+            self.assertEqual(meta2.validators, meta.validators)
+            self.assertEqual(items2, items)
+
+            # Cache vide: validateurs ignorés, tout est re-téléchargé et re-parsé.
+            items3, meta3 = ingest_news(sources=sources, existing_items=[], validators=meta.validators)
+            self.assertEqual((meta3.skipped_sources, len(items3)), (0, 2))
+
+            # Corps parsé pendant la lecture puis lu jusqu'au bout pour le hash, jamais gardé.
+            resp = _fetch_feed(f"{base}/big", limit=2)
+            self.assertEqual([x["title"] for x in resp.items], ["N0", "N1"])
+            self.assertEqual((resp.body, resp.nbytes, resp.sha256), (b"", len(big), hashlib.sha256(big).hexdigest()))
+            self.assertIsNone(_fetch_feed(f"{base}/big", limit=2, known_sha256=resp.sha256).items)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_streaming_parser_rss_atom_and_early_stop(self):
+        rss = (
+            '<?xml version="1.0" encoding="ISO-8859-1"?>'
+            '<rss xmlns:dc="http://purl.org/dc/elements/1.1/"><channel><title>Flux</title>'
+            + "".join(f"<item><title>Visa n\xb0{i}</title><link>https://ex.org/{i}</link><dc:date>2025-12-0{i + 1}</dc:date></item>" for i in range(5))
+            + "</channel></rss>"
+        ).encode("latin-1")
+        items = list(iter_feed_items(rss))
+        self.assertEqual(len(items), 5)
+        self.assertEqual(items[0], {"title": "Visa n°0", "link": "https://ex.org/0", "published_at": "2025-12-01"})
+
+        class CountingStream:
+            def __init__(self, data):
+                self.data, self.pos = data, 0
+
+            def read(self, n):
+                chunk = self.data[self.pos : self.pos + n]
+                self.pos += len(chunk)
+                return chunk
+
+        big = b"<rss><channel>" + b"".join(b"<item><title>T%d</title></item>" % i for i in range(200000)) + b"</channel></rss>"
+        stream = CountingStream(big)
+        self.assertEqual([x["title"] for x in iter_feed_items(stream, limit=3)], ["T0", "T1", "T2"])
+        self.assertLess(stream.pos, 200 * 1024)  # le reste du flux n'est pas lu
+
+        atom = """<feed xmlns="http://www.w3.org/2005/Atom"><title>F</title>
+<entry><title>A</title><link href="https://ex.org/a"/><updated>2025-12-20T10:00:00Z</updated></entry>
+<entry><title>B</title><link href="https://ex.org/b"/><published>2025-12-21T10:00:00Z</published></entry>
+</feed>"""
+        self.assertEqual([(x["title"], x["link"]) for x in iter_feed_items(atom)], [("A", "https://ex.org/a"), ("B", "https://ex.org/b")])
+
+        # Latin-1 sans déclaration d'encodage (accepté avant le streaming): relu en latin-1, aussi en flux.
+        undeclared = "<rss><channel><item><title>é</title></item><item><title>à</title></item></channel></rss>".encode("latin-1")
+        self.assertEqual([x["title"] for x in iter_feed_items(undeclared)], ["é", "à"])
+        self.assertEqual([x["title"] for x in iter_feed_items(CountingStream(undeclared), limit=1)], ["é"])
+
+        # XML tronqué: les items complets déjà lus sont gardés.
+        self.assertEqual([x["title"] for x in iter_feed_items("<rss><channel><item><title>ok</title></item><item><title>cut")], ["ok"])
+
+    def test_dates_normalized_to_utc_at_ingest(self):
+        rss = """<rss><channel>
+<item><title>RFC 822 ancien</title><link>https://ex.org/1</link><pubDate>Tue, 30 Dec 2025 09:00:00 +0100</pubDate></item>
+<item><title>RFC 822 récent</title><link>https://ex.org/2</link><pubDate>Wed, 07 Jan 2026 10:00:00 GMT</pubDate></item>
+<item><title>ISO</title><link>https://ex.org/3</link><pubDate>2026-01-01T12:30:00+02:00</pubDate></item>
+<item><title>Illisible</title><link>https://ex.org/4</link><pubDate>bientôt</pubDate></item>
+</channel></rss>"""
+        items, _ = ingest_news(sources=[{"id": "s", "country": "France", "feed_url": "https://ex.org/rss"}], existing_items=[], fetcher=lambda _u: rss)
+        by_title = {x["title"]: x for x in items}
+        self.assertEqual(by_title["RFC 822 ancien"]["published_at"], "2025-12-30T08:00:00Z")
+        self.assertEqual(by_title["RFC 822 ancien"]["published_at_raw"], "Tue, 30 Dec 2025 09:00:00 +0100")
+        self.assertEqual(by_title["ISO"]["published_at"], "2026-01-01T10:30:00Z")
+        self.assertEqual(by_title["ISO"]["published_ts"], 1767263400)
+        # Illisible: date d'ingestion (la plus récente), texte d'origine conservé.
+        self.assertEqual(by_title["Illisible"]["published_at_raw"], "bientôt")
+        self.assertEqual([x["title"] for x in items], ["Illisible", "RFC 822 récent", "ISO", "RFC 822 ancien"])
+
+        legacy = [{"id": "old", "title": "Old", "published_at": "Mon, 01 Dec 2025 10:00:00 GMT"}]
+        migrated, _ = ingest_news(sources=[], existing_items=legacy)
+        self.assertEqual((migrated[0]["published_at"], migrated[0]["published_ts"]), ("2025-12-01T10:00:00Z", 1764583200))
+
+
+    def test_near_duplicates_across_sources_are_clustered(self):
+        feeds = {
+            "https://a.example/rss": [("Canada raises study permit financial requirement to $20,635", "2025-12-01T10:00:00Z")],
+            "https://b.example/rss": [
+                ("Canada: study permit financial requirement raised to $20,635", "2025-12-01T08:00:00Z"),
+                ("Weekly visa update - 12 December", "2025-12-12T08:00:00Z"),
+            ],
+            "https://c.example/rss": [
+                ("Canada raises study-permit financial requirement to $20,635", "2025-12-02T09:00:00Z"),
+                ("Weekly visa update - 19 December", "2025-12-19T08:00:00Z"),
+            ],
+        }
+
+        def fetcher(url):
+            body = "".join(f"<item><title>{t}</title><link>{url}/{i}</link><pubDate>{d}</pubDate></item>" for i, (t, d) in enumerate(feeds[url]))
+            return f"<rss><channel>{body}</channel></rss>"
+
+        sources = [
+            {"id": "a", "country": "Canada", "source_name": "IRCC", "source_type": "government", "feed_url": "https://a.example/rss"},
+            {"id": "b", "country": "Canada", "source_name": "Blog B", "feed_url": "https://b.example/rss"},
+            {"id": "c", "country": "Canada", "source_name": "Blog C", "feed_url": "https://c.example/rss"},
+        ]
+        items, meta = ingest_news(sources=sources, existing_items=[], fetcher=fetcher)
+        self.assertEqual(meta.duplicate_items, 2)
+        published = [x for x in items if x["status"] == "published"]
+        self.assertEqual(len(published), 3)  # 1 canonique + 2 mises à jour hebdo distinctes (nombres différents)
+        head = next(x for x in published if x.get("also_reported_by"))
+        self.assertEqual(head["source_name"], "IRCC")  # source la plus fiable
+        self.assertEqual(sorted(x["source_name"] for x in head["also_reported_by"]), ["Blog B", "Blog C"])
+        dups = [x for x in items if x["status"] == "duplicate"]
+        self.assertTrue(all(x["duplicate_of"] == head["id"] for x in dups))
+
+        # Réingestion sans nouveauté: mêmes clusters (idempotent), et le feed ne montre que le canonique.
+        again, meta2 = ingest_news(sources=sources, existing_items=items, fetcher=fetcher)
+        self.assertEqual(again, items)
+        self.assertEqual(meta2.duplicate_items, 2)
+        feed = list_news(country="Canada", q="study permit", data={"items": again})
+        self.assertEqual([x["id"] for x in feed], [head["id"]])
+        self.assertEqual(len(feed[0]["also_reported_by"]), 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,171 @@
+import contextlib
+import functools
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from api.news_ingest_admin import save_sources_override
+from api.news_scheduler import NewsIngestScheduler, SchedulerConfig
+from visa_copilot_ai.news_ingest import ingest_news
+
+_SOURCES = [
+    {"id": "gov", "country": "Canada", "feed_url": "https://example.org/gov.rss", "source_type": "government"},
+    {"id": "blog", "country": "Canada", "feed_url": "https://example.org/blog.rss", "source_type": "media"},
+    {"id": "custom", "country": "France", "feed_url": "https://example.org/c.rss", "poll_interval_sec": 300},
+]
+
+_RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item><title>Nouveau décret titre de séjour</title><link>https://example.org/a</link><pubDate>2025-12-20T10:00:00Z</pubDate></item>
+</channel></rss>
+"""
+
+
+class _Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestNewsIngestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmp.name, "news_ingested.jsonl")
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scheduler(self, runner=None, clock=None):
+        def record(sources, **kwargs):
+            self.calls.append(sorted(s["id"] for s in sources))
+            return {"ok": True}
+
+        return NewsIngestScheduler(
+            SchedulerConfig(enabled=True, jitter=0.1),
+            runner=runner or record,
+            sources_loader=lambda: list(_SOURCES),
+            base_path=self.base,
+            clock=clock or _Clock(),
+            rng=random.Random(0),
+        )
+
+    def test_per_source_intervals_with_jitter(self):
+        clock = _Clock()
+        a = self._scheduler(clock=clock)
+        self.assertEqual(a.tick().status, "done")
+        self.assertEqual(self.calls, [["blog", "custom", "gov"]])
+        self.assertIsNone(a.tick())  # rien d'échu
+
+        clock.now += 330  # 300 s +/- 10%
+        a.tick()
+        clock.now += 700  # ~1030 s: gouvernement (900 s +/- 10%), pas le blog (3600 s)
+        a.tick()
+        self.assertEqual(self.calls[1:], [["custom"], ["custom", "gov"]])
+
+        # Un autre worker partage les échéances (fichier d'état), pas de double ingestion.
+        b = self._scheduler(clock=clock)
+        self.assertIsNone(b.tick())
+        clock.now += 4000
+        self.assertEqual(sorted(b.tick().sources), ["blog", "custom", "gov"])
+        status = a.status()
+        self.assertEqual(status["sources"]["gov"]["interval_sec"], 900.0)
+        self.assertEqual(status["sources"]["custom"]["interval_sec"], 300.0)
+        self.assertEqual(len(status["recent_runs"]), 4)
+
+    def test_single_runner_lock_and_non_blocking_trigger(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow(sources, **kwargs):
+            started.set()
+            release.wait(5)
+            return {"ok": True, "n": len(sources)}
+
+        a = self._scheduler(runner=slow)
+        b = self._scheduler()
+        run = a.trigger(source_ids=["gov"])
+        self.assertIn(run.status, {"queued", "running"})
+        self.assertTrue(started.wait(5))
+        self.assertIsNone(b.tick())  # verrou pris par le run admin: tick sauté
+        self.assertEqual(b.status()["skipped_ticks"], 1)
+        self.assertEqual(b.get_run(run.id)["status"], "running")  # visible depuis l'autre worker
+        release.set()
+        self.assertTrue(run.done_event.wait(5))
+        self.assertEqual(b.get_run(run.id)["result"], {"ok": True, "n": 1})
+        self.assertEqual(self.calls, [])
+        b.tick()
+        self.assertEqual(self.calls, [["blog", "custom"]])  # gov vient d'être ingéré
+
+    def test_trigger_failures_finish_the_run(self):
+        a = self._scheduler()
+        with mock.patch.object(a, "_write_state", side_effect=OSError("disque plein")):
+            run = a.trigger(source_ids=["gov"])
+            self.assertTrue(run.done_event.wait(5))
+        self.assertEqual(run.status, "failed")
+        self.assertIn("disque plein", run.error)
+
+        @contextlib.contextmanager
+        def refused(*, blocking):
+            yield False
+
+        with mock.patch.object(a, "_runner_lock", refused):
+            run = a.trigger(source_ids=["gov"])
+            self.assertTrue(run.done_event.wait(5))
+        self.assertEqual(run.status, "failed")
+        self.assertEqual(self.calls, [])  # jamais exécuté sans le verrou
+        self.assertEqual(a.get_run(run.id)["status"], "failed")
+
+    def test_app_lifespan_starts_and_stops_background_work(self):
+        with mock.patch.object(main.NEWS_SCHEDULER, "start") as start, mock.patch.object(main.NEWS_SCHEDULER, "stop") as stop, mock.patch.object(main.OCR_JOBS, "shutdown") as shutdown:
+            with TestClient(main.app):
+                self.assertTrue(start.called)
+                self.assertFalse(stop.called)
+        self.assertTrue(stop.called and shutdown.called)
+
+    def test_admin_endpoints_trigger_and_poll(self):
+        env = {
+            "GLOBALVISA_ADMIN_KEY": "k",
+            "GLOBALVISA_NEWS_SOURCES_OVERRIDE_PATH": os.path.join(self.tmp.name, "sources.json"),
+            "GLOBALVISA_NEWS_INGESTED_CACHE_PATH": os.path.join(self.tmp.name, "news_ingested.json"),
+            "GLOBALVISA_NEWS_OVERRIDE_PATH": os.path.join(self.tmp.name, "news_override.json"),
+        }
+        fake = functools.partial(ingest_news, fetcher=lambda _url: _RSS)
+        with mock.patch.dict(os.environ, env), mock.patch("api.news_scheduler.ingest_news", fake):
+            save_sources_override({"sources": _SOURCES[:1]})
+            client = TestClient(main.app)
+            r = client.post("/admin/news/ingest/run", json={"sources": ["gov", "inconnue"]}, headers={"x-admin-key": "k"})
+            self.assertEqual(r.status_code, 400)
+            self.assertIn("inconnue", r.json()["detail"])
+            with mock.patch.object(main.NEWS_SCHEDULER, "trigger", wraps=main.NEWS_SCHEDULER.trigger) as trigger:
+                r = client.post("/admin/news/ingest/run", json={}, headers={"x-admin-key": "k"})
+            self.assertEqual(r.status_code, 202)
+            self.assertIsNone(trigger.call_args.kwargs["max_total"])  # rétention configurée du store
+            run_id = r.json()["run_id"]
+            self.assertEqual(r.json()["sources"], ["gov"])
+
+            deadline = time.time() + 10
+            while True:
+                st = client.get("/admin/news/ingest/status", params={"run_id": run_id}, headers={"x-admin-key": "k"}).json()
+                if st["run"]["status"] in {"done", "failed"} or time.time() > deadline:
+                    break
+                time.sleep(0.05)
+            self.assertEqual(st["run"]["status"], "done")
+            self.assertEqual(st["last_ingest"]["new_items"], 1)
+            self.assertIsNotNone(st["scheduler"]["sources"]["gov"]["next_due"])
+            self.assertIn("Nouveau décret titre de séjour", [x["title"] for x in client.get("/news").json()["items"]])
+            r = client.get("/admin/news/ingest/status", params={"run_id": "nope"}, headers={"x-admin-key": "k"})
+            self.assertEqual(r.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from api.news_ingest_admin import load_ingested_cache, save_ingested_cache
+from api.news_store import IngestedNewsStore
+
+
+def _item(i, day=1):
+    return {"id": f"ing_{i}", "title": f"T{i}", "published_at": f"2025-12-{day:02d}T10:00:00Z"}
+
+
+class TestIngestedNewsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "news_ingested.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_only_incremental_and_retention(self):
+        a = IngestedNewsStore(self.path)
+        b = IngestedNewsStore(self.path)  # autre worker
+        items = [_item(i, day=1 + i) for i in range(5)]
+        self.assertEqual(a.sync(items, max_items=0, max_age_days=0)["put"], 5)
+        self.assertEqual(a.sync(items, max_items=0, max_age_days=0)["appended"], 0)  # rien de changé: rien d'écrit
+        v1, snap, _ = b.snapshot()
+        self.assertEqual([x["id"] for x in snap], ["ing_4", "ing_3", "ing_2", "ing_1", "ing_0"])
+
+        size = os.path.getsize(self.path)
+        a.sync(items + [_item(9, day=20)], meta={"updated_at": "x"}, max_items=0, max_age_days=0)
+        with open(self.path, "ab") as f:
+            f.write(b'{"op":"put","id":"partial"')  # écriture en cours / interrompue
+        v2, snap, meta = b.snapshot()
+        self.assertNotEqual(v1, v2)
+        self.assertEqual(snap[0]["id"], "ing_9")
+        self.assertEqual(meta["updated_at"], "x")
+        self.assertNotIn("partial", [x["id"] for x in snap])
+        self.assertGreater(b.stats()["bytes"], size)
+        self.assertIs(b.snapshot()[1], snap)  # inchangé: même instantané
+        with open(self.path, "ab") as f:
+            f.write(b"\n")  # la ligne tronquée, une fois terminée, est ignorée (JSON invalide)
+
+        # Rétention: les 3 plus récents, et rien d'ingéré il y a plus de 30 jours.
+        res = a.sync(items + [_item(9, day=20)], max_items=3, max_age_days=0)
+        self.assertEqual(res["dropped_by_retention"], 3)
+        self.assertEqual([x["id"] for x in b.snapshot()[1]], ["ing_9", "ing_4", "ing_3"])
+        later = a.snapshot()[1]
+        res = a.sync(later + [_item(10, day=21)], max_items=0, max_age_days=30, now=a._ingested_at["ing_9"] + 31 * 86400)
+        self.assertEqual([x["id"] for x in b.snapshot()[1]], ["ing_10"])
+
+    def test_torn_trailing_line_is_repaired_before_append(self):
+        a = IngestedNewsStore(self.path)
+        a.sync([_item(1)], max_items=0, max_age_days=0)
+        with open(self.path, "ab") as f:
+            f.write(b'{"op":"put","id":"x","item":{"id"')  # crash pendant os.write
+        res = a.sync([_item(1), _item(2, day=2), _item(3, day=3)], max_items=0, max_age_days=0)
+        self.assertEqual(res["put"], 2)
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                json.loads(line)
+        self.assertEqual([x["id"] for x in IngestedNewsStore(self.path).snapshot()[1]], ["ing_3", "ing_2", "ing_1"])
+
+    def test_compaction_replaces_file_atomically(self):
+        a = IngestedNewsStore(self.path, compact_min_garbage=5)
+        b = IngestedNewsStore(self.path)
+        for day in range(1, 12):
+            a.sync([_item(0, day=day), _item(1)], max_items=0, max_age_days=0)
+        self.assertGreaterEqual(a.stats()["compactions"], 1)
+        with open(self.path, encoding="utf-8") as f:
+            lines = [json.loads(x) for x in f]
+        self.assertLessEqual(len(lines), 2 + 5 + 1)
+        self.assertEqual({x["id"] for x in b.snapshot()[1]}, {"ing_0", "ing_1"})
+        self.assertEqual(b.snapshot()[1][0]["published_at"], "2025-12-11T10:00:00Z")
+
+    def test_concurrent_writers_keep_file_well_formed(self):
+        def writer(n):
+            store = IngestedNewsStore(self.path, compact_min_garbage=3)
+            for k in range(10):
+                store.sync([_item(f"{n}_{k}"), _item("shared", day=1 + k)], max_items=0, max_age_days=0)
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                json.loads(line)
+        ids = {x["id"] for x in IngestedNewsStore(self.path).snapshot()[1]}
+        self.assertEqual(len(ids), 2)
+        self.assertIn("ing_shared", ids)
+
+    def test_migrates_legacy_json_cache(self):
+        legacy = os.path.join(self.tmp.name, "news_ingested.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": "2025-12-01T00:00:00Z", "items": [_item(1), _item(2, day=2)], "last_ingest": {"ok": True}}, f)
+        with mock.patch.dict(os.environ, {"GLOBALVISA_NEWS_INGESTED_CACHE_PATH": legacy}):
+            cache = load_ingested_cache()
+            self.assertTrue(cache.path.endswith(".jsonl"))
+            self.assertEqual([x["id"] for x in cache.data["items"]], ["ing_2", "ing_1"])
+            self.assertEqual(cache.data["last_ingest"], {"ok": True})
+            save_ingested_cache({"updated_at": "u", "items": [_item(3)]})
+            self.assertEqual([x["id"] for x in load_ingested_cache().data["items"]], ["ing_3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from api.content_admin import delete_news_override, save_news_override
+from api.news_ingest_admin import save_ingested_cache
+from api.news_view import _filters_fp, encode_cursor, news_view
+
+
+class TestNewsView(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        env = {
+            "GLOBALVISA_NEWS_OVERRIDE_PATH": os.path.join(self.tmp.name, "news_override.json"),
+            "GLOBALVISA_NEWS_INGESTED_CACHE_PATH": os.path.join(self.tmp.name, "news_ingested.json"),
+        }
+        self.env = mock.patch.dict(os.environ, env)
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_merged_dedup_ordered_and_rebuilt_on_save(self):
+        save_news_override(
+            {
+                "items": [
+                    {"id": "a", "category": "visa_news", "country": "Canada", "title": "Pack A", "published_at": "2025-12-20T10:00:00Z"},
+                    {"id": "b", "category": "law_change", "country": "France", "title": "Pack B", "published_at": "2025-12-22T10:00:00Z"},
+                ]
+            }
+        )
+        save_ingested_cache(
+            {
+                "updated_at": "2025-12-23T00:00:00Z",
+                "items": [
+                    {"id": "a", "category": "visa_news", "country": "Canada", "title": "Ingested A", "published_at": "2025-12-25T10:00:00Z"},
+                    {"id": "c", "category": "visa_news", "country": "Canada", "title": "C", "published_at": "2025-12-21T10:00:00Z"},
+                ],
+            }
+        )
+        v1 = news_view()
+        self.assertIs(news_view(), v1)
+        self.assertEqual([x["id"] for x in v1.items], ["b", "c", "a"])
+        self.assertEqual(v1.items[2]["title"], "Pack A")  # le pack l'emporte à id égal
+
+        r = TestClient(main.app).get("/news", params={"country": "Canada"})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["version"], v1.etag.strip('"'))
+        self.assertTrue(r.headers["etag"])  # ETag propre à la requête (vue + paramètres)
+        self.assertEqual([x["id"] for x in r.json()["items"]], ["c", "a"])
+
+        save_ingested_cache({"updated_at": "2025-12-24T00:00:00Z", "items": []})
+        v2 = news_view()
+        self.assertIsNot(v2, v1)
+        self.assertNotEqual(v2.etag, v1.etag)
+        self.assertEqual([x["id"] for x in v2.items], ["b", "a"])
+        # L'ancien instantané reste intact pour ses lecteurs.
+        self.assertEqual(len(v1.items), 3)
+
+        self.assertTrue(delete_news_override())
+        self.assertNotEqual(news_view().key, v2.key)
+
+
+    def test_cursor_pages_delta_sync_and_304(self):
+        def item(i, day, **kw):
+            return {"id": f"i{i}", "category": "visa_news", "country": "Canada", "title": f"T{i}", "published_at": f"2025-12-{day:02d}T10:00:00Z", **kw}
+
+        save_news_override({"items": []})
+        save_ingested_cache({"updated_at": "u1", "items": [item(i, 1 + i) for i in range(5)]})
+        client = TestClient(main.app)
+
+        # Pages: curseur stable même si un item plus récent arrive entre deux pages.
+        r1 = client.get("/news", params={"limit": 2})
+        self.assertEqual([x["id"] for x in r1.json()["items"]], ["i4", "i3"])
+        sync = r1.json()["sync"]
+        save_ingested_cache({"updated_at": "u2", "items": [item(i, 1 + i) for i in range(5)] + [item(9, 20)]})
+        seen = [x["id"] for x in r1.json()["items"]]
+        cursor = r1.json()["next_cursor"]
+        while cursor:
+            r = client.get("/news", params={"limit": 2, "cursor": cursor})
+            self.assertEqual(r.status_code, 200)
+            seen += [x["id"] for x in r.json()["items"]]
+            cursor = r.json()["next_cursor"]
+        self.assertEqual(seen, ["i4", "i3", "i2", "i1", "i0"])
+
+        # Delta: ajouts/modifications depuis le jeton, et ids à retirer.
+        save_ingested_cache({"updated_at": "u3", "items": [item(i, 1 + i) for i in range(1, 5)] + [item(9, 20), item(2, 3, title="T2 bis"), item(3, 4, status="duplicate")]})
+        d = client.get("/news", params={"since": sync}).json()
+        self.assertEqual((d["mode"], d["reset"]), ("delta", False))
+        self.assertEqual({x["id"] for x in d["items"]}, {"i9", "i2"})
+        self.assertEqual(set(d["removed"]), {"i0", "i3"})
+        again = client.get("/news", params={"since": d["sync"]})
+        self.assertEqual((again.json()["items"], again.json()["removed"]), ([], []))
+
+        # Delta paginé: même résultat en plusieurs pages.
+        got, cur = [], None
+        while True:
+            page = client.get("/news", params={"since": cur or sync, "limit": 1}).json()
+            got += [x["id"] for x in page["items"]] + page["removed"]
+            cur = page["next_cursor"]
+            if not cur:
+                break
+        self.assertEqual(set(got), {"i9", "i2", "i0", "i3"})
+
+        # ETag par requête: 304 tant que rien ne change.
+        etag = again.headers["etag"]
+        self.assertEqual(client.get("/news", params={"since": d["sync"]}, headers={"If-None-Match": etag}).status_code, 304)
+        self.assertNotEqual(client.get("/news", headers={"If-None-Match": etag}).status_code, 304)
+
+        # Pack éditorial modifié: le client repart de la liste complète.
+        save_news_override({"items": [{"id": "p", "category": "visa_news", "country": "Canada", "title": "Pack", "published_at": "2025-12-30T10:00:00Z"}]})
+        reset = client.get("/news", params={"since": d["sync"]}).json()
+        self.assertTrue(reset["reset"])
+        self.assertEqual(reset["items"][0]["id"], "p")
+
+        self.assertEqual(client.get("/news", params={"cursor": "nope"}).status_code, 400)
+        self.assertEqual(client.get("/news", params={"cursor": r1.json()["next_cursor"], "country": "France"}).status_code, 400)
+
+
+    def test_forged_cursor_values_are_rejected(self):
+        client = TestClient(main.app)
+        base = {"v": 1, "p": news_view().pack_digest}
+        date_fp, q_fp = _filters_fp("", "", "", ""), _filters_fp("", "", "", "visa")
+        cases = [
+            ("since", {**base, "k": "sync", "f": date_fp, "w": "abc"}, {}),
+            ("since", {**base, "k": "delta", "f": date_fp, "w": 1.0, "a": [None, "x"]}, {}),
+            ("cursor", {**base, "k": "page", "f": date_fp, "w": 1.0, "a": ["abc", "x"]}, {}),
+            ("cursor", {**base, "k": "page", "f": q_fp, "w": 1.0, "o": "zz"}, {"q": "visa"}),
+        ]
+        for name, payload, extra in cases:
+            r = client.get("/news", params={name: encode_cursor(payload), **extra})
+            self.assertEqual(r.status_code, 400, payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import time
+import unittest
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import api.main as main
+from api.ocr_jobs import OcrJobQueue
+from visa_copilot_ai.documents import DocumentType
+from visa_copilot_ai.ocr_cache import OcrDiskCache
+from visa_copilot_ai.ocr_classify import guess_document_type
+
+from .test_ocr_pdf import _text_pdf
+
+
+class TestGuessDocumentType(unittest.TestCase):
+    def test_filename_text_and_fields(self):
+        self.assertEqual(guess_document_type(filename="scan_passeport.jpg")[0], DocumentType.PASSPORT)
+        dtype, conf = guess_document_type(filename="doc1.pdf", text="RELEVE DE COMPTE\nTitulaire du compte: SARA\nSolde final: 1 200,00")
+        self.assertEqual(dtype, DocumentType.BANK_STATEMENT)
+        self.assertGreater(conf, 0.5)
+        self.assertEqual(guess_document_type(extracted={"mrz_valid": True})[0], DocumentType.PASSPORT)
+        self.assertEqual(guess_document_type(filename="photo_identite.jpg"), (DocumentType.PHOTO, 0.6))
+        self.assertEqual(guess_document_type(filename="scan.pdf", text="lorem ipsum"), (DocumentType.OTHER, 0.0))
+
+
+class TestOcrBatchEndpoint(unittest.TestCase):
+    def test_zip_body_streams_ndjson(self):
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("dossier/releve_bancaire.pdf", _text_pdf(["Titulaire du compte: SARA EL AMRANI", "Solde final: 12 345,67"]))
+            zf.writestr("dossier/assurance.pdf", _text_pdf(["Assurance voyage", "Couverture: EUR 30000"]))
+            zf.writestr("__MACOSX/._assurance.pdf", b"x")
+            zf.writestr("dossier/.DS_Store", b"x")
+
+        jobs = OcrJobQueue(max_workers=2, max_pending=1, executor_kind="thread")
+        try:
+            with mock.patch.object(main, "OCR_JOBS", jobs), mock.patch("visa_copilot_ai.ocr.default_cache", return_value=OcrDiskCache("", enabled=False)):
+                r = TestClient(main.app).post("/ocr/extract/batch", content=buf.getvalue(), headers={"Content-Type": "application/zip"})
+        finally:
+            jobs.shutdown()
+
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(x) for x in r.text.splitlines() if x.strip()]
+        self.assertEqual(lines[-1]["done"], True)
+        self.assertEqual(lines[-1]["count"], 2)
+        by_index = {x["index"]: x for x in lines[:-1]}
+        self.assertEqual(by_index[0]["doc_type"], DocumentType.BANK_STATEMENT.value)
+        self.assertEqual(by_index[0]["document"]["extracted"]["ending_balance_usd"], 12345.67)
+        self.assertEqual(by_index[1]["doc_type"], DocumentType.TRAVEL_INSURANCE.value)
+        # Le champ `document` se réinjecte tel quel dans les endpoints dossier.
+        docs = main._parse_documents([x["document"] for x in lines[:-1]])
+        self.assertEqual({d.doc_type for d in docs}, {DocumentType.BANK_STATEMENT, DocumentType.TRAVEL_INSURANCE})
+
+    def test_batch_deadline_is_global(self):
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for i in range(3):
+                zf.writestr(f"releve_{i}.pdf", _text_pdf([f"Solde final: {i},00"]))
+
+        extract = main.extract_from_file
+
+        def slow(**kwargs):
+            time.sleep(0.5)
+            return extract(**kwargs)
+
+        jobs = OcrJobQueue(max_workers=2, max_pending=1, executor_kind="thread")
+        jobs.submit(fn=lambda: time.sleep(0.3))  # file occupée par une autre requête: attente de place, sans polling
+        env = {"GLOBALVISA_OCR_SYNC_TIMEOUT_SEC": "1"}
+        try:
+            with mock.patch.dict("os.environ", env), mock.patch.object(main, "OCR_JOBS", jobs), mock.patch.object(main, "extract_from_file", slow), mock.patch(
+                "visa_copilot_ai.ocr.default_cache", return_value=OcrDiskCache("", enabled=False)
+            ):
+                r = TestClient(main.app).post("/ocr/extract/batch", content=buf.getvalue(), headers={"Content-Type": "application/zip"})
+        finally:
+            jobs.shutdown()
+
+        lines = [json.loads(x) for x in r.text.splitlines() if x.strip()]
+        self.assertEqual(lines[-1]["count"], 3)
+        self.assertLess(lines[-1]["took_ms"], 1500)  # un seul délai pour tout le lot, pas un par fichier
+        self.assertEqual([x["ok"] for x in sorted(lines[:-1], key=lambda x: x["index"])], [True, False, False])
+        self.assertIn("job_id", lines[1])
+        self.assertEqual(lines[2]["error"], "File OCR pleine.")
+
+    def test_multipart_requires_content_length(self):
+        body = b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n\r\n%PDF\r\n--b--\r\n"
+        headers = {"Content-Type": "multipart/form-data; boundary=b"}
+        client = TestClient(main.app)
+        for path in ("/ocr/upload", "/ocr/extract/batch"):
+            r = client.post(path, content=iter([body]), headers=headers)  # transfert chunked
+            self.assertEqual(r.status_code, 411, path)
+        with mock.patch.dict("os.environ", {"GLOBALVISA_OCR_UPLOAD_MAX_BYTES": "10"}):
+            r = client.post("/ocr/upload", content=body + b" " * 70_000, headers=headers)
+        self.assertEqual(r.status_code, 413)
+
+    def test_too_many_files(self):
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for i in range(3):
+                zf.writestr(f"f{i}.pdf", b"%PDF")
+        with mock.patch.dict("os.environ", {"GLOBALVISA_OCR_BATCH_MAX_FILES": "2"}):
+            r = TestClient(main.app).post("/ocr/extract/batch", content=buf.getvalue(), headers={"Content-Type": "application/zip"})
+        self.assertEqual(r.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
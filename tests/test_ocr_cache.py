@@ -0,0 +1,99 @@
+import base64
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from visa_copilot_ai import ocr
+from visa_copilot_ai.ocr_cache import OcrDiskCache, cache_key
+
+
+class TestOcrDiskCache(unittest.TestCase):
+    def test_roundtrip_and_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = OcrDiskCache(d, max_bytes=10_000)
+            k1 = cache_key("a", kind="pdf", engine_version="v1")
+            self.assertNotEqual(k1, cache_key("a", kind="pdf", engine_version="v2"))
+            self.assertIsNone(c.get(k1))
+            c.put(k1, {"text": "x" * 3000})
+            self.assertEqual(c.get(k1)["text"], "x" * 3000)
+
+            k2 = cache_key("b", kind="pdf", engine_version="v1")
+            k3 = cache_key("c", kind="pdf", engine_version="v1")
+            c.put(k2, {"text": "y" * 3000})
+            # k1 plus récent que k2 -> k2 est évincé en premier.
+            past = time.time() - 60
+            os.utime(c._path(k2), (past, past))
+            c.get(k1)
+            c.put(k3, {"text": "z" * 5000})
+            self.assertIsNone(c.get(k2))
+            self.assertIsNotNone(c.get(k1))
+            self.assertIsNotNone(c.get(k3))
+            self.assertLessEqual(c.stats()["bytes"], 10_000)
+            self.assertFalse([n for n in os.listdir(os.path.dirname(c._path(k1))) if n.startswith(".tmp-")])
+
+
+class TestExtractUsesCache(unittest.TestCase):
+    def test_repeat_upload_is_cache_hit(self):
+        b64 = base64.b64encode(b"%PDF-1.4 statement").decode("ascii")
+        with tempfile.TemporaryDirectory() as d:
+            c = OcrDiskCache(d)
+            with mock.patch.object(ocr, "_extract_text_from_pdf", return_value=("Closing balance: 1,234.50", [], "pypdf")) as pdf:
+                first = ocr.extract_from_base64(content_base64=b64, mime_type="application/pdf", cache=c)
+                second = ocr.extract_from_base64(content_base64=b64, mime_type="application/pdf", cache=c)
+            self.assertEqual(pdf.call_count, 1)
+            self.assertFalse(first.cache_hit)
+            self.assertTrue(second.cache_hit)
+            self.assertEqual(second.extracted.get("ending_balance_usd"), 1234.5)
+            self.assertEqual(second.extracted["_ocr"]["fields"]["ending_balance_usd"]["start"], 17)
+            self.assertEqual(second.text, first.text)
+            self.assertTrue(ocr.ocr_result_to_dict(second)["cache_hit"])
+
+    def test_file_and_base64_paths_share_cache_entries(self):
+        from io import BytesIO
+
+        from pypdf import PdfWriter
+
+        w = PdfWriter()
+        w.add_blank_page(200, 200)
+        buf = BytesIO()
+        w.write(buf)
+        pdf = buf.getvalue()
+        with tempfile.TemporaryDirectory() as d:
+            c = OcrDiskCache(os.path.join(d, "cache"))
+            path = os.path.join(d, "doc.pdf")
+            with open(path, "wb") as f:
+                f.write(pdf)
+            first = ocr.extract_from_file(path=path, mime_type="application/pdf", cache=c)
+            self.assertEqual(first.engine, "pypdf")
+            self.assertFalse(first.cache_hit)
+            self.assertFalse(any("erreur" in x for x in first.warnings))
+            again = ocr.extract_from_base64(content_base64=base64.b64encode(pdf).decode("ascii"), mime_type="application/pdf", cache=c)
+            self.assertTrue(again.cache_hit)
+
+
+    def test_cache_files_are_private(self):
+        with tempfile.TemporaryDirectory() as d:
+            root = os.path.join(d, "shared", "cache")
+            c = OcrDiskCache(root)
+            c.put("ab" + "0" * 62, {"text": "P<FRA"})
+            self.assertEqual(os.stat(root).st_mode & 0o777, 0o700)
+            self.assertEqual(os.stat(c._path("ab" + "0" * 62)).st_mode & 0o777, 0o600)
+
+            loose = os.path.join(d, "loose")
+            os.makedirs(loose, mode=0o755)
+            os.chmod(loose, 0o755)
+            OcrDiskCache(loose).put("cd" + "0" * 62, {"text": "x"})
+            self.assertEqual(os.stat(loose).st_mode & 0o777, 0o700)
+
+            link = os.path.join(d, "link")
+            os.symlink(loose, link)
+            c2 = OcrDiskCache(link)
+            c2.put("ef" + "0" * 62, {"text": "x"})
+            self.assertFalse(c2.enabled)
+            self.assertIsNone(c2.get("cd" + "0" * 62))
+
+
+if __name__ == "__main__":
+    unittest.main()
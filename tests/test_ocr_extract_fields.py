@@ -1,6 +1,7 @@
 import unittest
 
 from visa_copilot_ai.ocr import _extract_fields_from_text
+from visa_copilot_ai.ocr_fields import CONF_LABEL, CONF_PASSPORT_FALLBACK, extract_field_matches
 
 
 class TestOcrExtractFields(unittest.TestCase):
@@ -15,6 +16,19 @@ class TestOcrExtractFields(unittest.TestCase):
         out = _extract_fields_from_text(t)
         self.assertTrue(out.get("ending_balance_usd") in (1234.5, 1234.50))
 
+    def test_labelled_passport_wins_over_other_tokens(self):
+        out = _extract_fields_from_text("Ref XY99999\nPassport No: 12345678")
+        self.assertEqual(out.get("passport_number"), "12345678")
+
+    def test_matches_report_positions_and_confidence(self):
+        t = "Account holder: JANE DOE\nRef AB123456\nClosing balance: 1,234.50"
+        m = extract_field_matches(t)
+        bal = m["ending_balance_usd"]
+        self.assertEqual(t[bal.start : bal.end], "1,234.50")
+        self.assertEqual(bal.confidence, CONF_LABEL)
+        self.assertEqual(t[m["account_holder_name"].start : m["account_holder_name"].end], "JANE DOE")
+        self.assertEqual(m["passport_number"].confidence, CONF_PASSPORT_FALLBACK)
+
 
 if __name__ == "__main__":
     unittest.main()
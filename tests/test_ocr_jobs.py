@@ -0,0 +1,73 @@
+import base64
+import os
+import threading
+import unittest
+
+from api.ocr_jobs import WORKER_CRASHED, BrokenProcessPool, FutureTimeoutError, OcrJobNotFound, OcrJobQueue, OcrQueueFull
+
+
+def _crash(**_kwargs):
+    os._exit(1)  # comme un OOM kill: le pool de processus est cassé
+
+
+class TestOcrJobQueue(unittest.TestCase):
+    def test_backpressure_and_polling(self):
+        gate = threading.Event()
+
+        def slow_worker(*, content_base64, mime_type):
+            gate.wait(5)
+            return {"mime": mime_type}
+
+        q = OcrJobQueue(worker=slow_worker, max_workers=1, max_pending=2, executor_kind="thread")
+        try:
+            j1 = q.submit(content_base64="x", mime_type="a")
+            j2 = q.submit(content_base64="x", mime_type="b")
+            with self.assertRaises(OcrQueueFull):
+                q.submit(content_base64="x", mime_type="c")
+            self.assertIn(j2.status, {"queued", "running"})
+            with self.assertRaises(FutureTimeoutError):
+                q.wait(j1, 0.05)
+
+            gate.set()
+            self.assertEqual(q.wait(j2, 5), {"mime": "b"})
+            self.assertEqual(q.get(j1.id).status, "done")
+            self.assertEqual(q.stats()["rejected"], 1)
+            # La file s'est libérée.
+            q.wait(q.submit(content_base64="x", mime_type="d"), 5)
+            with self.assertRaises(OcrJobNotFound):
+                q.get("inconnu")
+        finally:
+            gate.set()
+            q.shutdown()
+
+    def test_process_pool_runs_real_extraction(self):
+        q = OcrJobQueue(max_workers=1, max_pending=4)
+        try:
+            job = q.submit(content_base64=base64.b64encode(b"hello").decode("ascii"), mime_type="text/plain")
+            res = q.wait(job, 30)
+            self.assertTrue(res.ok)
+            self.assertEqual(res.engine, "none")
+            self.assertEqual(job.status, "done")
+        finally:
+            q.shutdown()
+
+
+    def test_pool_is_recreated_after_worker_crash(self):
+        q = OcrJobQueue(max_workers=1, max_pending=4)
+        hello = base64.b64encode(b"hello").decode("ascii")
+        try:
+            crashed = q.submit(fn=_crash)
+            with self.assertRaises(BrokenProcessPool):
+                q.wait(crashed, 30)
+            # Soumis aussitôt, avant ou après le callback du crash: jamais sur le pool cassé.
+            job = q.submit(content_base64=hello, mime_type="text/plain")
+            self.assertTrue(q.wait(job, 30).ok)
+            self.assertEqual(crashed.status, "failed")
+            self.assertEqual(crashed.error, WORKER_CRASHED)
+            self.assertEqual(q.stats()["pending"], 0)
+        finally:
+            q.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import base64
+import multiprocessing
+import os
+import unittest
+from io import BytesIO
+from unittest import mock
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from visa_copilot_ai import ocr
+from visa_copilot_ai.ocr_cache import OcrDiskCache
+
+
+def _text_pdf(pages: list[str]) -> bytes:
+    w = PdfWriter()
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    font_ref = w._add_object(font)
+    for text in pages:
+        page = w.add_blank_page(612, 792)
+        ops = [f"BT /F1 11 Tf 40 {750 - 14 * i} Td ({line}) Tj ET" for i, line in enumerate(text.splitlines())]
+        stream = DecodedStreamObject()
+        stream.set_data("\n".join(ops).encode("latin-1"))
+        page[NameObject("/Contents")] = w._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref})})
+    buf = BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+
+def _extract(pdf: bytes, **kwargs):
+    return ocr.extract_from_base64(
+        content_base64=base64.b64encode(pdf).decode("ascii"),
+        mime_type="application/pdf",
+        cache=OcrDiskCache("", enabled=False),
+        **kwargs,
+    )
+
+
+class TestPdfExtraction(unittest.TestCase):
+    def setUp(self):
+        # 20 pages de mouvements, solde de clôture en dernière page (au-delà de l'ancien plafond de 12).
+        self.pages = [f"Statement page {i + 1}" for i in range(19)] + ["Account holder: JANE DOE\nClosing balance: 2,500.00"]
+        self.pdf = _text_pdf(self.pages)
+
+    def test_reads_past_twelve_pages(self):
+        res = _extract(self.pdf)
+        self.assertEqual(res.extracted.get("ending_balance_usd"), 2500.0)
+        self.assertEqual(res.extracted.get("account_holder_name"), "JANE DOE")
+        self.assertEqual(res.warnings, [])
+
+    def test_page_budget_truncation_is_reported(self):
+        with mock.patch.dict(os.environ, {"GLOBALVISA_OCR_PDF_MAX_PAGES": "5"}):
+            res = _extract(self.pdf)
+        self.assertNotIn("ending_balance_usd", res.extracted)
+        self.assertIn("Statement page 5", res.text)
+        self.assertNotIn("Statement page 6", res.text)
+        self.assertTrue(any("20 pages" in w for w in res.warnings))
+
+    def test_early_stop_once_targets_found(self):
+        pdf = _text_pdf(["Closing balance: 10.00"] + [f"Detail {i}" for i in range(10)])
+        res = _extract(pdf, fields=["ending_balance_usd"])
+        self.assertEqual(res.extracted.get("ending_balance_usd"), 10.0)
+        self.assertNotIn("Detail", res.text)
+
+    def test_parallel_pages_match_serial(self):
+        pages = [f"Line {i}" for i in range(40)] + ["Closing balance: 42.00"]
+        pdf = _text_pdf(pages)
+        serial = _extract(pdf)
+        with mock.patch.dict(os.environ, {"GLOBALVISA_OCR_PDF_WORKERS": "2"}):
+            parallel = _extract(pdf)
+        self.assertEqual(parallel.text, serial.text)
+        self.assertEqual(parallel.extracted.get("ending_balance_usd"), 42.0)
+        self.assertEqual(multiprocessing.active_children(), [])  # pool fermé avec le document
+
+
+if __name__ == "__main__":
+    unittest.main()
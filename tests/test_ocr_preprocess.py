@@ -0,0 +1,57 @@
+import unittest
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+from visa_copilot_ai.ocr_preprocess import PRESETS, PreprocessConfig, estimate_skew, open_image, otsu_threshold, preprocess_image
+
+
+def _page(w=2400, h=3200) -> Image.Image:
+    img = Image.new("L", (w, h), 240)
+    d = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=48)
+    for i in range(28):
+        d.text((120, 120 + i * 100), f"Closing balance line {i} 1,234.50 ACCOUNT HOLDER", fill=20, font=font)
+    return img
+
+
+def _jpeg(img: Image.Image, orientation: int = 1) -> bytes:
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    buf = BytesIO()
+    img.convert("RGB").save(buf, "JPEG", quality=90, exif=exif)
+    return buf.getvalue()
+
+
+class TestOcrPreprocess(unittest.TestCase):
+    def test_exif_orientation_and_downscale(self):
+        # Orientation 6: image stockée couchée, affichée debout après transposition.
+        data = _jpeg(_page(3000, 4000).transpose(Image.ROTATE_90), orientation=6)
+        out = preprocess_image(BytesIO(data), PRESETS["balanced"])
+        self.assertEqual(out.mode, "L")
+        self.assertEqual(out.width, PRESETS["balanced"].max_width)
+        self.assertGreater(out.height, out.width)
+
+    def test_jpeg_draft_decodes_at_reduced_size(self):
+        cfg = PreprocessConfig(name="t", target_dpi=100)  # ~827 px
+        img = open_image(BytesIO(_jpeg(_page())), cfg)
+        self.assertLess(img.width, 2400)
+        self.assertGreaterEqual(img.width, int(cfg.max_width * 0.85))
+        self.assertEqual(img.mode, "L")
+
+    def test_binarize_outputs_two_levels(self):
+        out = preprocess_image(BytesIO(_jpeg(_page(800, 600))), PRESETS["fast"])
+        self.assertLessEqual(set(out.getdata()), {0, 255})
+        self.assertTrue(50 < otsu_threshold(_page(400, 300)) < 240)
+
+    def test_deskew_estimates_rotation(self):
+        skewed = _page().rotate(3, expand=True, fillcolor=240)
+        self.assertAlmostEqual(estimate_skew(skewed), -3.0, delta=0.5)
+
+    def test_none_preset_keeps_full_resolution_rgb(self):
+        out = preprocess_image(BytesIO(_jpeg(_page(1000, 800))), PRESETS["none"])
+        self.assertEqual((out.mode, out.size), ("RGB", (1000, 800)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
+import random
 import unittest
+from unittest import mock
 
-from visa_copilot_ai.offices import list_offices
-from visa_copilot_ai.news import list_news
+from visa_copilot_ai.offices import _parse_office, list_offices, office_index, office_to_dict
+from visa_copilot_ai.news import NewsIndex, list_news, news_index
 
 
 class TestOfficesAndNews(unittest.TestCase):
@@ -22,6 +24,54 @@ class TestOfficesAndNews(unittest.TestCase):
         self.assertEqual(len(out3), 1)
         self.assertEqual(out3[0]["id"], "2")
 
+    def test_office_index_matches_linear_scan(self):
+        rnd = random.Random(3)
+        offices = [
+            {
+                "id": f"o{i}",
+                "type": rnd.choice(["embassy", "VFS", "tls", "consulate"]),
+                "name": rnd.choice(["Ambassade", "Centre", "consulat"]) + f" {i % 7}",
+                "country": rnd.choice(["France", "france ", "Canada", "Maroc"]),
+                "city": rnd.choice(["Paris", "Lyon", "Rabat", " paris"]),
+                "address": rnd.choice(["rue A", "bd B"]),
+                "services": rnd.sample(["visa", "Biometrics", "passport"], k=rnd.randint(0, 2)),
+                "hours": [{"day": "mon", "open": "09:00", "close": rnd.choice(["11:00", "17:00"])}],
+            }
+            for i in range(120)
+        ]
+        data = {"offices": offices}
+        idx = office_index(offices)
+        self.assertIs(office_index(offices), idx)
+
+        def linear(country="", city="", office_type="", service="", q=""):
+            out = [_parse_office(raw) for raw in offices]
+            out = [
+                o
+                for o in out
+                if (not country or o.country.lower() == country)
+                and (not city or o.city.lower() == city)
+                and (not office_type or o.type == office_type)
+                and (not service or service in o.services)
+                and (not q or q in " ".join([o.name, o.country, o.city, o.address, " ".join(o.services)]).lower())
+            ]
+            out.sort(key=lambda o: (o.country.lower(), o.city.lower(), o.name.lower()))
+            return [office_to_dict(o) for o in out]
+
+        for kwargs in [
+            {},
+            {"country": "france"},
+            {"country": "france", "city": "paris", "service": "visa"},
+            {"office_type": "vfs"},
+            {"service": "biometrics", "q": "centre"},
+            {"q": "rue a"},
+            {"country": "japon"},
+        ]:
+            self.assertEqual(list_offices(data=data, **kwargs), linear(**kwargs), kwargs)
+
+        out = list_offices(country="France", data=data)
+        out[0]["official_url_verdict"] = None  # ajouté par /offices?verify_urls=true
+        self.assertNotIn("official_url_verdict", list_offices(country="France", data=data)[0])
+
     def test_news_filters_and_sort(self):
         data = {
             "items": [
@@ -36,6 +86,114 @@ class TestOfficesAndNews(unittest.TestCase):
         self.assertEqual(len(out2), 1)
         self.assertEqual(out2[0]["id"], "b")
 
+    def test_news_index_matches_linear_scan(self):
+        rnd = random.Random(7)
+        words = ["visa", "étudiant", "permis", "travail", "Canada", "frais", "biométrie", "délai"]
+        items = []
+        for i in range(300):
+            items.append(
+                {
+                    "id": f"n{i}",
+                    "category": rnd.choice(["visa_news", "law_change", "LAW_CHANGE"]),
+                    "country": rnd.choice(["Canada", "France", "canada ", "Maroc"]),
+                    "tags": rnd.sample(["students", "Work", "fees", "biometrics"], k=rnd.randint(0, 2)),
+                    "title": " ".join(rnd.choices(words, k=4)),
+                    "published_at": rnd.choice(["", "bad", "2025-12-20", f"2025-12-{rnd.randint(1, 28):02d}T10:00:00Z"]),
+                    "status": rnd.choice(["published", "published", "draft"]),
+                }
+            )
+        data = {"items": items}
+        idx = news_index(items)
+        self.assertIs(news_index(items), idx)
+
+        def linear(country="", category="", tag="", published_only=True):
+            out = []
+            for raw in items:
+                n = idx.items[[x.id for x in idx.items].index(raw["id"])]
+                if (published_only and n.status != "published") or (country and n.country.lower() != country):
+                    continue
+                if (category and n.category != category) or (tag and tag not in n.tags):
+                    continue
+                out.append(n.id)
+            return sorted(out, key=lambda i: [x.id for x in idx.items].index(i))
+
+        for kwargs in [
+            {},
+            {"country": "canada"},
+            {"country": "france", "category": "law_change"},
+            {"tag": "work"},
+            {"tag": "fees", "published_only": False},
+        ]:
+            got = [x["id"] for x in list_news(data=data, limit=200, **kwargs)]
+            self.assertEqual(got, linear(**kwargs)[:200], kwargs)
+
+        # Dates naïves et avec fuseau comparables; dates illisibles en dernier.
+        ts = idx.sort_ts
+        self.assertEqual(ts, sorted(ts, reverse=True))
+
+        # Avec q: uniquement des items contenant les termes (forme repliée et racinisée), filtres respectés.
+        for x in list_news(data=data, limit=200, q="Permis travail", country="canada"):
+            self.assertEqual(x["country"].lower(), "canada")
+            self.assertIn("permis", x["title"].lower())
+            self.assertIn("travail", x["title"].lower())
+
+    def test_news_search_bm25_ranking(self):
+        items = [
+            {"id": "fr", "country": "France", "category": "law_change", "title": "Permis de travail pour les étudiants étrangers", "published_at": "2025-11-01T10:00:00Z"},
+            {"id": "ca", "country": "Canada", "category": "visa_news", "title": "Student work permits: new rules", "published_at": "2025-12-01T10:00:00Z", "reliability_score": 0.85},
+            {"id": "fees", "country": "Canada", "category": "visa_news", "title": "Work permit fees increase", "published_at": "2025-12-20T10:00:00Z"},
+            {"id": "noise", "country": "Canada", "category": "visa_news", "title": "Biometrics centre opening hours", "published_at": "2025-12-21T10:00:00Z"},
+            {"id": "old_dup", "country": "Canada", "category": "visa_news", "title": "Student work permit", "published_at": "2024-01-01T10:00:00Z", "reliability_score": 0.85},
+        ]
+        idx = NewsIndex(items)
+        got = [x.id for x in idx.search(q="student work permit")]
+        self.assertEqual(got[0], "ca")
+        self.assertNotIn("noise", got)
+        self.assertLess(got.index("ca"), got.index("old_dup"))  # même texte ou presque: le plus récent devant
+        self.assertEqual([x.id for x in idx.search(q="étudiante travail")], ["fr"])  # accents et flexions
+        self.assertEqual(sorted(x.id for x in idx.search(q="permit", country="canada", limit=2)), ["ca", "fees"])
+        self.assertEqual([x.id for x in idx.search(q="the")], [x.id for x in idx.search()])  # que des mots vides: ignoré
+
+        # Incrémental: l'index texte est repris, seul le nouvel item est ajouté; l'ancien index reste valide.
+        docs = len(idx.text.doc_len)
+        before = idx._relevance("student work permit", [], 10)
+        with mock.patch.object(NewsIndex, "_relevance_numpy", return_value=None):
+            before_py = idx._relevance("student work permit", [], 10)
+        new = {"id": "new", "country": "Canada", "category": "visa_news", "title": "Student work permit cap announced", "published_at": "2025-12-22T10:00:00Z"}
+        idx2 = NewsIndex(items[1:] + [new], previous=idx)
+        self.assertIs(idx2.text, idx.text)
+        self.assertEqual(len(idx2.text.doc_len), docs + 1)
+        self.assertEqual(len(idx2.text), 5)
+        self.assertIn("new", [x.id for x in idx2.search(q="student work permit")])
+        self.assertNotIn("fr", [x.id for x in idx2.search(q="permis travail")])
+        self.assertEqual([x.id for x in idx.search(q="étudiante travail")], ["fr"])
+        # Instantané immuable: mêmes scores (idf, longueur moyenne) malgré l'index texte partagé et modifié.
+        self.assertEqual(idx._relevance("student work permit", [], 10), before)
+        with mock.patch.object(NewsIndex, "_relevance_numpy", return_value=None):
+            self.assertEqual(idx._relevance("student work permit", [], 10), before_py)
+
+    def test_news_search_python_and_numpy_agree(self):
+        rnd = random.Random(3)
+        words = ["visa", "étudiant", "permis", "travail", "work", "permit", "student", "fees", "frais", "délai"]
+        items = [
+            {
+                "id": f"n{i}",
+                "country": rnd.choice(["Canada", "France"]),
+                "title": " ".join(rnd.choices(words, k=rnd.randint(2, 8))),
+                "published_at": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T10:00:00Z",
+                "status": rnd.choice(["published", "published", "draft"]),
+                "reliability_score": rnd.choice([0.5, 0.65, 0.85]),
+            }
+            for i in range(400)
+        ]
+        idx = NewsIndex(items)
+        queries = [dict(q="student work permit"), dict(q="permis travail", country="france"), dict(q="frais", published_only=False, limit=7)]
+        fast = [[x.id for x in idx.search(**kw)] for kw in queries]
+        with mock.patch.object(NewsIndex, "_relevance_numpy", return_value=None):
+            slow = [[x.id for x in idx.search(**kw)] for kw in queries]
+        self.assertEqual(fast, slow)
+        self.assertTrue(all(fast))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,46 @@
+import time
+import unittest
+
+from api.response_cache import ResponseCache, canonical_key
+from visa_copilot_ai.models import EmploymentStatus, TravelPurpose, UserProfile
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_canonical_key_ignores_dict_order_and_handles_dataclasses(self):
+        p = UserProfile(
+            nationality="MA",
+            age=30,
+            profession="dev",
+            employment_status=EmploymentStatus.EMPLOYED,
+            travel_purpose=TravelPurpose.TOURISM,
+            travel_history_trips_last_5y=1,
+            prior_visa_refusals=0,
+        )
+        self.assertEqual(canonical_key("x", {"a": 1, "b": 2}, p), canonical_key("x", {"b": 2, "a": 1}, p))
+        self.assertNotEqual(canonical_key("x", p, "2026-01-01"), canonical_key("x", p, "2026-01-02"))
+
+    def test_lru_and_byte_eviction(self):
+        cache = ResponseCache(enabled=True, ttl_sec=60, max_entries=2, max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        self.assertEqual(cache.get("a"), b"1234")  # a devient le plus récent
+        cache.put("c", b"1234")  # dépasse 10 octets -> évince b
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+        cache.put("big", b"x" * 11)
+        self.assertIsNone(cache.get("big"))
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 10)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["too_large"], 1)
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(enabled=True, ttl_sec=0.01)
+        cache.put("k", b"{}")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["expired"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
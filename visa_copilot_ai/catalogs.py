@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
 
+from .content_cache import load_json
+
 
 def _resources_dir() -> Path:
     return Path(__file__).resolve().parent / "resources"
@@ -12,11 +13,10 @@ def _resources_dir() -> Path:
 
 def load_resource_json(filename: str) -> dict[str, Any]:
     """
-    Charge un JSON depuis visa_copilot_ai/resources/.
+    Charge un JSON depuis visa_copilot_ai/resources/ (via le cache de contenu: lecture seule).
     """
     path = _resources_dir() / filename
-    raw = path.read_text(encoding="utf-8")
-    return json.loads(raw)
+    return load_json(str(path)).data
 
 
 @dataclass(frozen=True)
@@ -24,11 +24,13 @@ class CatalogPack:
     source: str
     path: str
     data: dict[str, Any]
+    version: int = 0
 
 
 def load_catalog(filename: str) -> CatalogPack:
     path = _resources_dir() / filename
-    return CatalogPack(source="bundled", path=str(path), data=load_resource_json(filename))
+    entry = load_json(str(path))
+    return CatalogPack(source="bundled", path=str(path), data=entry.data, version=entry.version)
 
 
 def list_portals(
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class CachedJson:
+    """
+    Pack JSON parsé et partagé entre requêtes.
+
+    Important: `data` est partagé par tous les appelants -> lecture seule.
+    `version` est unique par chargement (change dès que le fichier change).
+    """
+
+    data: Any
+    path: str
+    version: int
+
+
+@dataclass
+class _Entry:
+    value: Optional[CachedJson]  # None => fichier absent (cache négatif)
+    stamp: Optional[tuple[int, int]]  # (mtime_ns, size)
+    checked_at: float
+
+
+_VERSIONS = count(1)
+
+
+def resource_path(filename: str) -> str:
+    """
+    Chemin d'un fichier embarqué dans visa_copilot_ai/resources/.
+    """
+
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", filename)
+
+
+def _default_revalidate_sec() -> float:
+    try:
+        return max(0.0, float(os.getenv("GLOBALVISA_CONTENT_CACHE_REVALIDATE_SEC", "2") or 0))
+    except Exception:
+        return 2.0
+
+
+def _stat_stamp(path: str) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (int(st.st_mtime_ns), int(st.st_size))
+
+
+class ContentCache:
+    """
+    Cache en mémoire des packs de contenu (JSON), revalidé par stat (mtime/size).
+
+    - Hit: aucune lecture ni parsing JSON.
+    - Revalidation au plus toutes les `revalidate_sec` secondes par fichier
+      (les autres workers uvicorn voient donc une mise à jour admin sous ce délai).
+    - `invalidate()` force le rechargement (appelé par les endpoints admin PUT/DELETE).
+    """
+
+    def __init__(self, *, revalidate_sec: Optional[float] = None) -> None:
+        self.revalidate_sec = _default_revalidate_sec() if revalidate_sec is None else max(0.0, float(revalidate_sec))
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stats_calls = 0
+        self._invalidations = 0
+
+    def load_json_optional(self, path: str) -> Optional[CachedJson]:
+        """
+        Retourne le JSON parsé, ou None si le fichier n'existe pas.
+        Les erreurs de parsing remontent à l'appelant (comme json.load).
+        """
+
+        key = os.path.abspath(str(path))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (now - entry.checked_at) < self.revalidate_sec:
+                self._hits += 1
+                return entry.value
+
+        stamp = _stat_stamp(key)
+        with self._lock:
+            self._stats_calls += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                entry.checked_at = now
+                self._hits += 1
+                return entry.value
+
+        value: Optional[CachedJson] = None
+        if stamp is not None:
+            with open(key, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            value = CachedJson(data=data, path=str(path), version=next(_VERSIONS))
+
+        with self._lock:
+            self._misses += 1
+            self._entries[key] = _Entry(value=value, stamp=stamp, checked_at=now)
+        return value
+
+    def load_json(self, path: str) -> CachedJson:
+        value = self.load_json_optional(path)
+        if value is None:
+            raise FileNotFoundError(str(path))
+        return value
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        with self._lock:
+            self._invalidations += 1
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(str(path)), None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "stat_calls": self._stats_calls,
+                "invalidations": self._invalidations,
+                "revalidate_sec": self.revalidate_sec,
+            }
+
+
+class DerivedCache:
+    """
+    Petit LRU de structures dérivées (index...) d'objets servis par le cache de contenu.
+
+    Clé = identité de l'objet source: le cache sert le même objet tant que le fichier ne change pas,
+    un rechargement donne un nouvel objet (donc une nouvelle entrée). La source ne doit pas être mutée.
+    """
+
+    def __init__(self, build: Callable[[Any], Any], *, size: int = 4) -> None:
+        self.build = build
+        self.size = max(1, int(size))
+        self._entries: "OrderedDict[int, tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source: Any) -> Any:
+        k = id(source)
+        with self._lock:
+            hit = self._entries.get(k)
+            if hit is not None and hit[0] is source:  # id() réutilisé après libération: pas un hit
+                self._entries.move_to_end(k)
+                return hit[1]
+        value = self.build(source)  # hors verrou: deux builds concurrents possibles, le dernier reste
+        with self._lock:
+            self._entries[k] = (source, value)
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+
+_DEFAULT = ContentCache()
+
+
+def default_cache() -> ContentCache:
+    return _DEFAULT
+
+
+def load_json(path: str) -> CachedJson:
+    return _DEFAULT.load_json(path)
+
+
+def load_json_optional(path: str) -> Optional[CachedJson]:
+    return _DEFAULT.load_json_optional(path)
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    _DEFAULT.invalidate(path)
+
+
+def cache_stats() -> dict[str, Any]:
+    return _DEFAULT.stats()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
+from collections import OrderedDict
 from dataclasses import dataclass, field
 import os
-from typing import Any, Optional
+import threading
+from typing import Any, Iterator, Optional, Sequence
 
-import importlib.resources as pkg_resources
+from .content_cache import CachedJson, load_json, resource_path
 
 
 @dataclass(frozen=True)
@@ -69,24 +70,27 @@ def _norm(s: Any) -> str:
     return " ".join(str(s or "").strip().split())
 
 
-def _load_rules() -> dict[str, Any]:
+def _rules_entry() -> CachedJson:
     """
     Source de règles:
     - Par défaut: ressources versionnées dans le repo.
     - Override possible via env var GLOBALVISA_RULES_PATH (modifiable sans changer le code).
+    Les packs sont servis depuis le cache de contenu (revalidation par mtime/size).
     """
 
     override = os.getenv("GLOBALVISA_RULES_PATH", "").strip()
     if override:
         try:
-            with open(override, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return load_json(override)
         except Exception:
             # fallback to embedded rules
             pass
 
-    with pkg_resources.files("visa_copilot_ai").joinpath("resources/visa_rules.json").open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json(resource_path("visa_rules.json"))
+
+
+def _load_rules() -> dict[str, Any]:
+    return _rules_entry().data
 
 
 def _merge_dict(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
@@ -256,7 +260,7 @@ CRITERIA_LABELS = {
 
 def _ai_reasoning(
     *,
-    weights: dict[str, Any],
+    weight_items: tuple[tuple[str, float], ...],
     subs: dict[str, float],
     total_w: float,
     missing: list[str],
@@ -279,13 +283,7 @@ def _ai_reasoning(
     strengths: list[dict[str, Any]] = []
     weaknesses: list[dict[str, Any]] = []
 
-    for k, w in weights.items():
-        try:
-            wf = float(w)
-        except Exception:
-            continue
-        if wf <= 0:
-            continue
+    for k, wf in weight_items:
         s = float(subs.get(k, 0.4))
         contrib = (wf * s) / total_w  # 0..1
         gap = (wf * (1.0 - s)) / total_w
@@ -319,6 +317,281 @@ def _ai_reasoning(
     }
 
 
+GENERIC_IMPROVEMENT_HINTS = {
+    "language": "Améliorer le niveau de langue ou fournir une preuve standardisée.",
+    "financial_capacity": "Renforcer les preuves financières (épargne/revenus/sponsor) selon l’officiel.",
+    "experience": "Augmenter et documenter l’expérience professionnelle pertinente.",
+    "education": "Clarifier/renforcer le niveau d’études et fournir les justificatifs.",
+    "sponsor": "Ajouter un sponsor conforme si requis/utile.",
+}
+
+
+def _opt_float(x: Any) -> Optional[float]:
+    return None if x is None else float(x)
+
+
+@dataclass(frozen=True)
+class CompiledVisaType:
+    """
+    Type de visa "pré-résolu": poids, seuils, exigences et hints déjà parsés.
+    """
+
+    key: str
+    label: str
+    green: int
+    orange: int
+    weight_names: frozenset[str]  # toutes les clés de 'weights' (même non numériques)
+    parsed_weights: tuple[tuple[str, float], ...]  # poids numériques (ordre config)
+    weight_items: tuple[tuple[str, float], ...]  # poids > 0 (servent au score)
+    total_w: float
+    min_exp_raw: Any
+    min_exp: Optional[float]
+    rec_exp: Optional[float]
+    min_lang_raw: Any
+    min_lang: Optional[float]
+    min_fin_raw: Any
+    min_fin: Optional[float]
+    rec_fin: Optional[float]
+    requires_sponsor: bool
+    improvement_hints: dict[str, str]  # critère -> hint (config, sinon générique)
+    requirements: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class CompiledCountry:
+    key: str  # clé pays résolue (ex: "canada", "default")
+    visa_types: tuple[CompiledVisaType, ...]
+
+
+def _compile_visa_type(visa_key: str, visa_cfg: dict[str, Any]) -> CompiledVisaType:
+    thresholds = visa_cfg.get("thresholds") or {}
+    weights = visa_cfg.get("weights") or {}
+    req = visa_cfg.get("requirements") or {}
+    hints = visa_cfg.get("improvement_hints") or {}
+
+    parsed: list[tuple[str, float]] = []
+    for k, w in weights.items():
+        try:
+            parsed.append((k, float(w)))
+        except Exception:
+            continue
+    positive = tuple((k, wf) for k, wf in parsed if wf > 0)
+    total_w = 0.0
+    for _, wf in positive:
+        total_w += wf
+
+    resolved_hints: dict[str, str] = {}
+    for k, _ in parsed:
+        hint = hints.get(k)
+        if hint:
+            resolved_hints[k] = str(hint)
+        elif k in GENERIC_IMPROVEMENT_HINTS:
+            resolved_hints[k] = GENERIC_IMPROVEMENT_HINTS[k]
+
+    min_exp = req.get("min_experience_years")
+    min_lang = req.get("min_language_band")
+    min_fin = req.get("min_financial_capacity_usd")
+    return CompiledVisaType(
+        key=str(visa_key),
+        label=str(visa_cfg.get("label") or visa_key),
+        green=int(thresholds.get("green", 70)),
+        orange=int(thresholds.get("orange", 40)),
+        weight_names=frozenset(weights.keys()),
+        parsed_weights=tuple(parsed),
+        weight_items=positive,
+        total_w=total_w,
+        min_exp_raw=min_exp,
+        min_exp=_opt_float(min_exp),
+        rec_exp=_opt_float(req.get("recommended_experience_years")),
+        min_lang_raw=min_lang,
+        min_lang=_opt_float(min_lang),
+        min_fin_raw=min_fin,
+        min_fin=_opt_float(min_fin),
+        rec_fin=_opt_float(req.get("recommended_financial_capacity_usd")),
+        requires_sponsor=bool(req.get("requires_sponsor", False)),
+        improvement_hints=resolved_hints,
+        requirements=dict(req) if isinstance(req, dict) else {},
+    )
+
+
+class CompiledRules:
+    """
+    Règles d'éligibilité compilées une fois par version de règles:
+    - héritage pays (default/inherits) résolu une seule fois par pays
+    - poids/seuils/exigences convertis (float/int) une seule fois
+
+    Les pays sont compilés à la demande (une erreur de config reste locale au pays).
+    """
+
+    def __init__(self, rules: dict[str, Any]) -> None:
+        self.rules = rules
+        countries = rules.get("countries", {})
+        self._countries: dict[str, Any] = countries if isinstance(countries, dict) else {}
+        self._compiled: dict[str, CompiledCountry] = {}
+        self._lock = threading.Lock()
+
+    def resolve_key(self, country: str) -> str:
+        c_key = _norm(country).lower()
+        if not c_key or not isinstance(self._countries.get(c_key), dict):
+            return "default"
+        return c_key
+
+    def supported_countries(self) -> list[str]:
+        return [k for k in self._countries.keys() if k and k != "default"]
+
+    def country(self, country: str) -> CompiledCountry:
+        key = self.resolve_key(country)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+
+        country_rules = _select_country_rules(self.rules, key)
+        visa_types = country_rules.get("visa_types") or {}
+        compiled = CompiledCountry(
+            key=key,
+            visa_types=tuple(
+                _compile_visa_type(vk, vc) for vk, vc in visa_types.items() if isinstance(vc, dict)
+            ),
+        )
+        with self._lock:
+            self._compiled.setdefault(key, compiled)
+        return self._compiled[key]
+
+
+_COMPILED_CACHE_SIZE = 4
+_COMPILED: "OrderedDict[int, CompiledRules]" = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+
+
+def compile_rules(rules: dict[str, Any]) -> CompiledRules:
+    """
+    Retourne les règles compilées pour cet objet de règles.
+
+    Les packs viennent du cache de contenu: le même objet dict est servi tant que
+    la source ne change pas (save/delete override => nouvel objet => recompilation).
+    Un objet de règles ne doit donc pas être muté après usage.
+    """
+
+    key = id(rules)
+    with _COMPILED_LOCK:
+        compiled = _COMPILED.get(key)
+        if compiled is not None and compiled.rules is rules:
+            _COMPILED.move_to_end(key)
+            return compiled
+        compiled = CompiledRules(rules)
+        _COMPILED[key] = compiled
+        while len(_COMPILED) > _COMPILED_CACHE_SIZE:
+            _COMPILED.popitem(last=False)
+        return compiled
+
+
+def _profile_invariant_subscores(user: EligibilityUserProfile) -> dict[str, float]:
+    """
+    Sous-scores qui ne dépendent ni du pays ni du type de visa (calculés une fois par profil).
+    """
+
+    return {
+        "age": _score_age(user.age),
+        "education": _score_education(user.education_level),
+        "field_of_study": _score_field(user.field_of_study),
+        "marital_status": _score_marital(user.marital_status),
+        "travel_history": _score_travel_history(user.travel_history_trips_last_5y, user.prior_visa_refusals),
+    }
+
+
+def _profile_subscores(user: EligibilityUserProfile, country: str) -> dict[str, float]:
+    """
+    Sous-scores qui ne dépendent pas du type de visa (calculés une fois par profil/pays).
+    """
+
+    base = _profile_invariant_subscores(user)
+    base["destination_fit"] = _score_destination_fit(user.destination_country, country)
+    return base
+
+
+def _visa_subscores(user: EligibilityUserProfile, vt: CompiledVisaType, base: dict[str, float]) -> dict[str, float]:
+    return {
+        "age": base["age"],
+        "education": base["education"],
+        "field_of_study": base["field_of_study"],
+        "experience": _score_experience(user.years_experience, vt.min_exp, vt.rec_exp),
+        "marital_status": base["marital_status"],
+        "language": _score_language(user.language, vt.min_lang),
+        "financial_capacity": _score_finances(user.financial_capacity_usd, vt.min_fin, vt.rec_fin),
+        "travel_history": base["travel_history"],
+        "sponsor": _score_sponsor(user.sponsor_available, vt.requires_sponsor),
+        "destination_fit": base["destination_fit"],
+    }
+
+
+def _weighted_score(vt: CompiledVisaType, subs: dict[str, float]) -> int:
+    if vt.total_w <= 0:
+        return 0
+    acc = 0.0
+    for k, wf in vt.weight_items:
+        acc += wf * subs.get(k, 0.4)
+    return int(round(_clamp(acc / vt.total_w, 0.0, 1.0) * 100))
+
+
+def _missing_requirements(user: EligibilityUserProfile, vt: CompiledVisaType) -> list[str]:
+    # Missing requirements (business logic, not only missing fields)
+    missing: list[str] = []
+    if vt.requires_sponsor and not user.sponsor_available:
+        missing.append("Sponsor / offre / invitation requis(e) selon ce visa (à vérifier sur la source officielle).")
+    if vt.min_exp is not None and user.years_experience < vt.min_exp:
+        missing.append(f"Expérience minimale: {vt.min_exp_raw} an(s) (estimé).")
+    if vt.min_lang is not None and (user.language.band is None or float(user.language.band) < vt.min_lang):
+        missing.append(f"Niveau de langue minimal: band {vt.min_lang_raw} (estimé).")
+    if vt.min_fin is not None and (user.financial_capacity_usd is None or float(user.financial_capacity_usd) < vt.min_fin):
+        missing.append(f"Capacité financière minimale estimée: {vt.min_fin_raw} USD.")
+    if not _norm(user.education_level) and "education" in vt.weight_names:
+        missing.append("Niveau d’études non renseigné.")
+    if not _norm(user.field_of_study) and "field_of_study" in vt.weight_names:
+        missing.append("Domaine de formation non renseigné.")
+    return missing
+
+
+def _build_result(
+    user: EligibilityUserProfile,
+    vt: CompiledVisaType,
+    subs: dict[str, float],
+    score: int,
+    country_label: str,
+    missing: Optional[list[str]] = None,
+) -> VisaEligibilityResult:
+    color = _color_from_score(score, vt.green, vt.orange)
+    message = _message_from_color(color)
+    if missing is None:
+        missing = _missing_requirements(user, vt)
+
+    # Improvements to next level: pick weakest weighted criteria
+    improvements: list[str] = []
+    if color != "green":
+        items = sorted(((wf * (1.0 - subs.get(k, 0.4)), k) for k, wf in vt.parsed_weights), reverse=True)
+        for _, k in items[:4]:
+            hint = vt.improvement_hints.get(k)
+            if hint:
+                improvements.append(hint)
+
+    # Explainability (compact)
+    why = [f"Score calculé via pondération de critères (config pays: '{country_label}')."]
+    if missing:
+        why.append("Certaines exigences semblent manquantes: le score reflète aussi les infos absentes.")
+
+    ai = _ai_reasoning(weight_items=vt.weight_items, subs=subs, total_w=vt.total_w, missing=missing, improvements=improvements)
+
+    return VisaEligibilityResult(
+        visaType=vt.label,
+        score=score,
+        color=color,
+        message=message,
+        missingRequirements=missing,
+        improvementsToNextLevel=list(dict.fromkeys([_norm(x) for x in improvements if _norm(x)])),
+        why=why,
+        ai=ai,
+    )
+
+
 def evaluate_visa_eligibility(
     user: EligibilityUserProfile,
     country: str,
@@ -330,140 +603,325 @@ def evaluate_visa_eligibility(
     evaluateVisaEligibility(userProfile, country)
 
     - Règles chargées depuis config (modifiables sans toucher au code)
+    - Règles compilées une fois par version (voir compile_rules)
     - Sortie explicable (why + missing + improvements)
     """
 
     rules_obj = rules if isinstance(rules, dict) else _load_rules()
-    country_rules = _select_country_rules(rules_obj, country)
-    visa_types = (country_rules.get("visa_types") or {})
+    compiled = compile_rules(rules_obj).country(country)
+    base = _profile_subscores(user, country)
+    country_label = _norm(country).lower() or "default"
+
     out: list[VisaEligibilityResult] = []
+    for vt in compiled.visa_types:
+        subs = _visa_subscores(user, vt, base)
+        out.append(_build_result(user, vt, subs, _weighted_score(vt, subs), country_label))
 
-    for visa_key, visa_cfg in visa_types.items():
-        if not isinstance(visa_cfg, dict):
-            continue
+    # tri: meilleur score d'abord
+    out.sort(key=lambda x: x.score, reverse=True)
+    return out
 
-        label = str(visa_cfg.get("label") or visa_key)
-        thresholds = visa_cfg.get("thresholds") or {}
-        green = int(thresholds.get("green", 70))
-        orange = int(thresholds.get("orange", 40))
-
-        weights = visa_cfg.get("weights") or {}
-        req = visa_cfg.get("requirements") or {}
-        hints = visa_cfg.get("improvement_hints") or {}
-
-        # Requirement values
-        min_exp = req.get("min_experience_years")
-        rec_exp = req.get("recommended_experience_years")
-        min_lang = req.get("min_language_band")
-        min_fin = req.get("min_financial_capacity_usd")
-        rec_fin = req.get("recommended_financial_capacity_usd")
-        requires_sponsor = bool(req.get("requires_sponsor", False))
-
-        # Subscores 0..1
-        subs: dict[str, float] = {
-            "age": _score_age(user.age),
-            "education": _score_education(user.education_level),
-            "field_of_study": _score_field(user.field_of_study),
-            "experience": _score_experience(user.years_experience, min_exp, rec_exp),
-            "marital_status": _score_marital(user.marital_status),
-            "language": _score_language(user.language, min_lang),
-            "financial_capacity": _score_finances(user.financial_capacity_usd, min_fin, rec_fin),
-            "travel_history": _score_travel_history(user.travel_history_trips_last_5y, user.prior_visa_refusals),
-            "sponsor": _score_sponsor(user.sponsor_available, requires_sponsor),
-            "destination_fit": _score_destination_fit(user.destination_country, country),
-        }
 
-        # Weighted score
-        total_w = 0.0
-        acc = 0.0
-        why: list[str] = []
-
-        for k, w in weights.items():
-            try:
-                wf = float(w)
-            except Exception:
-                continue
-            if wf <= 0:
-                continue
-            total_w += wf
-            s = subs.get(k, 0.4)
-            acc += wf * s
-
-        if total_w <= 0:
-            score = 0
-        else:
-            score = int(round(_clamp(acc / total_w, 0.0, 1.0) * 100))
-
-        color = _color_from_score(score, green, orange)
-        message = _message_from_color(color)
-
-        # Missing requirements (business logic, not only missing fields)
-        missing: list[str] = []
-        if requires_sponsor and not user.sponsor_available:
-            missing.append("Sponsor / offre / invitation requis(e) selon ce visa (à vérifier sur la source officielle).")
-        if min_exp is not None and user.years_experience < float(min_exp):
-            missing.append(f"Expérience minimale: {min_exp} an(s) (estimé).")
-        if min_lang is not None and (user.language.band is None or float(user.language.band) < float(min_lang)):
-            missing.append(f"Niveau de langue minimal: band {min_lang} (estimé).")
-        if min_fin is not None and (user.financial_capacity_usd is None or float(user.financial_capacity_usd) < float(min_fin)):
-            missing.append(f"Capacité financière minimale estimée: {min_fin} USD.")
-        if not _norm(user.education_level) and "education" in weights:
-            missing.append("Niveau d’études non renseigné.")
-        if not _norm(user.field_of_study) and "field_of_study" in weights:
-            missing.append("Domaine de formation non renseigné.")
-
-        # Improvements to next level
-        improvements: list[str] = []
-        next_target = green if color != "green" else None
-        if next_target is not None:
-            # pick weakest weighted criteria
-            items: list[tuple[float, str]] = []
-            for k, w in weights.items():
-                try:
-                    wf = float(w)
-                except Exception:
-                    continue
-                items.append((wf * (1.0 - subs.get(k, 0.4)), k))
-            items.sort(reverse=True)
-            for _, k in items[:4]:
-                hint = hints.get(k)
-                if hint:
-                    improvements.append(str(hint))
-                else:
-                    # generic
-                    if k == "language":
-                        improvements.append("Améliorer le niveau de langue ou fournir une preuve standardisée.")
-                    elif k == "financial_capacity":
-                        improvements.append("Renforcer les preuves financières (épargne/revenus/sponsor) selon l’officiel.")
-                    elif k == "experience":
-                        improvements.append("Augmenter et documenter l’expérience professionnelle pertinente.")
-                    elif k == "education":
-                        improvements.append("Clarifier/renforcer le niveau d’études et fournir les justificatifs.")
-                    elif k == "sponsor":
-                        improvements.append("Ajouter un sponsor conforme si requis/utile.")
-
-        # Explainability (compact)
-        why.append(f"Score calculé via pondération de critères (config pays: '{_norm(country).lower() or 'default'}').")
-        if missing:
-            why.append("Certaines exigences semblent manquantes: le score reflète aussi les infos absentes.")
-
-        ai = _ai_reasoning(weights=weights, subs=subs, total_w=total_w, missing=missing, improvements=improvements)
-
-        out.append(
-            VisaEligibilityResult(
-                visaType=label,
-                score=score,
-                color=color,
-                message=message,
-                missingRequirements=missing,
-                improvementsToNextLevel=list(dict.fromkeys([_norm(x) for x in improvements if _norm(x)])),
-                why=why,
-                ai=ai,
+@dataclass(frozen=True)
+class ScoredVisa:
+    """
+    Score brut d'un type de visa pour un pays (sans explications).
+    `to_result()` construit le résultat explicable complet (à réserver au top-k).
+    """
+
+    country: str  # clé pays demandée (normalisée, "" => default)
+    visa: CompiledVisaType
+    subs: dict[str, float]
+    score: int
+    missing: list[str]
+    user: EligibilityUserProfile
+
+    def to_result(self) -> VisaEligibilityResult:
+        return _build_result(self.user, self.visa, self.subs, self.score, self.country or "default", self.missing)
+
+
+def score_visa_types_across_countries(
+    user: EligibilityUserProfile,
+    countries: Sequence[str],
+    *,
+    rules: Optional[dict[str, Any]] = None,
+) -> Iterator[ScoredVisa]:
+    """
+    Évalue tous les types de visa de plusieurs pays en une passe.
+
+    - sous-scores indépendants du pays calculés une seule fois
+    - chaque pays est évalué comme destination visée (même sémantique que
+      evaluate_visa_eligibility avec destination_country == country)
+    - ordre: pays dans l'ordre donné, types de visa dans l'ordre de la config
+    """
+
+    rules_obj = rules if isinstance(rules, dict) else _load_rules()
+    compiled = compile_rules(rules_obj)
+    invariant = _profile_invariant_subscores(user)
+    for c in countries:
+        c_key = _norm(c).lower()
+        base = dict(invariant)
+        base["destination_fit"] = _score_destination_fit(c_key, c_key or "default")
+        for vt in compiled.country(c_key or "default").visa_types:
+            subs = _visa_subscores(user, vt, base)
+            yield ScoredVisa(
+                country=c_key,
+                visa=vt,
+                subs=subs,
+                score=_weighted_score(vt, subs),
+                missing=_missing_requirements(user, vt),
+                user=user,
             )
-        )
 
-    # tri: meilleur score d'abord
-    out.sort(key=lambda x: x.score, reverse=True)
+
+BASE_CRITERIA = ("age", "education", "field_of_study", "marital_status", "travel_history", "destination_fit")
+VISA_CRITERIA = ("experience", "language", "financial_capacity", "sponsor")
+
+
+@dataclass(frozen=True)
+class EligibilityBatchScores:
+    """
+    Scores bruts d'une cohorte (sans explications):
+    - scores[i][j] = score du profil i pour visa_types[j] (ordre config)
+    """
+
+    country: str  # clé pays résolue
+    visa_types: list[str]  # labels
+    scores: list[list[int]]
+    engine: str  # "numpy" | "python"
+
+
+def _score_age_column(np: Any, ages: Any) -> Any:
+    return np.select(
+        [ages <= 0, ages < 18, (ages >= 18) & (ages <= 35), (ages >= 36) & (ages <= 45), (ages >= 46) & (ages <= 55)],
+        [0.2, 0.4, 1.0, 0.85, 0.65],
+        default=0.45,
+    )
+
+
+def _score_travel_column(np: Any, trips: Any, refusals: Any) -> Any:
+    base = np.select([trips == 0, trips <= 2, trips <= 5], [0.35, 0.55, 0.75], default=0.9)
+    penalty = 0.18 + 0.06 * np.minimum(refusals, 3)
+    base = np.where(refusals >= 1, base - penalty, base)
+    return np.clip(base, 0.05, 1.0)
+
+
+def _batch_feature_matrix_numpy(
+    np: Any,
+    users: list[EligibilityUserProfile],
+    compiled: CompiledCountry,
+    country: str,
+) -> Any:
+    """
+    Matrice de sous-scores N x (1 + 6 + 4V):
+    - colonne 0: constante 1.0 (critères inconnus => 0.4 * poids)
+    - 6 colonnes indépendantes du visa, puis 4 colonnes par type de visa
+    """
+
+    n = len(users)
+    vts = compiled.visa_types
+    feats = np.empty((n, 1 + len(BASE_CRITERIA) + len(VISA_CRITERIA) * len(vts)), dtype=np.float64)
+    feats[:, 0] = 1.0
+
+    edu_memo: dict[str, float] = {}
+    field_memo: dict[str, float] = {}
+    marital_memo: dict[str, float] = {}
+    fit_memo: dict[str, float] = {}
+
+    def memo(cache: dict[str, float], key: str, fn: Any) -> float:
+        v = cache.get(key)
+        if v is None:
+            v = fn(key)
+            cache[key] = v
+        return v
+
+    feats[:, 1] = _score_age_column(np, np.array([u.age for u in users], dtype=np.float64))
+    feats[:, 2] = [memo(edu_memo, u.education_level, _score_education) for u in users]
+    feats[:, 3] = [memo(field_memo, u.field_of_study, _score_field) for u in users]
+    feats[:, 4] = [memo(marital_memo, u.marital_status, _score_marital) for u in users]
+    feats[:, 5] = _score_travel_column(
+        np,
+        np.array([max(0, int(u.travel_history_trips_last_5y or 0)) for u in users], dtype=np.int64),
+        np.array([max(0, int(u.prior_visa_refusals or 0)) for u in users], dtype=np.int64),
+    )
+    feats[:, 6] = [memo(fit_memo, u.destination_country, lambda d: _score_destination_fit(d, country)) for u in users]
+
+    years = np.array([max(0.0, float(u.years_experience or 0.0)) for u in users], dtype=np.float64)
+    band = np.array([np.nan if u.language.band is None else float(u.language.band) for u in users], dtype=np.float64)
+    capacity = np.array(
+        [np.nan if u.financial_capacity_usd is None else max(0.0, float(u.financial_capacity_usd)) for u in users],
+        dtype=np.float64,
+    )
+    band_missing = np.isnan(band)
+    capacity_missing = np.isnan(capacity)
+    sponsor_none = np.array([u.sponsor_available is None for u in users], dtype=bool)
+    sponsor_yes = np.array([bool(u.sponsor_available) for u in users], dtype=bool)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for j, vt in enumerate(vts):
+            col = 1 + len(BASE_CRITERIA) + len(VISA_CRITERIA) * j
+
+            if vt.rec_exp is not None and vt.rec_exp > 0:
+                exp = np.clip(years / vt.rec_exp, 0.2, 1.0)
+            else:
+                exp = np.clip(years / 6.0, 0.2, 1.0)
+            if vt.min_exp is not None:
+                exp = np.where(years < vt.min_exp, 0.2, exp)
+            feats[:, col] = exp
+
+            lang = np.clip(band / 9.0, 0.2, 1.0)
+            if vt.min_lang is not None:
+                lang = np.where(band < vt.min_lang, 0.25, lang)
+            feats[:, col + 1] = np.where(band_missing, 0.35, lang)
+
+            if vt.rec_fin is not None and vt.rec_fin > 0:
+                fin = np.clip(capacity / vt.rec_fin, 0.2, 1.0)
+            else:
+                fin = np.clip(capacity / 5000.0, 0.2, 1.0)
+            if vt.min_fin is not None:
+                fin = np.where(capacity < vt.min_fin, 0.2, fin)
+            feats[:, col + 2] = np.where(capacity_missing, 0.35, fin)
+
+            if vt.requires_sponsor:
+                feats[:, col + 3] = np.where(sponsor_yes, 1.0, 0.1)
+            else:
+                feats[:, col + 3] = np.where(sponsor_none, 0.45, np.where(sponsor_yes, 0.75, 0.55))
+    return feats
+
+
+def _batch_weight_matrix_numpy(np: Any, compiled: CompiledCountry) -> Any:
+    """
+    Matrice de poids (1 + 6 + 4V) x V: une seule multiplication donne tous les scores.
+    """
+
+    vts = compiled.visa_types
+    base_idx = {k: 1 + i for i, k in enumerate(BASE_CRITERIA)}
+    visa_idx = {k: i for i, k in enumerate(VISA_CRITERIA)}
+    weights = np.zeros((1 + len(BASE_CRITERIA) + len(VISA_CRITERIA) * len(vts), len(vts)), dtype=np.float64)
+    for j, vt in enumerate(vts):
+        for k, wf in vt.weight_items:
+            if k in base_idx:
+                weights[base_idx[k], j] += wf
+            elif k in visa_idx:
+                weights[1 + len(BASE_CRITERIA) + len(VISA_CRITERIA) * j + visa_idx[k], j] += wf
+            else:
+                weights[0, j] += wf * 0.4
+    return weights
+
+
+def _row_subscores(row: list[float], j: int) -> dict[str, float]:
+    col = 1 + len(BASE_CRITERIA) + len(VISA_CRITERIA) * j
+    return {
+        "age": row[1],
+        "education": row[2],
+        "field_of_study": row[3],
+        "experience": row[col],
+        "marital_status": row[4],
+        "language": row[col + 1],
+        "financial_capacity": row[col + 2],
+        "travel_history": row[5],
+        "sponsor": row[col + 3],
+        "destination_fit": row[6],
+    }
+
+
+def _batch_numpy(
+    users: list[EligibilityUserProfile],
+    compiled: CompiledCountry,
+    country: str,
+) -> Optional[tuple[Any, list[list[int]]]]:
+    try:
+        import numpy as np  # type: ignore
+    except Exception:
+        return None
+
+    vts = compiled.visa_types
+    feats = _batch_feature_matrix_numpy(np, users, compiled, country)
+    if not vts:
+        return feats, [[] for _ in users]
+
+    acc = feats @ _batch_weight_matrix_numpy(np, compiled)
+    total_w = np.array([vt.total_w for vt in vts], dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = np.clip(acc / np.where(total_w > 0, total_w, 1.0), 0.0, 1.0) * 100
+    scores = np.where(total_w > 0, np.rint(pct), 0).astype(np.int64)
+
+    # L'ordre de sommation diffère du calcul scalaire: on recalcule exactement
+    # les cellules proches d'un arrondi .5 pour rester identique à evaluate_visa_eligibility.
+    frac = pct - np.floor(pct)
+    ties = np.argwhere((np.abs(frac - 0.5) < 1e-9) & (total_w > 0))
+    if len(ties):
+        for i, j in ties.tolist():
+            scores[i, j] = _weighted_score(vts[j], _row_subscores(feats[i].tolist(), j))
+    return feats, scores.tolist()
+
+
+def _resolve_batch(country: str, rules: Optional[dict[str, Any]]) -> CompiledCountry:
+    rules_obj = rules if isinstance(rules, dict) else _load_rules()
+    return compile_rules(rules_obj).country(country)
+
+
+def score_visa_eligibility_batch(
+    users: Sequence[EligibilityUserProfile],
+    country: str,
+    *,
+    rules: Optional[dict[str, Any]] = None,
+) -> EligibilityBatchScores:
+    """
+    Scoring de cohorte (N profils, 1 pays), sans explications.
+    NumPy si disponible (une multiplication matricielle pour tous les visas), sinon boucle Python.
+    Scores identiques à evaluate_visa_eligibility.
+    """
+
+    compiled = _resolve_batch(country, rules)
+    user_list = list(users)
+    labels = [vt.label for vt in compiled.visa_types]
+    res = _batch_numpy(user_list, compiled, country) if user_list else None
+    if res is not None:
+        return EligibilityBatchScores(country=compiled.key, visa_types=labels, scores=res[1], engine="numpy")
+
+    scores: list[list[int]] = []
+    for u in user_list:
+        base = _profile_subscores(u, country)
+        scores.append([_weighted_score(vt, _visa_subscores(u, vt, base)) for vt in compiled.visa_types])
+    return EligibilityBatchScores(country=compiled.key, visa_types=labels, scores=scores, engine="python")
+
+
+def evaluate_visa_eligibility_batch(
+    users: Sequence[EligibilityUserProfile],
+    country: str,
+    *,
+    rules: Optional[dict[str, Any]] = None,
+) -> list[list[VisaEligibilityResult]]:
+    """
+    Version cohorte de evaluate_visa_eligibility: out[i] == evaluate_visa_eligibility(users[i], country).
+    """
+
+    compiled = _resolve_batch(country, rules)
+    user_list = list(users)
+    country_label = _norm(country).lower() or "default"
+    res = _batch_numpy(user_list, compiled, country) if user_list else None
+
+    out: list[list[VisaEligibilityResult]] = []
+    if res is None:
+        for u in user_list:
+            base = _profile_subscores(u, country)
+            results = []
+            for vt in compiled.visa_types:
+                subs = _visa_subscores(u, vt, base)
+                results.append(_build_result(u, vt, subs, _weighted_score(vt, subs), country_label))
+            results.sort(key=lambda x: x.score, reverse=True)
+            out.append(results)
+        return out
+
+    feats, scores = res
+    for i, (u, row) in enumerate(zip(user_list, feats.tolist())):
+        results = [
+            _build_result(u, vt, _row_subscores(row, j), scores[i][j], country_label)
+            for j, vt in enumerate(compiled.visa_types)
+        ]
+        results.sort(key=lambda x: x.score, reverse=True)
+        out.append(results)
     return out
 
 
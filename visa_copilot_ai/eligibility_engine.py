@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import heapq
 from dataclasses import dataclass
 from typing import Any, Optional
 
-from .eligibility import EligibilityUserProfile, LanguageEvidence, evaluate_visa_eligibility
+from .eligibility import EligibilityUserProfile, LanguageEvidence, score_visa_types_across_countries
 
 
 def _norm(s: Any) -> str:
@@ -86,6 +87,41 @@ def _likelihood_from_score(score: int, missing_count: int) -> str:
     return "Low"
 
 
+def _likelihood_rank(likelihood: str) -> int:
+    return 0 if likelihood == "High" else 1 if likelihood == "Medium" else 2
+
+
+def _label_wanted(label: str, preferred_keys: list[str], visa_types_interest: list[str]) -> bool:
+    """
+    Filtre un type de visa selon l'objectif (mots-clés du label) et les types choisis par l'utilisateur.
+    """
+
+    lk = _norm(label).lower()
+    if preferred_keys:
+        # quick mapping by label keywords
+        wanted = False
+        if "tour" in lk:
+            wanted = "tourist" in preferred_keys
+        elif "étudiant" in lk or "student" in lk:
+            wanted = "student" in preferred_keys
+        elif "temporaire" in lk:
+            wanted = "temporary_work" in preferred_keys or "skilled_worker" in preferred_keys
+        elif "qualifi" in lk:
+            wanted = "skilled_worker" in preferred_keys
+        elif "business" in lk or "invest" in lk:
+            wanted = "business_investor" in preferred_keys
+        elif "famil" in lk:
+            wanted = "family_reunification" in preferred_keys
+        if not wanted:
+            return False
+
+    # Filter by user-selected visa types interest (string match).
+    if visa_types_interest:
+        if not any(_norm(x).lower() in lk for x in visa_types_interest):
+            return False
+    return True
+
+
 def _processing_time_for(visa_key_or_label: str) -> str:
     s = _norm(visa_key_or_label).lower()
     if "tour" in s or "visitor" in s:
@@ -290,6 +326,9 @@ def run_visa_eligibility_engine(
     """
     Decision-support engine (heuristique, explicable).
     Returns a structured output A/B/C/D.
+
+    destinations: liste de pays, ["no_preference"] (shortlist) ou ["all"] (tous les pays des règles).
+    Tous les pays sont évalués en une passe; seul le top-k global (payload.top_k, défaut 5) est détaillé.
     """
     inp, missing, assumptions = parse_engine_input(payload)
     if inp is None:
@@ -306,7 +345,10 @@ def run_visa_eligibility_engine(
     if not supported:
         supported = ["default"]
     destinations = inp.destinations
-    if len(destinations) == 1 and destinations[0].lower() == "no_preference":
+    if len(destinations) == 1 and destinations[0].lower() in {"all", "all_countries"}:
+        destinations = list(supported)
+        assumptions.append("Tous les pays supportés par le moteur sont évalués (classement global).")
+    elif len(destinations) == 1 and destinations[0].lower() == "no_preference":
         # Best-fit heuristic shortlist (limited to supported rule keys).
         shortlist = []
         for c in ["canada", "france", "germany", "portugal", "spain", "uk", "usa", "uae", "australia"]:
@@ -339,88 +381,58 @@ def run_visa_eligibility_engine(
     )
 
     preferred_keys = _purpose_to_preferred_keys(inp.purpose)
+    try:
+        top_k = max(1, min(int(payload.get("top_k", 5) or 5), 50))
+    except Exception:
+        top_k = 5
+
+    # Single pass over all destinations: profile-invariant subscores are computed once,
+    # cheap scores for every (country, visa type), full explanations only for the global top-k.
+    candidates = (
+        sv
+        for sv in score_visa_types_across_countries(user, destinations, rules=rules)
+        if _label_wanted(sv.visa.label, preferred_keys, inp.visa_types_interest)
+    )
+    # heapq.nsmallest == sorted(...)[:k] (stable): same ordering as a full sort.
+    best = heapq.nsmallest(
+        top_k,
+        candidates,
+        key=lambda sv: (_likelihood_rank(_likelihood_from_score(sv.score, len(sv.missing))), -sv.score),
+    )
 
-    # Compute options per destination.
-    options: list[dict[str, Any]] = []
-    for dest in destinations:
-        dest_key = _norm(dest).lower()
-        user2 = user.__class__(**{**user.__dict__, "destination_country": dest_key})  # type: ignore[attr-defined]
-        results = evaluate_visa_eligibility(user2, country=dest_key or "default", rules=rules)
-
-        for r in results:
-            label = r.visaType
-            # Filter by purpose preference if available (based on label keywords).
-            if preferred_keys:
-                # quick mapping by label keywords
-                lk = _norm(label).lower()
-                wanted = False
-                if "tour" in lk:
-                    wanted = "tourist" in preferred_keys
-                elif "étudiant" in lk or "student" in lk:
-                    wanted = "student" in preferred_keys
-                elif "temporaire" in lk:
-                    wanted = "temporary_work" in preferred_keys or "skilled_worker" in preferred_keys
-                elif "qualifi" in lk:
-                    wanted = "skilled_worker" in preferred_keys
-                elif "business" in lk or "invest" in lk:
-                    wanted = "business_investor" in preferred_keys
-                elif "famil" in lk:
-                    wanted = "family_reunification" in preferred_keys
-                if not wanted:
-                    continue
-
-            # Filter by user-selected visa types interest (string match).
-            if inp.visa_types_interest:
-                low_label = _norm(label).lower()
-                if not any(_norm(x).lower() in low_label for x in inp.visa_types_interest):
-                    continue
-
-            # Get visa requirements (min budget) from rules config if possible.
-            cfg = (
-                (countries_rules.get(dest_key) or {}).get("visa_types", {}).get(_norm(label).lower())
-                if isinstance(countries_rules.get(dest_key), dict)
-                else None
-            )
-            # Above is usually None because label is not the key. We'll find by scanning.
-            req: dict[str, Any] = {}
-            vtypes = (countries_rules.get(dest_key) or {}).get("visa_types") if isinstance(countries_rules.get(dest_key), dict) else {}
-            if isinstance(vtypes, dict):
-                for vk, vc in vtypes.items():
-                    if isinstance(vc, dict) and str(vc.get("label") or "").strip() == label:
-                        req = vc.get("requirements") or {}
-                        break
-
-            min_budget = _budget_min_from_requirements(req) if isinstance(req, dict) else None
-
-            options.append(
-                {
-                    "country": dest_key or "default",
-                    "visa_type": label,
-                    "estimated_approval_likelihood": _likelihood_from_score(int(r.score), len(r.missingRequirements or [])),
-                    "key_reasons": _dedup(
-                        [
-                            *[f"Point fort: {x.get('label')}" for x in (r.ai.get("strengths") or []) if isinstance(x, dict)],
-                            *list(r.why or []),
-                        ]
-                    )[:6],
-                    "main_risk_factors": _dedup(
-                        [
-                            *list(r.missingRequirements or []),
-                            *[f"Faiblesse: {x.get('label')}" for x in (r.ai.get("weaknesses") or []) if isinstance(x, dict)],
-                            f"Risque de surstay (heuristique): {_destination_risk_level(dest_key)}",
-                        ]
-                    )[:6],
-                    "required_documents_summary": _documents_summary_for(label),
-                    "typical_processing_time_range": _processing_time_for(label),
-                    "estimated_minimum_budget_usd": (round(float(min_budget), 0) if min_budget is not None else None),
-                    "why": list(r.why or []),
-                    "improvements": list(r.improvementsToNextLevel or []),
-                    "score": int(r.score),
-                }
-            )
-
-    options.sort(key=lambda x: (0 if x["estimated_approval_likelihood"] == "High" else 1 if x["estimated_approval_likelihood"] == "Medium" else 2, -int(x["score"])), reverse=False)
-    top = options[:5]
+    top: list[dict[str, Any]] = []
+    for sv in best:
+        r = sv.to_result()
+        label = r.visaType
+        dest_key = sv.country
+        min_budget = _budget_min_from_requirements(sv.visa.requirements)
+
+        top.append(
+            {
+                "country": dest_key or "default",
+                "visa_type": label,
+                "estimated_approval_likelihood": _likelihood_from_score(int(r.score), len(r.missingRequirements or [])),
+                "key_reasons": _dedup(
+                    [
+                        *[f"Point fort: {x.get('label')}" for x in (r.ai.get("strengths") or []) if isinstance(x, dict)],
+                        *list(r.why or []),
+                    ]
+                )[:6],
+                "main_risk_factors": _dedup(
+                    [
+                        *list(r.missingRequirements or []),
+                        *[f"Faiblesse: {x.get('label')}" for x in (r.ai.get("weaknesses") or []) if isinstance(x, dict)],
+                        f"Risque de surstay (heuristique): {_destination_risk_level(dest_key)}",
+                    ]
+                )[:6],
+                "required_documents_summary": _documents_summary_for(label),
+                "typical_processing_time_range": _processing_time_for(label),
+                "estimated_minimum_budget_usd": (round(float(min_budget), 0) if min_budget is not None else None),
+                "why": list(r.why or []),
+                "improvements": list(r.improvementsToNextLevel or []),
+                "score": int(r.score),
+            }
+        )
 
     # Profile strength score breakdown (0-100) — simple & transparent.
     fin = 55 if inp.funds_range else 40
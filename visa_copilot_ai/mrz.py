@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+TD3_LEN = 44
+
+# Caractères autorisés dans une MRZ (whitelist tesseract).
+MRZ_CHARSET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
+
+# Confusions OCR fréquentes dans les zones numériques / alphabétiques.
+_TO_DIGIT = str.maketrans({"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "B": "8", "G": "6"})
+_TO_ALPHA = str.maketrans({"0": "O", "1": "I", "2": "Z", "5": "S", "8": "B", "6": "G"})
+
+
+def _char_value(c: str) -> int:
+    if c.isdigit():
+        return int(c)
+    if "A" <= c <= "Z":
+        return ord(c) - ord("A") + 10
+    return 0  # "<" (et tout caractère inattendu)
+
+
+def check_digit(s: str) -> int:
+    """
+    Chiffre de contrôle ICAO 9303 (pondération 7-3-1, modulo 10).
+    """
+
+    return sum(_char_value(c) * (7, 3, 1)[i % 3] for i, c in enumerate(s)) % 10
+
+
+def _check(field: str, digit: str) -> bool:
+    d = digit.translate(_TO_DIGIT)
+    if d == "<":
+        # Champ optionnel vide: le chiffre de contrôle peut être "<".
+        return field.strip("<") == ""
+    return d.isdigit() and check_digit(field) == int(d)
+
+
+def _yymmdd(s: str, *, future: bool) -> Optional[str]:
+    raw = s.translate(_TO_DIGIT)
+    if not re.fullmatch(r"\d{6}", raw):
+        return None
+    yy, mm, dd = int(raw[:2]), int(raw[2:4]), int(raw[4:6])
+    this_year = date.today().year % 100
+    if future:
+        # Expiration: passeports valides 10 ans max -> siècle courant sauf grand écart.
+        century = 2000 if yy <= this_year + 20 else 1900
+    else:
+        century = 2000 if yy <= this_year else 1900
+    try:
+        return date(century + yy, mm, dd).isoformat()
+    except ValueError:
+        return None
+
+
+def _names(field: str) -> tuple[str, str]:
+    parts = field.translate(_TO_ALPHA).split("<<", 1)
+    surname = " ".join(x for x in parts[0].split("<") if x)
+    given = " ".join(x for x in parts[1].split("<") if x) if len(parts) > 1 else ""
+    return surname, given
+
+
+@dataclass(frozen=True)
+class MrzTd3:
+    document_type: str
+    issuing_country: str
+    surname: str
+    given_name: str
+    passport_number: str
+    nationality: str
+    birth_date: Optional[str]
+    sex: str
+    expires_date: Optional[str]
+    checks: dict[str, bool]
+
+    @property
+    def valid(self) -> bool:
+        return all(self.checks.values())
+
+    def to_extracted(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "passport_number": self.passport_number,
+            "surname": self.surname,
+            "given_name": self.given_name,
+            "full_name": " ".join(x for x in [self.given_name, self.surname] if x),
+            "nationality": self.nationality,
+            "issuing_country": self.issuing_country,
+            "sex": self.sex,
+            "mrz_valid": self.valid,
+        }
+        if self.expires_date:
+            out["expires_date"] = self.expires_date
+        if self.birth_date:
+            out["birth_date"] = self.birth_date
+        return out
+
+
+def _clean_line(line: str) -> str:
+    t = line.upper().replace(" ", "").replace("«", "<").replace("‹", "<")
+    return "".join(c for c in t if c in MRZ_CHARSET)
+
+
+def parse_td3(line1: str, line2: str) -> Optional[MrzTd3]:
+    """
+    Parse les 2 lignes d'une MRZ passeport (TD3, 2 x 44 caractères) avec contrôle des chiffres.
+    Retourne None si la structure n'est pas reconnue.
+    """
+
+    l1 = _clean_line(line1)[:TD3_LEN].ljust(TD3_LEN, "<")
+    l2 = _clean_line(line2)[:TD3_LEN].ljust(TD3_LEN, "<")
+    if not l1.startswith("P"):
+        return None
+
+    # Zones numériques (dates, chiffres de contrôle) corrigées des confusions OCR.
+    number_raw, number_cd = l2[0:9], l2[9].translate(_TO_DIGIT)
+    birth, birth_cd = l2[13:19].translate(_TO_DIGIT), l2[19].translate(_TO_DIGIT)
+    expiry, expiry_cd = l2[21:27].translate(_TO_DIGIT), l2[27].translate(_TO_DIGIT)
+    personal, personal_cd = l2[28:42], l2[42].translate(_TO_DIGIT)
+    composite_cd = l2[43]
+    composite = number_raw + number_cd + birth + birth_cd + expiry + expiry_cd + personal + personal_cd
+
+    checks = {
+        "passport_number": _check(number_raw, number_cd),
+        "birth_date": _check(birth, birth_cd),
+        "expires_date": _check(expiry, expiry_cd),
+        "personal_number": _check(personal, personal_cd),
+        "composite": _check(composite, composite_cd),
+    }
+    surname, given = _names(l1[5:])
+    return MrzTd3(
+        document_type=l1[0:2].rstrip("<"),
+        issuing_country=l1[2:5].translate(_TO_ALPHA).rstrip("<"),
+        surname=surname,
+        given_name=given,
+        passport_number=number_raw.rstrip("<"),
+        nationality=l2[10:13].translate(_TO_ALPHA).rstrip("<"),
+        birth_date=_yymmdd(birth, future=False),
+        sex=l2[20] if l2[20] in {"M", "F"} else "X",
+        expires_date=_yymmdd(expiry, future=True),
+        checks=checks,
+    )
+
+
+def find_td3(text: str) -> Optional[MrzTd3]:
+    """
+    Cherche une MRZ TD3 dans un texte OCR: 2 lignes consécutives de ~44 caractères MRZ,
+    la première commençant par "P". Préfère une MRZ entièrement valide.
+    """
+
+    lines = [_clean_line(x) for x in (text or "").splitlines()]
+    lines = [x for x in lines if len(x) >= 30]
+    best: Optional[MrzTd3] = None
+    for a, b in zip(lines, lines[1:]):
+        if not a.startswith("P") or "<" not in a or not (40 <= len(a) <= 48 and 40 <= len(b) <= 48):
+            continue
+        parsed = parse_td3(a, b)
+        if parsed is None:
+            continue
+        if parsed.valid:
+            return parsed
+        if best is None or sum(parsed.checks.values()) > sum(best.checks.values()):
+            best = parsed
+    return best
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-import json
+import heapq
+from bisect import bisect_left, bisect_right
+import math
 import os
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Any, Optional
 
-import importlib.resources as pkg_resources
+from .content_cache import CachedJson, DerivedCache, load_json, resource_path
+from .news_search import RankingParams, TextIndex, TextStats, doc_key, reusable, tokenize
 
 
 @dataclass(frozen=True)
@@ -20,31 +24,35 @@ class NewsItem:
     source_name: str = ""
     source_url: str = ""
     published_at: str = ""  # ISO-8601 string (kept as string for simplicity)
-    status: str = "published"  # draft | published
+    status: str = "published"  # draft | published | duplicate (quasi-doublon, voir news_dedup)
     reliability_score: float = 0.5
+    also_reported_by: list[dict[str, str]] = field(default_factory=list)
 
 
 def _norm(s: Any) -> str:
     return " ".join(str(s or "").strip().split())
 
 
-def _load_news() -> dict[str, Any]:
+def _news_entry() -> CachedJson:
     """
     Source:
     - embedded: visa_copilot_ai/resources/news.json
     - override: GLOBALVISA_NEWS_PATH (modifiable sans toucher au code)
+    Servi depuis le cache de contenu (revalidation par mtime/size).
     """
 
     override = os.getenv("GLOBALVISA_NEWS_PATH", "").strip()
     if override:
         try:
-            with open(override, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return load_json(override)
         except Exception:
             pass
 
-    with pkg_resources.files("visa_copilot_ai").joinpath("resources/news.json").open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json(resource_path("news.json"))
+
+
+def _load_news() -> dict[str, Any]:
+    return _news_entry().data
 
 
 def _parse_item(raw: dict[str, Any]) -> NewsItem:
@@ -54,6 +62,11 @@ def _parse_item(raw: dict[str, Any]) -> NewsItem:
     except Exception:
         rel = 0.5
     rel = max(0.0, min(1.0, rel))
+    also = [
+        {k: _norm(x.get(k)) for k in ("id", "title", "source_name", "source_url")}
+        for x in (raw.get("also_reported_by") or [])
+        if isinstance(x, dict)
+    ]
     return NewsItem(
         id=_norm(raw.get("id")) or "news_unknown",
         category=_norm(raw.get("category")).lower(),
@@ -66,23 +79,343 @@ def _parse_item(raw: dict[str, Any]) -> NewsItem:
         published_at=_norm(raw.get("published_at")),
         status=_norm(raw.get("status") or "published").lower(),
         reliability_score=rel,
+        also_reported_by=also,
     )
 
 
 def _parse_dt(s: str) -> Optional[datetime]:
+    """
+    Dates de flux: ISO-8601 / Atom (RFC 3339, "Z" accepté) et RSS (RFC 822: "Mon, 01 Dec 2025 10:00:00 GMT").
+    """
+
     if not s:
         return None
-    # very forgiving parser for common ISO strings
+    s = s.strip()
     try:
-        if s.endswith("Z"):
+        if s.endswith("Z") or s.endswith("z"):
             s2 = s[:-1] + "+00:00"
         else:
             s2 = s
         return datetime.fromisoformat(s2)
+    except Exception:
+        pass
+    try:
+        return parsedate_to_datetime(s)
     except Exception:
         return None
 
 
+def normalize_published(s: str) -> tuple[str, Optional[int]]:
+    """
+    (ISO UTC "YYYY-MM-DDTHH:MM:SSZ", epoch secondes) ou (texte d'origine, None) si illisible.
+    Dates sans fuseau lues comme UTC.
+    """
+
+    dt = _parse_dt(_norm(s))
+    if dt is None:
+        return _norm(s), None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    try:
+        dt = dt.astimezone(timezone.utc)
+        ts = int(dt.timestamp())
+    except (OverflowError, OSError, ValueError):
+        return _norm(s), None
+    return dt.replace(microsecond=0).isoformat().replace("+00:00", "Z"), ts
+
+
+def _sort_ts(s: str) -> float:
+    """
+    Clé de tri (secondes epoch). Dates naïves lues comme UTC (comparables aux dates avec fuseau),
+    dates illisibles en dernier.
+    """
+
+    ts = normalize_published(s)[1]
+    return float("-inf") if ts is None else float(ts)
+
+
+def item_sort_ts(raw: dict[str, Any]) -> float:
+    """
+    Clé de tri d'un item brut: `published_ts` calculé à l'ingestion, sinon parsing de `published_at`.
+    """
+
+    ts = raw.get("published_ts")
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    return _sort_ts(str(raw.get("published_at") or ""))
+
+
+def _intersect(postings: list[list[int]]) -> list[int]:
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    out = postings[0]
+    for p in postings[1:]:
+        ps = set(p)
+        out = [x for x in out if x in ps]
+        if not out:
+            break
+    return out
+
+
+def _search_text(n: NewsItem) -> str:
+    # Titre compté deux fois (poids de champ simple pour BM25).
+    return " ".join([n.title, n.title, n.summary, " ".join(n.tags), n.country, n.category, n.source_name])
+
+
+class NewsIndex:
+    """
+    Index des actualités construit une fois par version de contenu:
+    - NewsItem parsés (et items bruts dans `raw`), triés par date décroissante (rang = position dans `items`)
+    - postings (rangs croissants) par statut, pays, catégorie et tag
+    - index plein texte BM25 (news_search.TextIndex) pour `q`; avec `previous`, l'index texte de la version
+      précédente est repris et seuls les items nouveaux ou modifiés sont tokenisés
+
+    Sans `q`: intersection de postings + tranche des `limit` premiers rangs (ordre chronologique).
+    Avec `q`: mêmes filtres, classement par pertinence (BM25 mêlé à la fraîcheur et à la fiabilité).
+    """
+
+    def __init__(self, raw_items: list[Any], *, previous: Optional["NewsIndex"] = None, ranking: Optional[RankingParams] = None) -> None:
+        # Items bruts inchangés (même objet, lecture seule) repris de l'index précédent: ni re-parsés ni re-tokenisés.
+        known: dict[int, tuple[dict[str, Any], float, NewsItem, int]] = {}
+        if previous is not None:
+            for rank, raw in enumerate(previous.raw):
+                known[id(raw)] = (raw, previous.sort_ts[rank], previous.items[rank], previous.doc_of_rank[rank])
+        keyed = []
+        for raw in raw_items:
+            if not isinstance(raw, dict):
+                continue
+            hit = known.get(id(raw))
+            if hit is not None and hit[0] is raw:
+                keyed.append((hit[1], raw, hit[2], hit[3]))
+            else:
+                keyed.append((item_sort_ts(raw), raw, _parse_item(raw), -1))
+        # sort stable: à date égale, l'ordre d'origine est conservé.
+        keyed.sort(key=lambda x: x[0], reverse=True)
+        self.items: list[NewsItem] = [x[2] for x in keyed]
+        self.raw: list[dict[str, Any]] = [x[1] for x in keyed]
+        self.sort_ts: list[float] = [x[0] for x in keyed]
+        self.ranking = ranking or (previous.ranking if previous is not None else RankingParams())
+        self.published: list[int] = []
+        self.by_country: dict[str, list[int]] = {}
+        self.by_category: dict[str, list[int]] = {}
+        self.by_tag: dict[str, list[int]] = {}
+        prev_text = previous.text if previous is not None else None
+        self.text: TextIndex = prev_text if prev_text is not None and reusable(prev_text, len(self.items)) else TextIndex()
+        same_text = self.text is prev_text
+        self.doc_of_rank: list[int] = []
+        for rank, n in enumerate(self.items):
+            if n.status == "published":
+                self.published.append(rank)
+            self.by_country.setdefault(n.country.lower(), []).append(rank)
+            self.by_category.setdefault(n.category.lower(), []).append(rank)
+            for t in dict.fromkeys(n.tags):
+                self.by_tag.setdefault(t, []).append(rank)
+            doc = keyed[rank][3]
+            if doc < 0 or not same_text:
+                text = _search_text(n)
+                doc = self.text.add(doc_key(n.id, text), text)
+            self.doc_of_rank.append(doc)
+        self.text.retain(self.doc_of_rank)
+        # Statistiques BM25 de cet instantané: l'index texte continue d'évoluer avec les versions suivantes.
+        self.text_stats: TextStats = self.text.stats()
+        self.rank_of_doc: dict[int, int] = {d: r for r, d in enumerate(self.doc_of_rank)}
+        self.published_set: frozenset[int] = frozenset(self.published)
+        finite = [ts for ts in self.sort_ts if ts != float("-inf")]
+        self.newest_ts = finite[0] if finite else 0.0
+        self._neg_ts: list[float] = [-ts for ts in self.sort_ts]  # croissant: bisect pour les curseurs
+        self._np_arrays: Optional[dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _arrays(self, np: Any) -> dict[str, Any]:
+        # Tableaux propres à l'instantané, construits à la première requête (construction idempotente).
+        arrays = self._np_arrays
+        if arrays is None:
+            p = self.ranking
+            rank_of_doc = np.full(max(self.doc_of_rank, default=-1) + 1, -1, dtype=np.int64)
+            rank_of_doc[np.asarray(self.doc_of_rank, dtype=np.int64)] = np.arange(len(self.doc_of_rank), dtype=np.int64)
+            ts = np.asarray(self.sort_ts, dtype=np.float64)
+            age = np.where(np.isfinite(ts), np.maximum(0.0, self.newest_ts - ts), np.inf)
+            fresh = 0.5 ** (age / max(1.0, p.half_life_days * 86400))
+            published = np.zeros(len(self.items), dtype=bool)
+            published[np.asarray(self.published, dtype=np.int64)] = True
+            prior = p.recency * fresh + p.reliability * np.asarray([n.reliability_score for n in self.items], dtype=np.float64)
+            arrays = {"rank_of_doc": rank_of_doc, "prior": prior, "published": published}
+            self._np_arrays = arrays
+        return arrays
+
+    def _relevance_numpy(self, terms: list[str], need: int, filters: list[list[int]], limit: int) -> Optional[list[tuple[float, int]]]:
+        try:
+            import numpy as np  # type: ignore
+        except Exception:
+            return None
+
+        p = self.ranking
+        arrays = self._arrays(np)
+        acc, cnt = self.text.scores_numpy(np, terms, arrays["rank_of_doc"], len(self.items), p, self.text_stats)
+        mask = cnt >= need
+        if filters:
+            if len(filters) == 1 and filters[0] is self.published:
+                mask &= arrays["published"]
+            else:
+                allowed = np.zeros(len(mask), dtype=bool)
+                allowed[np.asarray(_intersect(filters), dtype=np.int64)] = True
+                mask &= allowed
+        ranks = np.nonzero(mask)[0]
+        if not len(ranks):
+            return []
+        bm25 = acc[ranks]
+        final = p.text * bm25 / (bm25.max() or 1.0) + arrays["prior"][ranks]
+        if len(ranks) > limit:
+            part = np.argpartition(-final, limit - 1)[:limit]
+            ranks, final = ranks[part], final[part]
+        # Pertinence décroissante; à score égal, le plus récent d'abord.
+        order = np.lexsort((ranks, -final))
+        return [(float(final[i]), int(ranks[i])) for i in order]
+
+    def _relevance(self, query: str, filters: list[list[int]], limit: int) -> Optional[list[tuple[float, int]]]:
+        """
+        Les `limit` meilleurs [(score final, rang)] pour `query` parmi les items passant `filters` (postings);
+        None si la requête ne contient aucun terme indexable (que des mots vides).
+        NumPy si disponible (postings vectorisés), sinon boucle Python; mêmes résultats.
+        """
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+        if limit <= 0:
+            return []
+        p = self.ranking
+        need = max(1, math.ceil(len(terms) * p.min_match))
+        fast = self._relevance_numpy(terms, need, filters, limit)
+        if fast is not None:
+            return fast
+        found = self.text.scores(terms, self.rank_of_doc, p, self.text_stats)
+        if not filters:
+            allowed = None
+        elif len(filters) == 1 and filters[0] is self.published:
+            allowed = self.published_set
+        else:
+            allowed = set(_intersect(filters))
+        hits = [(s, r) for r, (s, k) in found.items() if k >= need and (allowed is None or r in allowed)]
+        if not hits:
+            return []
+        # Par BM25 décroissant: arrêt dès que même fraîcheur et fiabilité maximales ne peuvent plus entrer dans le top.
+        hits.sort(key=lambda x: (-x[0], x[1]))
+        best = hits[0][0] or 1.0
+        half_life = max(1.0, p.half_life_days * 86400)
+        top: list[tuple[float, int]] = []
+        for s, r in hits:
+            if len(top) >= limit and p.text * s / best + p.recency + p.reliability < top[0][0]:
+                break
+            ts = self.sort_ts[r]
+            fresh = 0.0 if ts == float("-inf") else 0.5 ** (max(0.0, self.newest_ts - ts) / half_life)
+            entry = (p.text * s / best + (p.recency * fresh + p.reliability * self.items[r].reliability_score), -r)
+            if len(top) < limit:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+        # Pertinence décroissante; à score égal, le plus récent d'abord.
+        return [(score, -neg) for score, neg in sorted(top, reverse=True)]
+
+    def _filters(self, country: str, category: str, tag: str, published_only: bool) -> list[list[int]]:
+        postings: list[list[int]] = []
+        if published_only:
+            postings.append(self.published)
+        if country:
+            postings.append(self.by_country.get(country, []))
+        if category:
+            postings.append(self.by_category.get(category, []))
+        if tag:
+            postings.append(self.by_tag.get(tag, []))
+        return postings
+
+    def matches(self, n: NewsItem, *, country: str = "", category: str = "", tag: str = "", published_only: bool = True) -> bool:
+        """
+        Mêmes filtres que `search`, pour un item isolé (flux delta).
+        """
+
+        return not (
+            (published_only and n.status != "published")
+            or (country and n.country.lower() != country)
+            or (category and n.category.lower() != category)
+            or (tag and tag not in n.tags)
+        )
+
+    def search(
+        self,
+        *,
+        country: str = "",
+        category: str = "",
+        tag: str = "",
+        q: str = "",
+        limit: int = 30,
+        published_only: bool = True,
+        offset: int = 0,
+    ) -> list[NewsItem]:
+        postings = self._filters(country, category, tag, published_only)
+        offset = max(0, int(offset))
+
+        if q:
+            scored = self._relevance(q, postings, offset + limit)
+            if scored is not None:
+                return [self.items[r] for _, r in scored[offset:]]
+
+        if not postings:
+            return self.items[offset : offset + limit]
+        ranks = _intersect(postings)
+        return [self.items[r] for r in heapq.nsmallest(offset + limit, ranks)[offset:]]
+
+    def rank_after(self, ts: Optional[float], item_id: str) -> int:
+        """
+        Premier rang après l'item (date, id) d'un curseur. Stable si des items plus récents arrivent;
+        si l'item a disparu, reprise au début de son groupe de même date (doublons possibles, aucun trou).
+        """
+
+        key = float("inf") if ts is None else -float(ts)
+        lo, hi = bisect_left(self._neg_ts, key), bisect_right(self._neg_ts, key)
+        for r in range(lo, hi):
+            if self.items[r].id == item_id:
+                return r + 1
+        return lo
+
+    def page(
+        self,
+        *,
+        country: str = "",
+        category: str = "",
+        tag: str = "",
+        published_only: bool = True,
+        start: int = 0,
+        limit: int = 30,
+    ) -> tuple[list[int], bool]:
+        """
+        Rangs (ordre chronologique) à partir de `start`: (jusqu'à `limit` rangs, reste-t-il des items).
+        """
+
+        postings = self._filters(country, category, tag, published_only)
+        if postings:
+            ranks = _intersect(postings)
+            i = bisect_left(ranks, start)
+            chosen = ranks[i : i + limit + 1]
+        else:
+            chosen = list(range(start, min(len(self.items), start + limit + 1)))
+        return chosen[:limit], len(chosen) > limit
+
+
+_INDEXES = DerivedCache(NewsIndex)
+
+
+def news_index(items: list[Any]) -> NewsIndex:
+    """
+    NewsIndex pour cette liste d'items bruts, réutilisé tant que c'est le même objet (voir DerivedCache).
+    """
+
+    return _INDEXES.get(items)
+
+
 def list_news(
     *,
     country: Optional[str] = None,
@@ -95,37 +428,18 @@ def list_news(
 ) -> list[dict[str, Any]]:
     src = data if isinstance(data, dict) else _load_news()
     items = src.get("items") if isinstance(src.get("items"), list) else []
-
-    c = _norm(country).lower()
-    cat = _norm(category).lower()
-    t = _norm(tag).lower()
-    query = _norm(q).lower()
-
-    out: list[NewsItem] = []
-    for raw in items:
-        if not isinstance(raw, dict):
-            continue
-        n = _parse_item(raw)
-
-        if published_only and n.status != "published":
-            continue
-        if c and _norm(n.country).lower() != c:
-            continue
-        if cat and _norm(n.category).lower() != cat:
-            continue
-        if t and t not in [x.lower() for x in n.tags]:
-            continue
-        if query:
-            hay = " ".join([n.title, n.summary, n.country, n.category, " ".join(n.tags), n.source_name]).lower()
-            if query not in hay:
-                continue
-
-        out.append(n)
-
-    out.sort(key=lambda x: (_parse_dt(x.published_at) or datetime.min), reverse=True)
+    index = news_index(items)
 
     lim = max(1, min(int(limit or 30), 200))
-    return [news_to_dict(x) for x in out[:lim]]
+    found = index.search(
+        country=_norm(country).lower(),
+        category=_norm(category).lower(),
+        tag=_norm(tag).lower(),
+        q=_norm(q).lower(),
+        limit=lim,
+        published_only=published_only,
+    )
+    return [news_to_dict(x) for x in found]
 
 
 def news_to_dict(n: NewsItem) -> dict[str, Any]:
@@ -140,6 +454,7 @@ def news_to_dict(n: NewsItem) -> dict[str, Any]:
         "source_url": n.source_url,
         "published_at": n.published_at,
         "reliability_score": float(n.reliability_score),
+        "also_reported_by": [dict(x) for x in n.also_reported_by],
         "disclaimer": "Information indicative. Vérifier la source officielle avant action.",
     }
 
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from .news import item_sort_ts
+
+# Statut posé sur les items non canoniques d'un cluster (exclus du feed publié).
+DUPLICATE_STATUS = "duplicate"
+
+_MERSENNE = (1 << 61) - 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_NUM_RE = re.compile(r"\d+")
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").strip().split())
+
+
+@dataclass(frozen=True)
+class DedupParams:
+    """
+    - shingle: taille des n-grammes de caractères (texte normalisé, sans accents)
+    - bands x rows: signature MinHash (bands * rows permutations) découpée en bandes LSH;
+      seuil implicite ~ (1 / bands) ** (1 / rows)
+    - threshold: Jaccard minimal (exact, sur les shingles) pour confirmer un candidat
+    - max_gap_days: écart maximal de date de publication dans un même cluster
+    """
+
+    shingle: int = 4
+    bands: int = 8
+    rows: int = 4
+    threshold: float = 0.5
+    max_gap_days: float = 7.0
+
+
+def _fold(text: str) -> str:
+    t = unicodedata.normalize("NFKD", text.lower())
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return " ".join(_WORD_RE.findall(t))
+
+
+def _shingles(text: str, k: int) -> frozenset[int]:
+    t = _fold(text)
+    if not t:
+        return frozenset()
+    grams = {t[i : i + k] for i in range(max(1, len(t) - k + 1))}
+    # Hash stable d'un processus à l'autre (hash() est salé).
+    return frozenset(int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big") for g in grams)
+
+
+@lru_cache(maxsize=8)
+def _permutations(n: int) -> list[tuple[int, int]]:
+    out = []
+    for i in range(n):
+        d = hashlib.blake2b(f"minhash:{i}".encode("ascii"), digest_size=16).digest()
+        a = int.from_bytes(d[:8], "big") % (_MERSENNE - 1) + 1
+        b = int.from_bytes(d[8:], "big") % _MERSENNE
+        out.append((a, b))
+    return out
+
+
+def _minhash(shingles: frozenset[int], perms: list[tuple[int, int]]) -> tuple[int, ...]:
+    return tuple(min((a * h + b) % _MERSENNE for h in shingles) for a, b in perms)
+
+
+_FEATURES: "OrderedDict[tuple[str, int, int], tuple[frozenset[int], tuple[int, ...]]]" = OrderedDict()
+_FEATURES_MAX = 20000
+_FEATURES_LOCK = threading.Lock()
+
+
+def _features(text: str, k: int, perms: list[tuple[int, int]]) -> tuple[frozenset[int], tuple[int, ...]]:
+    """
+    (shingles, signature) mémorisés par texte: d'une ingestion à l'autre, seuls les nouveaux items sont hachés.
+    """
+
+    key = (text, k, len(perms))
+    with _FEATURES_LOCK:
+        hit = _FEATURES.get(key)
+        if hit is not None:
+            _FEATURES.move_to_end(key)
+            return hit
+    sh = _shingles(text, k)
+    feat = (sh, _minhash(sh, perms) if sh else ())
+    with _FEATURES_LOCK:
+        _FEATURES[key] = feat
+        while len(_FEATURES) > _FEATURES_MAX:
+            _FEATURES.popitem(last=False)
+    return feat
+
+
+def _jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def _text(raw: dict[str, Any]) -> str:
+    return f"{_norm(raw.get('title'))} {_norm(raw.get('summary'))}".strip()
+
+
+def _numbers(text: str) -> frozenset[str]:
+    return frozenset(_NUM_RE.findall(text))
+
+
+def _rank(raw: dict[str, Any]) -> tuple[float, int, str]:
+    # Canonique: source la plus fiable, puis première publication, puis id (déterministe).
+    try:
+        rel = float(raw.get("reliability_score", 0.5))
+    except Exception:
+        rel = 0.5
+    ts = item_sort_ts(raw)
+    return (-rel, ts if ts is not None else 0, _norm(raw.get("id")))
+
+
+def _link(raw: dict[str, Any]) -> dict[str, str]:
+    return {
+        "id": _norm(raw.get("id")),
+        "title": _norm(raw.get("title")),
+        "source_name": _norm(raw.get("source_name")),
+        "source_url": _norm(raw.get("source_url")),
+    }
+
+
+def _reset(raw: dict[str, Any]) -> dict[str, Any]:
+    item = dict(raw)
+    item.pop("also_reported_by", None)
+    if item.pop("duplicate_of", None) is not None and _norm(item.get("status")).lower() == DUPLICATE_STATUS:
+        item["status"] = "published"
+    return item
+
+
+def cluster_near_duplicates(items: list[dict[str, Any]], params: Optional[DedupParams] = None) -> tuple[list[dict[str, Any]], int]:
+    """
+    Regroupe les quasi-doublons (même annonce reprise par plusieurs sources, titre légèrement modifié).
+
+    - Shingles de caractères sur titre + résumé, signature MinHash, buckets LSH par bande:
+      seules les paires partageant un bucket sont comparées (coût sous-quadratique)
+    - Candidat confirmé si: même pays, Jaccard exact >= threshold, mêmes nombres
+      (« mise à jour du 12 » vs « du 19 »), dates à moins de max_gap_days
+    - Un item canonique par cluster, avec `also_reported_by` (id, titre, source); les autres
+      passent en status "duplicate" + `duplicate_of` (gardés: l'id reste connu des ingestions suivantes)
+    - Idempotent: les annotations précédentes sont recalculées à chaque passage; seuls les items
+      "published" sont regroupés (brouillons éditoriaux intacts)
+
+    Retourne (items dans l'ordre d'entrée, nombre d'items marqués doublons).
+    """
+
+    p = params or DedupParams()
+    out = [_reset(it) for it in items]
+    perms = _permutations(p.bands * p.rows)
+
+    feats: dict[int, tuple[frozenset[int], frozenset[str], str, Optional[int]]] = {}
+    buckets: dict[tuple[int, str, tuple[int, ...]], list[int]] = {}
+    for i, it in enumerate(out):
+        if _norm(it.get("status") or "published").lower() != "published":
+            continue
+        text = _text(it)
+        sh, sig = _features(text, p.shingle, perms)
+        if not sh:
+            continue
+        country = _norm(it.get("country")).lower()
+        feats[i] = (sh, _numbers(_fold(text)), country, item_sort_ts(it))
+        for b in range(p.bands):
+            buckets.setdefault((b, country, sig[b * p.rows : (b + 1) * p.rows]), []).append(i)
+
+    parent = list(range(len(out)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    max_gap = p.max_gap_days * 86400
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1 :]:
+                pair = (i, j) if i < j else (j, i)
+                if pair in checked or find(i) == find(j):
+                    continue
+                checked.add(pair)
+                sh_i, num_i, _, ts_i = feats[i]
+                sh_j, num_j, _, ts_j = feats[j]
+                if num_i != num_j:
+                    continue
+                if ts_i is not None and ts_j is not None and abs(ts_i - ts_j) > max_gap:
+                    continue
+                if _jaccard(sh_i, sh_j) >= p.threshold:
+                    parent[find(i)] = find(j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in feats:
+        clusters.setdefault(find(i), []).append(i)
+
+    duplicates = 0
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda k: _rank(out[k]))
+        head = out[members[0]]
+        head["also_reported_by"] = [_link(out[k]) for k in members[1:]]
+        for k in members[1:]:
+            out[k]["status"] = DUPLICATE_STATUS
+            out[k]["duplicate_of"] = _norm(head.get("id"))
+            duplicates += 1
+    return out, duplicates
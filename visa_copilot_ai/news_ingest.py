@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import itertools
 import os
 import time
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timezone
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterator, Optional
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
 import xml.etree.ElementTree as ET
 
-import importlib.resources as pkg_resources
+from .content_cache import CachedJson, load_json, resource_path
+from .news import item_sort_ts, normalize_published
+from .news_dedup import cluster_near_duplicates
 
 
 def _norm(s: Any) -> str:
@@ -26,23 +31,26 @@ def _sha_id(*parts: str) -> str:
     return h[:14]
 
 
-def _load_sources() -> dict[str, Any]:
+def _sources_entry() -> CachedJson:
     """
     Source:
     - embedded: visa_copilot_ai/resources/news_sources.json
     - override: GLOBALVISA_NEWS_SOURCES_PATH (modifiable sans toucher au code)
+    Servi depuis le cache de contenu (revalidation par mtime/size).
     """
 
     override = os.getenv("GLOBALVISA_NEWS_SOURCES_PATH", "").strip()
     if override:
         try:
-            with open(override, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return load_json(override)
         except Exception:
             pass
 
-    with pkg_resources.files("visa_copilot_ai").joinpath("resources/news_sources.json").open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json(resource_path("news_sources.json"))
+
+
+def _load_sources() -> dict[str, Any]:
+    return _sources_entry().data
 
 
 def load_sources_list(data: Optional[dict[str, Any]] = None) -> list[dict[str, Any]]:
@@ -51,82 +59,353 @@ def load_sources_list(data: Optional[dict[str, Any]] = None) -> list[dict[str, A
     return [x for x in out if isinstance(x, dict)]
 
 
-def _first_text(elem: Optional[ET.Element], tags: list[str]) -> str:
-    if elem is None:
-        return ""
-    for t in tags:
-        x = elem.find(t)
-        if x is not None and x.text:
-            return _norm(x.text)
+_PARSE_CHUNK = 64 * 1024
+_DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+
+def _localname(tag: Any) -> str:
+    t = str(tag)
+    return t.split("}", 1)[-1] if "}" in t else t
+
+
+def _child_text(elem: ET.Element, tag: str) -> str:
+    # Premier enfant `tag` (équivalent de elem.find(tag)) s'il a du texte.
+    x = elem.find(tag)
+    if x is not None and x.text:
+        return _norm(x.text)
     return ""
 
 
-def _parse_rss_or_atom(xml_text: str) -> list[dict[str, str]]:
+def _rss_item(it: ET.Element) -> dict[str, str]:
+    pub = _child_text(it, "pubDate") or _child_text(it, "published") or _child_text(it, f"{_DC_NS}date")
+    return {"title": _child_text(it, "title"), "link": _child_text(it, "link"), "published_at": pub}
+
+
+def _atom_entry(e: ET.Element) -> dict[str, str]:
+    title = ""
+    link = ""
+    published = ""
+    for child in list(e):
+        ln = _localname(child.tag)
+        if ln == "title" and child.text and not title:
+            title = _norm(child.text)
+        if ln == "link" and not link:
+            href = child.attrib.get("href")
+            if href:
+                link = _norm(href)
+        if ln in {"updated", "published"} and child.text and not published:
+            published = _norm(child.text)
+    return {"title": title, "link": link, "published_at": published}
+
+
+def _chunks(source: Any) -> Iterator[Any]:
+    if isinstance(source, (bytes, bytearray, str)):
+        for i in range(0, len(source), _PARSE_CHUNK):
+            yield source[i : i + _PARSE_CHUNK]
+        return
+    while True:
+        chunk = source.read(_PARSE_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_items(chunks: Iterator[Any]) -> Iterator[dict[str, str]]:
+    # Items RSS/Atom au fil des morceaux; lève ET.ParseError sur XML invalide.
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: list[ET.Element] = []
+
+    def _events() -> Iterator[dict[str, str]]:
+        for ev, el in parser.read_events():
+            if ev == "start":
+                stack.append(el)  # type: ignore[arg-type]
+                continue
+            stack.pop()
+            if not stack:
+                continue
+            parent = stack[-1]
+            ln = _localname(el.tag)  # type: ignore[union-attr]
+            pl = _localname(parent.tag)
+            if ln == "item" and pl == "channel":
+                yield _rss_item(el)  # type: ignore[arg-type]
+            elif ln == "entry" and pl == "feed" and len(stack) == 1:
+                yield _atom_entry(el)  # type: ignore[arg-type]
+            else:
+                continue
+            parent.remove(el)  # type: ignore[arg-type]
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from _events()
+    parser.close()
+    yield from _events()
+
+
+def iter_feed_items(source: Any, *, limit: Optional[int] = None) -> Iterator[dict[str, str]]:
+    """
+    Parse RSS/Atom en streaming (XMLPullParser): chaque item est produit dès sa balise fermante,
+    puis retiré de l'arbre. Mémoire bornée par la taille d'un item, pas par celle du flux.
+
+    - source: bytes (encodage lu dans la déclaration XML), str, ou flux binaire (.read)
+    - limit: arrêt après `limit` items (le reste du flux n'est ni lu ni parsé)
+    - RSS: <item> enfants de <channel>; Atom: <entry> enfants de <feed> (namespace-agnostic)
+    - octets invalides avant le premier item (ex. latin-1 sans déclaration d'encodage): flux relu en latin-1
+    - XML invalide: les items déjà lus sont gardés, la suite est ignorée
+    """
+
+    if limit is not None and limit <= 0:
+        return
+    chunks = _chunks(source)
+    head: Optional[list[Any]] = []  # morceaux lus avant le premier item, pour le repli latin-1
+    n = 0
+
+    def _recorded() -> Iterator[Any]:
+        for chunk in chunks:
+            if head is not None:
+                head.append(chunk)
+            yield chunk
+
+    try:
+        for item in _parse_items(_recorded()):
+            head = None
+            yield item
+            n += 1
+            if limit is not None and n >= limit:
+                return
+        return
+    except ET.ParseError:
+        if not head or not isinstance(head[0], (bytes, bytearray)):
+            return
+    # Comme l'ancien décodage utf-8 puis latin-1: la suite du flux est décodée au fil de l'eau.
+    latin1 = (bytes(c).decode("latin-1") for c in itertools.chain(head, chunks))
+    try:
+        for item in _parse_items(latin1):
+            yield item
+            n += 1
+            if limit is not None and n >= limit:
+                return
+    except ET.ParseError:
+        return
+
+
+_USER_AGENT = "GlobalVisaBot/0.1 (+official-only)"
+
+
+@dataclass(frozen=True)
+class FeedResponse:
+    """
+    Réponse d'un flux: status 200 (corps complet) ou 304 (inchangé, corps vide).
+    - body: octets bruts (l'encodage est lu dans la déclaration XML au parsing); text: hook `fetcher`
+    - nbytes: octets du corps effectivement transférés
+    - items: items déjà parsés, le corps n'est alors plus gardé (None: 304, ou corps identique au
+      précédent: rien à fusionner)
+    """
+
+    status: int
+    text: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    nbytes: int = 0
+    sha256: str = ""
+    body: bytes = b""
+    items: Optional[list[dict[str, str]]] = None
+
+
+class _HashingReader:
+    # Flux HTTP lu par morceaux: hash et taille calculés au passage, rien n'est accumulé.
+    def __init__(self, raw: Any) -> None:
+        self.raw = raw
+        self.sha = hashlib.sha256()
+        self.nbytes = 0
+
+    def read(self, n: int = _PARSE_CHUNK) -> bytes:
+        chunk = self.raw.read(n)
+        if chunk:
+            self.sha.update(chunk)
+            self.nbytes += len(chunk)
+        return chunk
+
+    def drain(self) -> None:
+        while self.read(_PARSE_CHUNK):
+            pass
+
+
+def _fetch_feed(
+    url: str,
+    *,
+    timeout_sec: float = 10,
+    etag: str = "",
+    last_modified: str = "",
+    limit: Optional[int] = None,
+    known_sha256: str = "",
+) -> FeedResponse:
+    """
+    GET conditionnel (If-None-Match / If-Modified-Since): un 304 évite téléchargement et parsing.
+    Corps parsé en streaming pendant la lecture (mémoire bornée par `limit` items, pas par la taille du flux);
+    le reste est lu sans être gardé pour compléter le hash. Le hash n'est connu qu'en fin de lecture:
+    égal à `known_sha256`, les items (déjà parsés) sont ignorés et la source n'est pas fusionnée.
+    """
+
+    headers = {"User-Agent": _USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        with urlopen(Request(url, headers=headers), timeout=timeout_sec) as resp:
+            reader = _HashingReader(resp)
+            items = list(iter_feed_items(reader, limit=limit))
+            reader.drain()
+            sha = reader.sha.hexdigest()
+            return FeedResponse(
+                status=int(getattr(resp, "status", 200) or 200),
+                etag=_norm(resp.headers.get("ETag")),
+                last_modified=_norm(resp.headers.get("Last-Modified")),
+                nbytes=reader.nbytes,
+                sha256=sha,
+                items=None if known_sha256 and sha == known_sha256 else items,
+            )
+    except HTTPError as e:
+        if e.code == 304:
+            return FeedResponse(status=304, etag=_norm(e.headers.get("ETag")) or etag, last_modified=_norm(e.headers.get("Last-Modified")) or last_modified)
+        raise
+
+
+def _as_feed_response(res: Any) -> FeedResponse:
+    # Un `fetcher` injecté peut retourner le texte brut (hook historique) ou une FeedResponse.
+    if isinstance(res, FeedResponse):
+        if res.status == 200 and not res.sha256:
+            raw = res.body or res.text.encode("utf-8")
+            return FeedResponse(200, res.text, res.etag, res.last_modified, res.nbytes or len(raw), hashlib.sha256(raw).hexdigest(), res.body, res.items)
+        return res
+    text = str(res or "")
+    raw = text.encode("utf-8")
+    return FeedResponse(status=200, text=text, nbytes=len(raw), sha256=hashlib.sha256(raw).hexdigest())
+
+
+def _parsed(resp: FeedResponse, *, limit: int, known_sha256: str) -> FeedResponse:
+    """
+    Réponse d'un `fetcher` injecté: parsée tout de suite (dans le thread de récupération) puis corps libéré,
+    pour ne garder en mémoire que des items et jamais tous les corps en même temps.
+    """
+
+    if resp.status != 200 or resp.items is not None:
+        return resp
+    items = None
+    if not (resp.sha256 and resp.sha256 == known_sha256):
+        items = list(iter_feed_items(resp.body or resp.text, limit=limit))
+    return replace(resp, text="", body=b"", items=items)
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, "") or default))
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class FetchLimits:
     """
-    Retourne une liste brute [{title, link, published_at}] issue de RSS/Atom.
-    Très permissif (namespace-agnostic au mieux).
+    Limites de récupération des flux:
+    - concurrency: flux récupérés en parallèle (tous hôtes confondus)
+    - per_host: requêtes simultanées max vers un même hôte (politesse)
+    - timeout_sec: délai par source (au-delà: erreur, le résultat tardif est ignoré)
+    - deadline_sec: délai global de l'ingestion (sources non terminées => erreur)
     """
 
-    if not _norm(xml_text):
-        return []
+    concurrency: int = 8
+    per_host: int = 2
+    timeout_sec: float = 10.0
+    deadline_sec: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "FetchLimits":
+        return cls(
+            concurrency=max(1, int(_env_num("GLOBALVISA_NEWS_FETCH_CONCURRENCY", 8))),
+            per_host=max(1, int(_env_num("GLOBALVISA_NEWS_FETCH_PER_HOST", 2))),
+            timeout_sec=max(0.1, _env_num("GLOBALVISA_NEWS_FETCH_TIMEOUT_SEC", 10.0)),
+            deadline_sec=max(0.1, _env_num("GLOBALVISA_NEWS_INGEST_DEADLINE_SEC", 60.0)),
+        )
+
 
+def _host(url: str) -> str:
     try:
-        root = ET.fromstring(xml_text)
+        return (urlsplit(url).hostname or "").lower()
     except Exception:
-        return []
-
-    # RSS: channel/item
-    channel = root.find("channel")
-    if channel is None:
-        channel = root.find("./rss/channel")
-    if channel is not None:
-        items = []
-        for it in channel.findall("item"):
-            title = _first_text(it, ["title"])
-            link = _first_text(it, ["link"])
-            pub = _first_text(it, ["pubDate", "published", "dc:date"])
-            items.append({"title": title, "link": link, "published_at": pub})
-        return items
-
-    # Atom: {feed}/{entry} (namespace may exist)
-    # We handle namespace by matching localname.
-    def localname(tag: str) -> str:
-        return tag.split("}", 1)[-1] if "}" in tag else tag
-
-    entries: list[ET.Element] = []
-    if localname(root.tag) == "feed":
-        for child in list(root):
-            if localname(child.tag) == "entry":
-                entries.append(child)
-
-    items2 = []
-    for e in entries:
-        title = ""
-        link = ""
-        published = ""
-        for child in list(e):
-            ln = localname(child.tag)
-            if ln == "title" and child.text and not title:
-                title = _norm(child.text)
-            if ln == "link" and not link:
-                href = child.attrib.get("href")
-                if href:
-                    link = _norm(href)
-            if ln in {"updated", "published"} and child.text and not published:
-                published = _norm(child.text)
-        items2.append({"title": title, "link": link, "published_at": published})
-    return items2
-
-
-def _fetch_url(url: str, *, timeout_sec: int = 10) -> str:
-    req = Request(url, headers={"User-Agent": "GlobalVisaBot/0.1 (+official-only)"})
-    with urlopen(req, timeout=timeout_sec) as resp:
-        raw = resp.read()
-        # best-effort utf-8
-        try:
-            return raw.decode("utf-8")
-        except Exception:
-            return raw.decode("latin-1", errors="ignore")
+        return ""
+
+
+def _fetch_all(urls: list[str], fetch: Callable[[str], Any], limits: FetchLimits) -> list[tuple[bool, Any]]:
+    """
+    Récupère tous les flux en parallèle; retourne [(ok, réponse | message d'erreur)] dans l'ordre de `urls`.
+
+    Ordonnancement: les sources partent dans l'ordre de la liste, en sautant celles dont l'hôte
+    a déjà `per_host` requêtes en vol (aucun thread n'attend un hôte occupé).
+    """
+
+    results: list[Optional[tuple[bool, Any]]] = [None] * len(urls)
+    pending = list(range(len(urls)))
+    inflight: dict[Future[Any], tuple[int, str, float]] = {}
+    # Requêtes en timeout: résultat ignoré, mais l'hôte reste occupé jusqu'à leur fin réelle.
+    abandoned: dict[Future[Any], str] = {}
+    per_host: dict[str, int] = {}
+    deadline = time.monotonic() + limits.deadline_sec
+    pool = ThreadPoolExecutor(max_workers=limits.concurrency, thread_name_prefix="news-fetch")
+    try:
+        while pending or inflight:
+            now = time.monotonic()
+            for fut in [f for f in abandoned if f.done()]:
+                per_host[abandoned.pop(fut)] -= 1
+            for i in list(pending):
+                if len(inflight) + len(abandoned) >= limits.concurrency or now >= deadline:
+                    break
+                host = _host(urls[i])
+                if per_host.get(host, 0) >= limits.per_host:
+                    continue
+                pending.remove(i)
+                per_host[host] = per_host.get(host, 0) + 1
+                inflight[pool.submit(fetch, urls[i])] = (i, host, now)
+
+            waiting = list(inflight) + list(abandoned)
+            if not waiting or now >= deadline:
+                break
+            next_timeout = min([t0 + limits.timeout_sec for _, _, t0 in inflight.values()] + [deadline])
+            done, _ = wait(waiting, timeout=max(0.0, next_timeout - time.monotonic()), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for fut, (i, host, t0) in list(inflight.items()):
+                if fut in done:
+                    try:
+                        results[i] = (True, fut.result())
+                    except Exception as e:
+                        results[i] = (False, f"fetch failed: {e}")
+                    per_host[host] -= 1
+                elif now - t0 >= limits.timeout_sec:
+                    results[i] = (False, f"fetch failed: timeout after {limits.timeout_sec:g}s")
+                    abandoned[fut] = host
+                else:
+                    continue
+                del inflight[fut]
+    finally:
+        # Requêtes abandonnées / hors délai: elles finissent en arrière-plan, rien n'attend leur résultat.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return [r if r is not None else (False, "fetch failed: deadline exceeded") for r in results]
+
+
+def _set_published(item: dict[str, Any], raw: str, *, fallback_iso: str, fallback_ts: int) -> None:
+    """
+    Normalise la date à l'ingestion: published_at en ISO UTC + published_ts (epoch, clé de tri).
+    Date absente ou illisible: date d'ingestion (texte d'origine gardé dans published_at_raw).
+    """
+
+    iso, ts = normalize_published(raw)
+    if ts is None:
+        iso, ts = fallback_iso, fallback_ts
+    if raw and raw != iso:
+        item["published_at_raw"] = raw
+    item["published_at"] = iso
+    item["published_ts"] = ts
 
 
 @dataclass(frozen=True)
@@ -137,52 +416,113 @@ class IngestResult:
     total_items: int
     errors: list[str]
     updated_at: str
+    took_ms: int = 0
+    bytes_transferred: int = 0
+    skipped_sources: int = 0  # 304 (ni corps ni parsing) ou contenu identique (hash): aucune fusion
+    duplicate_items: int = 0  # quasi-doublons rattachés à un item canonique (status "duplicate")
+    # Validateurs par source ({source_key: {feed_url, etag, last_modified, sha256}}), à persister.
+    validators: dict[str, dict[str, str]] = field(default_factory=dict)
 
 
 def ingest_news(
     *,
     sources: Optional[list[dict[str, Any]]] = None,
     existing_items: Optional[list[dict[str, Any]]] = None,
-    fetcher: Optional[Callable[[str], str]] = None,
+    fetcher: Optional[Callable[[str], Any]] = None,
     max_per_source: int = 20,
     max_total: int = 400,
+    limits: Optional[FetchLimits] = None,
+    validators: Optional[dict[str, dict[str, str]]] = None,
 ) -> tuple[list[dict[str, Any]], IngestResult]:
     """
     Ingestion RSS/Atom -> items compatibles avec visa_copilot_ai/news.py.
     - Pas de dépendances externes.
+    - Flux récupérés en parallèle (voir FetchLimits), fusion dans l'ordre des sources (déterministe).
+    - Incrémental: `validators` (issus d'une ingestion précédente, voir IngestResult.validators)
+      => GET conditionnel (304: source sautée) et, si le hash du corps n'a pas changé, pas de fusion
+      (corps HTTP parsé pendant sa lecture, avant que le hash soit connu; `fetcher` injecté: pas de parsing).
+      Ignorés si `existing_items` est vide (les items déjà ingérés ne seraient plus là).
+    - Quasi-doublons (même annonce sur plusieurs sources): regroupés, un seul item publié par cluster.
     - Échoue en douceur (retourne errors).
     """
 
+    started = time.monotonic()
     srcs = sources if isinstance(sources, list) else load_sources_list()
-    fetch = fetcher or (lambda u: _fetch_url(u, timeout_sec=10))
+    lim = limits or FetchLimits.from_env()
     existing = existing_items if isinstance(existing_items, list) else []
+    prev_validators = validators if isinstance(validators, dict) and existing else {}
+    by_url: dict[str, dict[str, str]] = {}
+    for v in prev_validators.values():
+        if isinstance(v, dict) and _norm(v.get("feed_url")):
+            by_url[_norm(v.get("feed_url"))] = v
+
+    per_source = max(1, int(max_per_source or 20))
+
+    def fetch(url: str) -> FeedResponse:
+        # Récupération + parsing dans le thread de la source: seuls les items parsés (au plus
+        # max_per_source) attendent la fusion, jamais les corps des flux.
+        v = by_url.get(url) or {}
+        known = _norm(v.get("sha256"))
+        if fetcher is None:
+            return _fetch_feed(
+                url,
+                timeout_sec=lim.timeout_sec,
+                etag=_norm(v.get("etag")),
+                last_modified=_norm(v.get("last_modified")),
+                limit=per_source,
+                known_sha256=known,
+            )
+        return _parsed(_as_feed_response(fetcher(url)), limit=per_source, known_sha256=known)
+
+    now_iso = _iso_now()
+    now_ts = int(time.time())
 
     # index by id
     by_id: dict[str, dict[str, Any]] = {}
     for it in existing:
         if isinstance(it, dict) and _norm(it.get("id")):
-            by_id[_norm(it["id"])] = dict(it)
+            item = dict(it)
+            if "published_ts" not in item:
+                # Items ingérés avant la normalisation des dates: normalisés une fois.
+                _set_published(item, _norm(item.get("published_at")), fallback_iso=now_iso, fallback_ts=now_ts)
+            by_id[_norm(it["id"])] = item
 
     errors: list[str] = []
     new_count = 0
     fetched = 0
-
-    for s in srcs:
-        if len(by_id) >= max_total:
-            break
-
-        feed_url = _norm(s.get("feed_url"))
-        if not feed_url:
+    nbytes = 0
+    skipped = 0
+    new_validators: dict[str, dict[str, str]] = {
+        k: dict(v) for k, v in prev_validators.items() if isinstance(v, dict)
+    }
+
+    feeds = [(s, _norm(s.get("feed_url"))) for s in srcs]
+    feeds = [(s, u) for s, u in feeds if u]
+    if len(by_id) >= max_total:
+        feeds = []
+    fetched_feeds = _fetch_all([u for _, u in feeds], fetch, lim)
+
+    for (s, feed_url), (ok, res) in zip(feeds, fetched_feeds):
+        key = _norm(s.get("id")) or feed_url
+        if not ok:
+            errors.append(f"{key}: {res}")
             continue
-
-        try:
-            xml = fetch(feed_url)
-            fetched += 1
-        except Exception as e:
-            errors.append(f"{_norm(s.get('id') or feed_url)}: fetch failed: {e}")
+        fetched += 1
+        resp: FeedResponse = res
+        nbytes += resp.nbytes
+        prev = by_url.get(feed_url) or {}
+        if resp.status == 304 or (resp.sha256 and resp.sha256 == prev.get("sha256")):
+            skipped += 1
+            if prev:
+                new_validators[key] = {**prev, "etag": resp.etag or _norm(prev.get("etag")), "last_modified": resp.last_modified or _norm(prev.get("last_modified"))}
+            continue
+        if len(by_id) >= max_total:
+            # Non fusionné: garder les anciens validateurs pour ne pas sauter ce contenu la prochaine fois.
             continue
+        new_validators[key] = {"feed_url": feed_url, "etag": resp.etag, "last_modified": resp.last_modified, "sha256": resp.sha256}
 
-        raw_items = _parse_rss_or_atom(xml)[: max(1, int(max_per_source or 20))]
+        # Items parsés en streaming pendant la récupération, au plus max_per_source.
+        raw_items = resp.items or []
 
         # map -> our item schema
         for r in raw_items:
@@ -213,18 +553,16 @@ def ingest_news(
                 "summary": "",
                 "source_name": _norm(s.get("source_name")),
                 "source_url": link or _norm(s.get("source_url")),
-                "published_at": _norm(r.get("published_at")) or _iso_now(),
                 "status": "published",
                 "reliability_score": reliability,
             }
+            _set_published(by_id[nid], _norm(r.get("published_at")), fallback_iso=now_iso, fallback_ts=now_ts)
             new_count += 1
 
-        # throttle a bit
-        time.sleep(0.05)
-
-    merged = list(by_id.values())
-    # Sort newest first (best-effort ISO or rss date string left as-is)
-    merged.sort(key=lambda x: _norm(x.get("published_at")), reverse=True)
+    # Quasi-doublons inter-sources: un item canonique par cluster (voir news_dedup).
+    merged, duplicates = cluster_near_duplicates(list(by_id.values()))
+    # Newest first, sur la clé epoch normalisée (plus de tri de chaînes RFC 822).
+    merged.sort(key=item_sort_ts, reverse=True)
 
     meta = IngestResult(
         ok=True,
@@ -233,6 +571,11 @@ def ingest_news(
         total_items=len(merged),
         errors=errors,
         updated_at=_iso_now(),
+        took_ms=int((time.monotonic() - started) * 1000),
+        bytes_transferred=nbytes,
+        skipped_sources=skipped,
+        validators=new_validators,
+        duplicate_items=duplicates,
     )
     if errors and fetched == 0:
         meta = IngestResult(
@@ -242,6 +585,11 @@ def ingest_news(
             total_items=len(merged),
             errors=errors,
             updated_at=_iso_now(),
+            took_ms=meta.took_ms,
+            bytes_transferred=nbytes,
+            skipped_sources=skipped,
+            validators=new_validators,
+            duplicate_items=duplicates,
         )
     return merged, meta
 
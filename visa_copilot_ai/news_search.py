@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Mots vides FR/EN (forme repliée: minuscules, sans accents).
+STOPWORDS = frozenset(
+    """
+    a au aux avec ce ces cet cette dans de des du elle en est et il ils je la le les leur leurs lui ma mais me mes
+    meme mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sont sur ta te tes ton tu un une vos
+    votre vous y ete etre avoir fait plus tres sans sous entre apres avant depuis comme tout tous toute toutes
+    an and are as at be been but by for from has have he her his how in into is it its of on or our she so
+    such than that the their them then there these they this those to was we were what when where which who
+    will with would you your not no can may about after before over under new
+    """.split()
+)
+
+
+def fold(text: str) -> str:
+    t = text.lower()
+    if t.isascii():
+        return t
+    t = unicodedata.normalize("NFKD", t)
+    return "".join(c for c in t if not unicodedata.combining(c))
+
+
+def stem(word: str) -> str:
+    """
+    Racinisation légère FR/EN: pluriels (s, x, ies, aux) puis terminaisons courantes (ing, ed, e final).
+    Volontairement prudente: rapprocher « étudiantes » / « étudiant », « permits » / « permit »,
+    sans fusionner des mots distincts.
+    """
+
+    w = word
+    if len(w) > 4 and w.endswith("ies"):
+        w = w[:-3] + "y"
+    elif len(w) > 4 and w.endswith("aux"):
+        w = w[:-3] + "al"
+    elif len(w) > 3 and w[-1] in "sx" and not w.endswith(("ss", "us", "is")):
+        w = w[:-1]
+    if len(w) > 5 and w.endswith("ing"):
+        w = w[:-3]
+    elif len(w) > 4 and w.endswith("ed"):
+        w = w[:-2]
+    elif len(w) > 4 and w.endswith("e"):
+        w = w[:-1]
+    return w
+
+
+@lru_cache(maxsize=200_000)
+def _term(word: str) -> str:
+    w = fold(word)
+    if len(w) < 2 or w in STOPWORDS:
+        return ""
+    return stem(w)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Texte -> termes indexés: repli des accents, minuscules, mots vides et lettres isolées retirés, racinisation.
+    Analyse mémorisée par mot (vocabulaire borné): le coût par item est un découpage + des lookups.
+    """
+
+    return [t for t in map(_term, _WORD_RE.findall(text.lower())) if t]
+
+
+@dataclass(frozen=True)
+class RankingParams:
+    """
+    Score final d'un résultat = text * BM25 normalisé (meilleur = 1) + recency * fraîcheur + reliability * fiabilité.
+    - fraîcheur: 0.5 ** (âge / half_life_days), âge mesuré depuis l'item le plus récent de l'index
+    - min_match: part des termes de la requête qu'un item doit contenir (arrondi au supérieur)
+    """
+
+    k1: float = 1.2
+    b: float = 0.75
+    text: float = 0.7
+    recency: float = 0.2
+    reliability: float = 0.1
+    half_life_days: float = 30.0
+    min_match: float = 0.66
+
+
+@dataclass(frozen=True)
+class TextStats:
+    """
+    Statistiques BM25 figées à la construction d'un instantané (NewsIndex): une reconstruction en cours
+    sur l'index partagé ne change ni les idf ni la longueur moyenne vus par les lecteurs de l'instantané.
+    - n_docs: documents existants alors (les suivants sont hors de l'instantané)
+    """
+
+    n_docs: int
+    n_live: int
+    total_len: int
+    df: dict[str, int]
+
+
+def doc_key(item_id: str, text: str) -> str:
+    return hashlib.sha1(f"{item_id}\x00{text}".encode("utf-8")).hexdigest()[:20]
+
+
+class TextIndex:
+    """
+    Index inversé BM25 incrémental, partagé d'une version de contenu à la suivante.
+
+    - Documents identifiés par une clé (id + texte): un item inchangé n'est jamais re-tokenisé
+    - Postings en ajout seul (doc, tf); un document retiré reste dans les postings (les lecteurs filtrent
+      par leurs propres documents) mais sort des statistiques (df, N, longueur moyenne)
+    - Chaque instantané score avec ses statistiques figées (`stats()` à la construction)
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.docs: dict[str, int] = {}
+        self.doc_len: list[int] = []
+        self.doc_terms: list[tuple[str, ...]] = []
+        self.live: list[bool] = []
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        self.df: dict[str, int] = {}
+        self.n_live = 0
+        self.total_len = 0
+        self._norms: tuple[tuple[int, int, int, float, float], list[float]] = ((0, 0, 0, 0.0, 0.0), [])
+        self._np_norms: tuple[tuple[int, int, int, float, float], Any] = ((0, 0, 0, 0.0, 0.0), None)
+        self._np_postings: dict[str, tuple[int, Any, Any]] = {}
+
+    def __len__(self) -> int:
+        return self.n_live
+
+    @property
+    def dead(self) -> int:
+        return len(self.doc_len) - self.n_live
+
+    def _set_live(self, doc: int, live: bool) -> None:
+        if self.live[doc] == live:
+            return
+        self.live[doc] = live
+        delta = 1 if live else -1
+        self.n_live += delta
+        self.total_len += delta * self.doc_len[doc]
+        for t in self.doc_terms[doc]:
+            self.df[t] = self.df.get(t, 0) + delta
+
+    def add(self, key: str, text: str) -> int:
+        """
+        Numéro de document pour `key`; le texte n'est analysé que si la clé est nouvelle.
+        """
+
+        with self._lock:
+            doc = self.docs.get(key)
+            if doc is not None:
+                self._set_live(doc, True)
+                return doc
+            terms = tokenize(text)
+            tf = Counter(terms)
+            doc = len(self.doc_len)
+            self.docs[key] = doc
+            self.doc_len.append(len(terms))
+            self.doc_terms.append(tuple(tf))
+            self.live.append(True)
+            self.n_live += 1
+            self.total_len += len(terms)
+            postings, df = self.postings, self.df
+            for t, n in tf.items():
+                posting = postings.get(t)
+                if posting is None:
+                    postings[t] = [(doc, n)]
+                else:
+                    posting.append((doc, n))
+                df[t] = df.get(t, 0) + 1
+            return doc
+
+    def retain(self, docs: Iterable[int]) -> None:
+        """
+        Ensemble des documents vivants = `docs` (les autres sortent des statistiques).
+        """
+
+        keep = set(docs)
+        with self._lock:
+            for doc, live in enumerate(self.live):
+                if live != (doc in keep):
+                    self._set_live(doc, not live)
+
+    def stats(self) -> TextStats:
+        with self._lock:
+            return TextStats(len(self.doc_len), self.n_live, self.total_len, dict(self.df))
+
+    def _length_norms(self, stats: TextStats, k1: float, b: float) -> list[float]:
+        # k1 * (1 - b + b * dl / avgdl) par document, recalculé seulement quand les statistiques changent.
+        key = (stats.n_docs, stats.n_live, stats.total_len, k1, b)
+        cached = self._norms
+        if cached[0] == key:
+            return cached[1]
+        avgdl = (stats.total_len / max(1, stats.n_live)) or 1.0
+        norms = [k1 * (1 - b + b * dl / avgdl) for dl in self.doc_len[: stats.n_docs]]
+        self._norms = (key, norms)
+        return norms
+
+    def scores(self, terms: list[str], allowed: dict[int, int], params: RankingParams, stats: TextStats) -> dict[int, tuple[float, int]]:
+        """
+        BM25 des documents de `allowed` (doc -> rang) contenant au moins un terme: {rang: (score, nb de termes trouvés)}.
+        """
+
+        n = max(1, stats.n_live)
+        norms = self._length_norms(stats, params.k1, params.b)
+        acc: dict[int, float] = {}
+        cnt: dict[int, int] = {}
+        get = allowed.get
+        for t in dict.fromkeys(terms):
+            posting = self.postings.get(t)
+            if not posting:
+                continue
+            df = max(1, stats.df.get(t, 0))
+            w = math.log(1.0 + (n - df + 0.5) / (df + 0.5)) * (params.k1 + 1)
+            for doc, tf in posting:
+                rank = get(doc)
+                if rank is None:
+                    continue
+                acc[rank] = acc.get(rank, 0.0) + w * tf / (tf + norms[doc])
+                cnt[rank] = cnt.get(rank, 0) + 1
+        return {r: (s, cnt[r]) for r, s in acc.items()}
+
+    # --- chemin NumPy (optionnel) ---
+
+    def _np_length_norms(self, np: Any, stats: TextStats, k1: float, b: float) -> Any:
+        key = (stats.n_docs, stats.n_live, stats.total_len, k1, b)
+        cached = self._np_norms
+        if cached[0] == key:
+            return cached[1]
+        avgdl = (stats.total_len / max(1, stats.n_live)) or 1.0
+        norms = k1 * (1 - b + b * np.asarray(self.doc_len[: stats.n_docs], dtype=np.float64) / avgdl)
+        self._np_norms = (key, norms)
+        return norms
+
+    def _np_posting(self, np: Any, term: str) -> tuple[Any, Any]:
+        # Tableaux (docs croissants, tf) par terme; après une ingestion, seule la fin ajoutée est convertie.
+        posting = self.postings.get(term) or []
+        size = len(posting)
+        done, docs, tf = self._np_postings.get(term) or (0, None, None)
+        if done == size and docs is not None:
+            return docs, tf
+        arr = np.asarray(posting[done:size], dtype=np.int64).reshape(-1, 2)
+        if docs is None:
+            docs, tf = arr[:, 0], arr[:, 1].astype(np.float64)
+        else:
+            docs, tf = np.concatenate([docs, arr[:, 0]]), np.concatenate([tf, arr[:, 1].astype(np.float64)])
+        self._np_postings[term] = (size, docs, tf)
+        return docs, tf
+
+    def scores_numpy(self, np: Any, terms: list[str], rank_of_doc: Any, n_ranks: int, params: RankingParams, stats: TextStats) -> tuple[Any, Any]:
+        """
+        Équivalent vectorisé de `scores`: (BM25 par rang, nb de termes trouvés par rang).
+        `rank_of_doc`: tableau doc -> rang (-1 hors de l'instantané).
+        """
+
+        n = max(1, stats.n_live)
+        norms = self._np_length_norms(np, stats, params.k1, params.b)
+        acc = np.zeros(n_ranks, dtype=np.float64)
+        cnt = np.zeros(n_ranks, dtype=np.int32)
+        for t in dict.fromkeys(terms):
+            docs, tf = self._np_posting(np, t)
+            # Documents ajoutés après la construction de l'instantané: hors de rank_of_doc.
+            cut = int(np.searchsorted(docs, len(rank_of_doc)))
+            docs, tf = docs[:cut], tf[:cut]
+            ranks = rank_of_doc[docs]
+            keep = ranks >= 0
+            if not keep.any():
+                continue
+            docs, tf, ranks = docs[keep], tf[keep], ranks[keep]
+            df = max(1, stats.df.get(t, 0))
+            w = math.log(1.0 + (n - df + 0.5) / (df + 0.5)) * (params.k1 + 1)
+            acc[ranks] += w * tf / (tf + norms[docs])
+            cnt[ranks] += 1
+        return acc, cnt
+
+
+def reusable(index: Optional[TextIndex], live_after: int) -> bool:
+    """
+    Réutiliser l'index précédent tant que les documents morts restent minoritaires (sinon reconstruction).
+    """
+
+    return index is not None and index.dead + max(0, index.n_live - live_after) <= max(1000, live_after)
@@ -1,60 +1,37 @@
 from __future__ import annotations
 
 import base64
-import re
+import hashlib
+import os
+import tempfile
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Optional
+from io import BytesIO
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
 
+from .mrz import MRZ_CHARSET, MrzTd3, find_td3
+from .ocr_cache import OcrDiskCache, cache_key, default_cache
+from .ocr_fields import extract_field_matches, extract_fields
+from .ocr_preprocess import PreprocessConfig, default_preset, preprocess_image
 
-def _norm(s: Any) -> str:
-    return " ".join(str(s or "").strip().split())
+# À incrémenter dès que l'extraction change (texte ou champs): invalide le cache disque.
+OCR_ENGINE_VERSION = "ocr-6"
 
+# Source d'extraction: octets déjà en mémoire, ou fichier binaire (upload spoolé sur disque).
+Source = Union[bytes, BinaryIO]
 
-def _to_iso_date(s: str) -> Optional[str]:
-    t = _norm(s)
-    if not t:
-        return None
-    # YYYY-MM-DD
-    m = re.search(r"\b(\d{4})-(\d{2})-(\d{2})\b", t)
-    if m:
-        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
-    # DD/MM/YYYY or DD.MM.YYYY
-    m = re.search(r"\b(\d{1,2})[\/\.](\d{1,2})[\/\.](\d{4})\b", t)
-    if m:
-        dd = int(m.group(1))
-        mm = int(m.group(2))
-        yy = int(m.group(3))
-        if 1 <= mm <= 12 and 1 <= dd <= 31:
-            return f"{yy:04d}-{mm:02d}-{dd:02d}"
-    return None
-
-
-def _parse_float(s: str) -> Optional[float]:
-    raw0 = _norm(s).replace(" ", "")
-    # Handle 1,234.56 vs 1.234,56
-    if "," in raw0 and "." in raw0:
-        # decide decimal separator by last occurrence
-        if raw0.rfind(".") > raw0.rfind(","):
-            # 1,234.56 -> remove commas
-            raw = raw0.replace(",", "")
-        else:
-            # 1.234,56 -> remove dots, comma -> dot
-            raw = raw0.replace(".", "").replace(",", ".")
-    elif "," in raw0:
-        # treat comma as decimal separator
-        raw = raw0.replace(",", ".")
-    else:
-        raw = raw0
 
-    m = re.search(r"(-?\d+(?:\.\d+)?)", raw)
-    if not m:
-        return None
-    try:
-        return float(m.group(1))
-    except Exception:
-        return None
+def _as_stream(src: Source) -> BinaryIO:
+    if isinstance(src, (bytes, bytearray)):
+        return BytesIO(src)
+    src.seek(0)
+    return src
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").strip().split())
 
 
 @dataclass(frozen=True)
@@ -65,98 +42,131 @@ class OcrExtractResult:
     warnings: list[str]
     engine: str
     took_ms: int
+    cache_hit: bool = False
 
 
 def _extract_fields_from_text(text: str) -> dict[str, Any]:
     """
     Extraction heuristique (MVP) depuis un texte OCR/PDF.
     On alimente le "extracted" utilisé partout dans l'app.
+    Un seul passage sur le texte (voir ocr_fields.extract_field_matches pour positions/confiance).
     """
-    t = text or ""
-    tl = t.lower()
-    out: dict[str, Any] = {}
-
-    # Passport number (very rough): try explicit labels first
-    for pat in [
-        r"(passport\s*(no|number|n°)\s*[:\-]?\s*([A-Z0-9]{6,12}))",
-        r"(num[eé]ro\s+de\s+passeport\s*[:\-]?\s*([A-Z0-9]{6,12}))",
-    ]:
-        m = re.search(pat, t, flags=re.IGNORECASE)
-        if m:
-            cand = m.group(m.lastindex or 0)
-            cand = re.sub(r"[^A-Z0-9]", "", cand.upper())
-            if 6 <= len(cand) <= 12:
-                out["passport_number"] = cand
-                break
+    return extract_fields(text)
+
+
+# Champs produits par _extract_fields_from_text (cibles possibles de l'arrêt anticipé PDF).
+TARGET_FIELDS = frozenset(
+    {
+        "passport_number",
+        "expires_date",
+        "issued_date",
+        "full_name",
+        "ending_balance_usd",
+        "account_holder_name",
+        "coverage_amount",
+    }
+)
 
-    # If still missing, fallback to any alnum block likely to be passport number
-    if "passport_number" not in out:
-        m = re.search(r"\b([A-Z]{1,2}\d{5,10})\b", t.upper())
-        if m:
-            out["passport_number"] = m.group(1)
-
-    # Dates: issued / expiry
-    # Look for keywords around dates
-    date_hits: list[tuple[str, str]] = []
-    for m in re.finditer(r"\b(\d{4}-\d{2}-\d{2})\b|\b(\d{1,2}[\/\.]\d{1,2}[\/\.]\d{4})\b", t):
-        raw = m.group(0)
-        iso = _to_iso_date(raw) or ""
-        if not iso:
-            continue
-        start = max(0, m.start() - 25)
-        end = min(len(t), m.end() + 25)
-        ctx = tl[start:end]
-        date_hits.append((iso, ctx))
-
-    for iso, ctx in date_hits:
-        if any(k in ctx for k in ["expire", "expiry", "exp.", "date of expiry", "date d'expiration", "valid until", "valide jusqu"]):
-            out.setdefault("expires_date", iso)
-        if any(k in ctx for k in ["issue", "issued", "date of issue", "date d'emission", "date d'émission", "délivr", "deliver"]):
-            out.setdefault("issued_date", iso)
-
-    # If only one date and nothing else, keep it as issued_date hint
-    if "issued_date" not in out and "expires_date" not in out and date_hits:
-        out["issued_date"] = date_hits[0][0]
-
-    # Full name (very rough, prefer explicit labels)
-    m = re.search(r"(full\s+name|nom\s+complet)\s*[:\-]?\s*([A-Z][A-Z \-']{3,})", t, flags=re.IGNORECASE)
-    if m:
-        out["full_name"] = _norm(m.group(2))
-
-    # Bank statement: ending balance (USD heuristic)
-    m = re.search(r"(ending\s+balance|solde\s+final|closing\s+balance)\s*[:\-]?\s*([0-9][0-9\s,\.]+)", t, flags=re.IGNORECASE)
-    if m:
-        val = _parse_float(m.group(2))
-        if val is not None:
-            out["ending_balance_usd"] = val
-
-    # Account holder name
-    m = re.search(r"(account\s+holder|titulaire\s+du\s+compte)\s*[:\-]?\s*([A-Z][A-Z \-']{3,})", t, flags=re.IGNORECASE)
-    if m:
-        out["account_holder_name"] = _norm(m.group(2))
-
-    # Insurance coverage amount
-    m = re.search(r"(coverage|couverture)\s*[:\-]?\s*(EUR|USD|\€|\$)?\s*([0-9][0-9\s,\.]+)", t, flags=re.IGNORECASE)
-    if m:
-        val = _parse_float(m.group(3))
-        if val is not None:
-            out["coverage_amount"] = val
+# Parallélisme PDF: seulement pour les gros documents (sinon le coût de démarrage domine).
+PDF_PARALLEL_MIN_PAGES = 16
+PDF_PAGE_CHUNK = 8
 
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _pdf_page_budget() -> int:
+    return max(1, _env_int("GLOBALVISA_OCR_PDF_MAX_PAGES", 200))
+
+
+def _pdf_workers() -> int:
+    return max(0, _env_int("GLOBALVISA_OCR_PDF_WORKERS", 0))
+
+
+def _pdf_pages_text(path: str, start: int, stop: int) -> list[str]:
+    # Exécuté dans un processus du pool: chaque worker ouvre le PDF et lit sa tranche de pages.
+    from pypdf import PdfReader
+
+    out: list[str] = []
+    for page in PdfReader(path).pages[start:stop]:
+        try:
+            out.append(page.extract_text() or "")
+        except Exception:
+            out.append("")
     return out
 
 
-def _extract_text_from_pdf(data: bytes) -> tuple[str, list[str], str]:
+def iter_pdf_page_texts(reader: Any, *, n_pages: int, path: Optional[str] = None, workers: int = 0) -> Iterator[str]:
+    """
+    Texte des `n_pages` premières pages, dans l'ordre, produit à la demande.
+    Avec `workers` >= 2 et un chemin de fichier, les tranches de pages sont extraites en parallèle par un
+    pool propre à l'appel (fermé à la fin: aucun processus ne survit au document, y compris quand l'appel
+    vient d'un worker de la file OCR); fermer le générateur (arrêt anticipé) annule les tranches pas encore démarrées.
+    """
+
+    if workers >= 2 and path and n_pages >= PDF_PARALLEL_MIN_PAGES:
+        starts = range(0, n_pages, PDF_PAGE_CHUNK)
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(starts)))
+        try:
+            futures = [pool.submit(_pdf_pages_text, path, a, min(a + PDF_PAGE_CHUNK, n_pages)) for a in starts]
+            for fut in futures:
+                yield from fut.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return
+
+    for page in reader.pages[:n_pages]:
+        try:
+            yield page.extract_text() or ""
+        except Exception:
+            yield ""
+
+
+def _extract_text_from_pdf(src: Source, *, targets: Optional[frozenset[str]] = None) -> tuple[str, list[str], str]:
+    """
+    Lit les pages jusqu'au budget GLOBALVISA_OCR_PDF_MAX_PAGES (troncature signalée en warning),
+    et s'arrête dès que tous les champs `targets` ont été trouvés.
+    """
     warnings: list[str] = []
+    tmp_path: Optional[str] = None
     try:
         from pypdf import PdfReader
 
-        reader = PdfReader(io_bytes=data)
+        reader = PdfReader(_as_stream(src))
+        total = len(reader.pages)
+        budget = _pdf_page_budget()
+        n_pages = min(total, budget)
+
+        workers = _pdf_workers()
+        path = getattr(src, "name", None) if not isinstance(src, (bytes, bytearray)) else None
+        if workers >= 2 and n_pages >= PDF_PARALLEL_MIN_PAGES and not (isinstance(path, str) and os.path.exists(path)):
+            fd, tmp_path = tempfile.mkstemp(prefix="ocr-pdf-", suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                f.write(src if isinstance(src, (bytes, bytearray)) else _as_stream(src).read())
+            path = tmp_path
+
         parts: list[str] = []
-        for page in reader.pages[:12]:
-            try:
-                parts.append(page.extract_text() or "")
-            except Exception:
-                continue
+        found: set[str] = set()
+        read = 0
+        pages = iter_pdf_page_texts(reader, n_pages=n_pages, path=path if isinstance(path, str) else None, workers=workers)
+        try:
+            for txt in pages:
+                read += 1
+                if txt.strip():
+                    parts.append(txt)
+                if targets:
+                    found.update(k for k in _extract_fields_from_text(txt) if k in targets)
+                    if targets <= found:
+                        break
+        finally:
+            pages.close()
+
+        if total > budget and read >= n_pages:
+            warnings.append(f"PDF: {total} pages, seules les {budget} premières analysées (budget GLOBALVISA_OCR_PDF_MAX_PAGES).")
         txt = "\n".join([p for p in parts if p.strip()]).strip()
         if not txt:
             warnings.append("PDF: texte non extractible (scan image). OCR image requis.")
@@ -164,15 +174,18 @@ def _extract_text_from_pdf(data: bytes) -> tuple[str, list[str], str]:
     except Exception as e:
         warnings.append(f"PDF extraction erreur: {e}")
         return "", warnings, "pypdf"
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
 
-def _extract_text_from_image(data: bytes) -> tuple[str, list[str], str]:
+def _extract_text_from_image(src: Source, preset: Optional[PreprocessConfig] = None) -> tuple[str, list[str], str]:
     warnings: list[str] = []
     try:
-        from PIL import Image
-        from io import BytesIO
-
-        img = Image.open(BytesIO(data)).convert("RGB")
+        img = preprocess_image(_as_stream(src), preset or default_preset())
     except Exception as e:
         return "", [f"Image invalide: {e}"], "none"
 
@@ -191,46 +204,209 @@ def _extract_text_from_image(data: bytes) -> tuple[str, list[str], str]:
         return "", warnings, "tesseract_unavailable"
 
 
+# Bandeaux bas testés (fraction de la hauteur) pour localiser la MRZ d'une page passeport.
+MRZ_STRIPS = (0.28, 0.45)
+MRZ_PRESET = PreprocessConfig(name="mrz", target_dpi=200, page_width_in=7.0)  # 1400 px de large
+_MRZ_TESSERACT_CONFIG = f"--psm 6 -c tessedit_char_whitelist={MRZ_CHARSET}"
+
+
+def _extract_mrz_from_image(src: Source) -> tuple[Optional[MrzTd3], str, list[str], str]:
+    """
+    Mode passeport: OCR limité au bandeau MRZ (bas de page), image réduite en niveaux de gris,
+    whitelist MRZ. Bien plus rapide qu'un OCR pleine page, et les chiffres de contrôle valident le résultat.
+    """
+    try:
+        img = preprocess_image(_as_stream(src), MRZ_PRESET)
+    except Exception as e:
+        return None, "", [f"Image invalide: {e}"], "none"
+
+    try:
+        import pytesseract  # type: ignore
+
+        best: Optional[MrzTd3] = None
+        best_txt = ""
+        for frac in MRZ_STRIPS:
+            crop = img.crop((0, int(img.height * (1 - frac)), img.width, img.height))
+            txt = (pytesseract.image_to_string(crop, config=_MRZ_TESSERACT_CONFIG) or "").strip()
+            mrz = find_td3(txt)
+            if mrz is not None and (best is None or sum(mrz.checks.values()) > sum(best.checks.values())):
+                best, best_txt = mrz, txt
+            if best is not None and best.valid:
+                break
+        return best, best_txt, [], "tesseract_mrz"
+    except Exception as e:
+        return None, "", ["OCR image non disponible sur le serveur (tesseract manquant).", f"Détail: {e}"], "tesseract_unavailable"
+
+
+# Confiance d'un champ issu de la MRZ (chiffres de contrôle valides / invalides).
+MRZ_CONFIDENCE = 0.99
+MRZ_INVALID_CONFIDENCE = 0.5
+
+
+def _apply_mrz(mrz: Optional[MrzTd3], extracted: dict[str, Any]) -> None:
+    """
+    Une MRZ dont les chiffres de contrôle sont valides fait foi sur les heuristiques regex.
+    """
+    if mrz is None:
+        return
+    fields = mrz.to_extracted()
+    if mrz.valid:
+        extracted.update(fields)
+    else:
+        for k, v in fields.items():
+            extracted.setdefault(k, v)
+
+
+def _pipeline_kind(mt: str, head: bytes) -> str:
+    if "pdf" in mt:
+        return "pdf"
+    if any(x in mt for x in ["png", "jpeg", "jpg", "image"]):
+        return "image"
+    # heuristic: try pdf if starts with %PDF
+    if head[:4] == b"%PDF":
+        return "pdf"
+    return "unsupported"
+
+
 def extract_from_base64(
     *,
     content_base64: str,
     mime_type: str,
+    fields: Optional[Iterable[str]] = None,
+    mode: str = "auto",
+    cache: Optional[OcrDiskCache] = None,
 ) -> OcrExtractResult:
+    """
+    Les résultats sont mis en cache disque par SHA-256(octets) + OCR_ENGINE_VERSION:
+    un même document re-téléversé ne repasse pas par pypdf/tesseract (cache_hit=True).
+
+    `fields`: champs attendus (ex: {"ending_balance_usd"}); la lecture d'un PDF s'arrête dès
+    qu'ils sont tous trouvés. Par défaut: toutes les pages (dans la limite du budget).
+
+    `mode="passport"`: sur image, OCR du seul bandeau MRZ (repli pleine page si MRZ introuvable).
+    """
     start = time.time()
-    warnings: list[str] = []
-    mt = _norm(mime_type).lower()
-    if not mt:
-        warnings.append("mime_type manquant; tentative auto.")
     try:
         data = base64.b64decode(content_base64.encode("utf-8"), validate=False)
     except Exception:
         return OcrExtractResult(ok=False, text="", extracted={}, warnings=["Base64 invalide."], engine="none", took_ms=int((time.time() - start) * 1000))
+    return _extract(data, head=data[:8], sha256=hashlib.sha256(data).hexdigest(), mime_type=mime_type, fields=fields, mode=mode, cache=cache, start=start)
+
+
+def extract_from_file(
+    *,
+    path: str,
+    mime_type: str,
+    sha256: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    mode: str = "auto",
+    cache: Optional[OcrDiskCache] = None,
+) -> OcrExtractResult:
+    """
+    Variante fichier (upload binaire spoolé): le fichier est passé tel quel à PdfReader/PIL,
+    sans copie intégrale en mémoire. `sha256` peut être fourni s'il a été calculé pendant l'upload.
+    """
+    start = time.time()
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        return OcrExtractResult(ok=False, text="", extracted={}, warnings=[f"Fichier illisible: {e}"], engine="none", took_ms=int((time.time() - start) * 1000))
+    with f:
+        if not sha256:
+            h = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+            sha256 = h.hexdigest()
+        f.seek(0)
+        head = f.read(8)
+        return _extract(f, head=head, sha256=sha256, mime_type=mime_type, fields=fields, mode=mode, cache=cache, start=start)
+
+
+def _extract(
+    src: Source,
+    *,
+    head: bytes,
+    sha256: str,
+    mime_type: str,
+    fields: Optional[Iterable[str]],
+    mode: str,
+    cache: Optional[OcrDiskCache],
+    start: float,
+) -> OcrExtractResult:
+    warnings: list[str] = []
+    passport = _norm(mode).lower() == "passport"
+    mt = _norm(mime_type).lower()
+    if not mt:
+        warnings.append("mime_type manquant; tentative auto.")
+
+    kind = _pipeline_kind(mt, head)
+    targets = frozenset(str(x) for x in fields if str(x) in TARGET_FIELDS) if fields else None
+    variant = kind
+    if kind == "pdf":
+        # Budget de pages et champs ciblés changent le texte lu -> font partie de la clé.
+        variant = f"pdf:{_pdf_page_budget()}:{','.join(sorted(targets or ()))}"
+    elif kind == "image":
+        variant = "image:passport" if passport else f"image:{default_preset()}"
+    disk = cache if cache is not None else default_cache()
+    key = cache_key(sha256, kind=variant, engine_version=OCR_ENGINE_VERSION) if kind != "unsupported" else ""
+    cached = disk.get(key) if key else None
+    if cached is not None:
+        return OcrExtractResult(
+            ok=True,
+            text=str(cached.get("text") or ""),
+            extracted=dict(cached.get("extracted") or {}),
+            warnings=warnings + [str(w) for w in (cached.get("warnings") or [])],
+            engine=str(cached.get("engine") or "none"),
+            took_ms=int((time.time() - start) * 1000),
+            cache_hit=True,
+        )
 
     text = ""
     engine = "none"
-    if "pdf" in mt:
-        text, w, engine = _extract_text_from_pdf(data)
-        warnings.extend(w)
-    elif any(x in mt for x in ["png", "jpeg", "jpg", "image"]):
-        text, w, engine = _extract_text_from_image(data)
-        warnings.extend(w)
+    pipeline_warnings: list[str] = []
+    mrz: Optional[MrzTd3] = None
+    if kind == "pdf":
+        text, pipeline_warnings, engine = _extract_text_from_pdf(src, targets=targets)
+    elif kind == "image" and passport:
+        mrz, text, pipeline_warnings, engine = _extract_mrz_from_image(src)
+        if mrz is None and engine == "tesseract_mrz":
+            text, w, engine = _extract_text_from_image(src)
+            pipeline_warnings = ["Passeport: MRZ non détectée, OCR pleine page."] + w
+    elif kind == "image":
+        text, pipeline_warnings, engine = _extract_text_from_image(src)
     else:
-        # heuristic: try pdf if starts with %PDF
-        if data[:4] == b"%PDF":
-            text, w, engine = _extract_text_from_pdf(data)
-            warnings.extend(w)
-        else:
-            warnings.append(f"Type non supporté pour OCR: {mime_type}")
-
-    extracted = _extract_fields_from_text(text) if text else {}
+        pipeline_warnings = [f"Type non supporté pour OCR: {mime_type}"]
+    if text and mrz is None:
+        # MRZ présente dans le texte (PDF, OCR pleine page): retenue si valide, ou en mode passeport.
+        found = find_td3(text)
+        if found is not None and (found.valid or passport):
+            mrz = found
+    if mrz is not None and not mrz.valid:
+        pipeline_warnings.append("Passeport: chiffres de contrôle MRZ invalides (relecture conseillée).")
+    warnings.extend(pipeline_warnings)
+
+    matches = extract_field_matches(text) if text else {}
+    extracted: dict[str, Any] = {k: m.value for k, m in matches.items()}
+    positions = {k: m.to_dict() for k, m in matches.items()}
+    _apply_mrz(mrz, extracted)
+    if mrz is not None:
+        conf = MRZ_CONFIDENCE if mrz.valid else MRZ_INVALID_CONFIDENCE
+        for k, v in mrz.to_extracted().items():
+            if k != "mrz_valid" and extracted.get(k) == v and (mrz.valid or k not in positions):
+                positions[k] = {"confidence": conf, "source": "mrz"}
 
     # always stamp meta
     extracted["_ocr"] = {
         "engine": engine,
         "extracted_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
         "warnings": warnings[:6],
+        "fields": positions,
     }
 
+    # Pas de cache si tesseract manque: l'installer sur le serveur doit suffire à corriger.
+    if key and engine != "tesseract_unavailable":
+        disk.put(key, {"text": text, "extracted": extracted, "warnings": pipeline_warnings, "engine": engine})
+
     return OcrExtractResult(
         ok=True,
         text=text,
@@ -241,19 +417,15 @@ def extract_from_base64(
     )
 
 
-# --- helpers to allow PdfReader from bytes without writing files ---
-class io_bytes:  # noqa: N801 - small adapter
-    def __init__(self, data: bytes):
-        from io import BytesIO
-
-        self._bio = BytesIO(data)
-
-    def read(self, n: int = -1) -> bytes:
-        return self._bio.read(n)
-
-    def seek(self, pos: int, whence: int = 0) -> int:
-        return self._bio.seek(pos, whence)
+def ocr_result_to_dict(res: OcrExtractResult) -> dict[str, Any]:
+    return {
+        "ok": bool(res.ok),
+        "engine": res.engine,
+        "took_ms": int(res.took_ms),
+        "cache_hit": bool(res.cache_hit),
+        "warnings": list(res.warnings),
+        "text": res.text,
+        "extracted": dict(res.extracted),
+    }
 
-    def tell(self) -> int:
-        return self._bio.tell()
 
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+from typing import Any, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def default_cache_dir() -> str:
+    return os.getenv("GLOBALVISA_OCR_CACHE_DIR", "") or os.path.join(tempfile.gettempdir(), "globalvisa_ocr_cache")
+
+
+def cache_key(content_sha256: str, *, kind: str, engine_version: str) -> str:
+    """
+    Clé = SHA-256(version moteur + type de pipeline + SHA-256 des octets décodés).
+    Le hash du contenu peut être calculé en streaming (upload). Changer OCR_ENGINE_VERSION
+    invalide tout le cache.
+    """
+
+    return hashlib.sha256(f"{engine_version}\0{kind}\0{content_sha256}".encode("utf-8")).hexdigest()
+
+
+class OcrDiskCache:
+    """
+    Cache disque des résultats OCR (JSON), borné en octets, éviction LRU (mtime = dernier accès).
+
+    - Écritures atomiques (fichier temporaire + os.replace): un lecteur ne voit jamais un fichier partiel.
+    - Plusieurs workers uvicorn/processus OCR peuvent partager le répertoire: une entrée
+      supprimée par un autre processus est simplement un miss.
+    - Contenu sensible (passeports, relevés): répertoire racine et shards en 0700, fichiers en 0600
+      (mkstemp). Une racine qui n'appartient pas à l'utilisateur courant (ou un lien symbolique, cas du
+      répertoire temporaire partagé) désactive le cache plutôt que d'y lire ou écrire.
+    """
+
+    def __init__(self, directory: str, *, max_bytes: int = 256 * 1024 * 1024, enabled: bool = True) -> None:
+        self.directory = str(directory)
+        self.max_bytes = max(1, int(max_bytes))
+        self.enabled = bool(enabled) and bool(self.directory)
+        self._approx_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._root_ok = False
+
+    @classmethod
+    def from_env(cls) -> "OcrDiskCache":
+        return cls(
+            default_cache_dir(),
+            max_bytes=_env_int("GLOBALVISA_OCR_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+            enabled=os.getenv("GLOBALVISA_OCR_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"},
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _ensure_root(self) -> bool:
+        """
+        Crée la racine en 0700 (os.makedirs n'applique pas `mode` aux répertoires intermédiaires) et vérifie
+        qu'elle est privée; sinon le cache est désactivé pour ce processus.
+        """
+
+        if self._root_ok:
+            return True
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            st = os.lstat(self.directory)
+            if not stat.S_ISDIR(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+                self.enabled = False
+                return False
+            if st.st_mode & 0o077:
+                os.chmod(self.directory, 0o700)
+        except OSError:
+            return False
+        self._root_ok = True
+        return True
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        if not self.enabled or not self._ensure_root():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return payload if isinstance(payload, dict) else None
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        if not self.enabled or not self._ensure_root():
+            return
+        path = self._path(key)
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(body) > self.max_bytes:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+        except OSError:
+            return
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(body)
+            over = self._approx_bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        out: list[tuple[float, int, str]] = []
+        try:
+            shards = list(os.scandir(self.directory))
+        except OSError:
+            return out
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            try:
+                files = list(os.scandir(shard.path))
+            except OSError:
+                continue
+            for e in files:
+                if not e.name.endswith(".json") or e.name.startswith(".tmp-"):
+                    continue
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, e.path))
+        return out
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Supprime les entrées les moins récemment utilisées jusqu'à ~90% de max_bytes.
+        Retourne le nombre de fichiers supprimés.
+        """
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._approx_bytes = total
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entries() if self.enabled else []
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_DEFAULT: Optional[OcrDiskCache] = None
+
+
+def default_cache() -> OcrDiskCache:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = OcrDiskCache.from_env()
+    return _DEFAULT
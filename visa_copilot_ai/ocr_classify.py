@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Optional
+
+from .documents import DocumentType
+
+# Mots-clés (minuscules) par type: nom de fichier (poids fort) et texte OCR.
+_KEYWORDS: dict[DocumentType, tuple[str, ...]] = {
+    DocumentType.PASSPORT: ("passport", "passeport", "pasaporte", "p<"),
+    DocumentType.BANK_STATEMENT: ("bank statement", "relevé de compte", "releve de compte", "relevé bancaire", "statement", "releve", "relevé", "closing balance", "solde final", "account holder", "titulaire du compte", "iban"),
+    DocumentType.PAYSLIPS: ("payslip", "pay slip", "salary slip", "fiche de paie", "bulletin de salaire", "bulletin de paie", "net pay", "salaire net"),
+    DocumentType.EMPLOYMENT_LETTER: ("employment letter", "certificate of employment", "attestation de travail", "attestation d'emploi", "attestation employeur"),
+    DocumentType.BUSINESS_REGISTRATION: ("business registration", "registre de commerce", "rccm", "kbis", "certificate of incorporation"),
+    DocumentType.STUDENT_CERTIFICATE: ("student certificate", "certificat de scolarité", "attestation de scolarité", "certificate of enrolment"),
+    DocumentType.ENROLLMENT_LETTER: ("letter of acceptance", "acceptance letter", "admission", "enrollment letter", "lettre d'admission", "offer of admission"),
+    DocumentType.INVITATION_LETTER: ("invitation", "lettre d'invitation", "letter of invitation"),
+    DocumentType.TRAVEL_INSURANCE: ("insurance", "assurance", "coverage", "couverture", "policy number", "numéro de police"),
+    DocumentType.ACCOMMODATION_PLAN: ("hotel", "hôtel", "booking", "réservation", "hébergement", "accommodation", "airbnb", "check-in"),
+    DocumentType.ITINERARY: ("itinerary", "itinéraire", "e-ticket", "boarding pass", "flight", "billet d'avion"),
+    DocumentType.CIVIL_STATUS: ("birth certificate", "acte de naissance", "marriage certificate", "acte de mariage", "livret de famille", "état civil"),
+    DocumentType.SPONSOR_LETTER: ("sponsor", "prise en charge", "affidavit of support"),
+    DocumentType.REFUSAL_LETTER: ("refusal", "refus de visa", "visa refused", "refused", "décision de refus"),
+}
+
+# Champs extraits qui signent un type de document.
+_FIELD_EVIDENCE: dict[str, DocumentType] = {
+    "mrz_valid": DocumentType.PASSPORT,
+    "ending_balance_usd": DocumentType.BANK_STATEMENT,
+    "account_holder_name": DocumentType.BANK_STATEMENT,
+    "coverage_amount": DocumentType.TRAVEL_INSURANCE,
+}
+
+_W_FILENAME = 3.0
+_W_TEXT = 1.0
+_W_FIELD = 3.0
+_TEXT_SCAN_CHARS = 20000
+_IMAGE_EXT = {".jpg", ".jpeg", ".png", ".heic", ".webp"}
+
+
+def guess_document_type(
+    *,
+    filename: str = "",
+    text: str = "",
+    extracted: Optional[dict[str, Any]] = None,
+) -> tuple[DocumentType, float]:
+    """
+    Devine le DocumentType (heuristique) à partir du nom de fichier, du texte OCR et des champs extraits.
+    Retourne (type, confiance 0..1); OTHER si aucun indice.
+    """
+
+    fn = os.path.basename(filename or "").lower().replace("_", " ").replace("-", " ")
+    tl = (text or "")[:_TEXT_SCAN_CHARS].lower()
+    ex = extracted or {}
+
+    scores: dict[DocumentType, float] = {}
+    for dtype, words in _KEYWORDS.items():
+        s = 0.0
+        if fn and any(w in fn for w in words):
+            s += _W_FILENAME
+        if tl:
+            s += _W_TEXT * sum(1 for w in words if w in tl)
+        if s:
+            scores[dtype] = s
+    for key, dtype in _FIELD_EVIDENCE.items():
+        if ex.get(key) not in (None, "", False):
+            scores[dtype] = scores.get(dtype, 0.0) + _W_FIELD
+
+    if not scores:
+        # Image sans texte nommée "photo": photo d'identité.
+        ext = os.path.splitext(fn)[1]
+        if ext in _IMAGE_EXT and "photo" in fn and not tl.strip():
+            return DocumentType.PHOTO, 0.6
+        return DocumentType.OTHER, 0.0
+
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    best, best_score = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    confidence = min(0.95, best_score / (best_score + second + 2.0))
+    return best, round(confidence, 2)
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+
+def _norm(s: Any) -> str:
+    return " ".join(str(s or "").strip().split())
+
+
+def _to_iso_date(s: str) -> Optional[str]:
+    t = _norm(s)
+    if not t:
+        return None
+    # YYYY-MM-DD
+    m = re.search(r"\b(\d{4})-(\d{2})-(\d{2})\b", t)
+    if m:
+        return f"{m.group(1)}-{m.group(2)}-{m.group(3)}"
+    # DD/MM/YYYY or DD.MM.YYYY
+    m = re.search(r"\b(\d{1,2})[\/\.](\d{1,2})[\/\.](\d{4})\b", t)
+    if m:
+        dd = int(m.group(1))
+        mm = int(m.group(2))
+        yy = int(m.group(3))
+        if 1 <= mm <= 12 and 1 <= dd <= 31:
+            return f"{yy:04d}-{mm:02d}-{dd:02d}"
+    return None
+
+
+def _parse_float(s: str) -> Optional[float]:
+    raw0 = _norm(s).replace(" ", "")
+    # Handle 1,234.56 vs 1.234,56
+    if "," in raw0 and "." in raw0:
+        # decide decimal separator by last occurrence
+        if raw0.rfind(".") > raw0.rfind(","):
+            # 1,234.56 -> remove commas
+            raw = raw0.replace(",", "")
+        else:
+            # 1.234,56 -> remove dots, comma -> dot
+            raw = raw0.replace(".", "").replace(",", ".")
+    elif "," in raw0:
+        # treat comma as decimal separator
+        raw = raw0.replace(",", ".")
+    else:
+        raw = raw0
+
+    m = re.search(r"(-?\d+(?:\.\d+)?)", raw)
+    if not m:
+        return None
+    try:
+        return float(m.group(1))
+    except Exception:
+        return None
+
+
+@dataclass(frozen=True)
+class FieldMatch:
+    """
+    Valeur extraite + position (offsets dans le texte) + confiance heuristique (0..1).
+    """
+
+    name: str
+    value: Any
+    start: int
+    end: int
+    confidence: float
+    source: str  # "label" | "date_context" | "fallback"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"start": self.start, "end": self.end, "confidence": self.confidence, "source": self.source}
+
+
+# Confiance par type d'indice.
+CONF_LABEL = 0.9
+CONF_DATE_CONTEXT = 0.8
+CONF_PASSPORT_FALLBACK = 0.4
+CONF_DATE_FALLBACK = 0.3
+
+_EXPIRY_KEYWORDS = ("expire", "expiry", "exp.", "date of expiry", "date d'expiration", "valid until", "valide jusqu")
+_ISSUE_KEYWORDS = ("issue", "issued", "date of issue", "date d'emission", "date d'émission", "délivr", "deliver")
+_DATE_CONTEXT = 25
+
+# Une seule alternance nommée: un seul balayage du texte pour tous les champs.
+# Chaque alternative commence par un libellé / une classe de caractères distincte, donc deux
+# alternatives ne peuvent pas démarrer à la même position (aucune n'en masque une autre).
+_ALTERNATIVES: dict[str, str] = {
+    "passport_label": r"(?:passport\s*(?:no|number|n°)|num[eé]ro\s+de\s+passeport)\s*[:\-]?\s*(?P<passport_label_value>[A-Z0-9]{6,12})",
+    "passport_token": r"\b[A-Z]{1,2}\d{5,10}\b",
+    "date": r"\b\d{4}-\d{2}-\d{2}\b|\b\d{1,2}[\/\.]\d{1,2}[\/\.]\d{4}\b",
+    "full_name": r"(?:full\s+name|nom\s+complet)\s*[:\-]?\s*(?P<full_name_value>[A-Z][A-Z \-']{3,})",
+    "ending_balance_usd": r"(?:ending\s+balance|solde\s+final|closing\s+balance)\s*[:\-]?\s*(?P<ending_balance_usd_value>[0-9][0-9\s,\.]+)",
+    "account_holder_name": r"(?:account\s+holder|titulaire\s+du\s+compte)\s*[:\-]?\s*(?P<account_holder_name_value>[A-Z][A-Z \-']{3,})",
+    "coverage_amount": r"(?:coverage|couverture)\s*[:\-]?\s*(?:EUR|USD|\€|\$)?\s*(?P<coverage_amount_value>[0-9][0-9\s,\.]+)",
+}
+
+
+# Préfiltre: une alternative à libellé ne peut matcher que si l'un de ces mots figure dans le texte
+# (test `in` sur le texte en minuscules, bien plus rapide qu'une alternance regex).
+_REQUIRED_WORDS: dict[str, tuple[str, ...]] = {
+    "passport_label": ("passport", "passeport"),
+    "full_name": ("name", "complet"),
+    "ending_balance_usd": ("balance", "solde"),
+    "account_holder_name": ("holder", "titulaire"),
+    "coverage_amount": ("coverage", "couverture"),
+}
+
+
+@lru_cache(maxsize=None)
+def _combined(kinds: frozenset[str]) -> "re.Pattern[str]":
+    """
+    Motif combiné limité aux alternatives encore utiles: un champ trouvé sort du motif,
+    le reste du texte n'est plus testé pour lui.
+    """
+
+    return re.compile("|".join(f"(?P<{k}>{p})" for k, p in _ALTERNATIVES.items() if k in kinds), flags=re.IGNORECASE)
+
+
+_LABELLED: dict[str, Callable[[str], Any]] = {
+    "full_name": _norm,
+    "ending_balance_usd": _parse_float,
+    "account_holder_name": _norm,
+    "coverage_amount": _parse_float,
+}
+
+# Ordre des clés en sortie (identique à l'extracteur historique).
+_OUTPUT_ORDER = ("passport_number", "full_name", "ending_balance_usd", "account_holder_name", "coverage_amount")
+
+
+def extract_field_matches(text: str) -> dict[str, FieldMatch]:
+    """
+    Extraction en un seul passage: chaque champ garde sa première occurrence (la plus à gauche).
+
+    Règles:
+    - passport_number: libellé ("Passport No", "Numéro de passeport") prioritaire, sinon premier
+      jeton du type AB1234567.
+    - expires_date / issued_date: première date dont le contexte (+/- 25 caractères) contient un
+      mot-clé; à défaut de tout mot-clé, la première date devient issued_date.
+    """
+
+    t = text or ""
+    found: dict[str, FieldMatch] = {}
+    passport_token: Optional[FieldMatch] = None
+    dates: dict[str, FieldMatch] = {}
+    first_date: Optional[FieldMatch] = None
+    tl = t.lower()
+    kinds = {k for k in _ALTERNATIVES if any(w in tl for w in _REQUIRED_WORDS.get(k, ("",)))}
+    # Sans mot-clé nulle part, aucune date ne peut être qualifiée d'expiration / d'émission.
+    pending_dates = {
+        k for k, words in (("expires_date", _EXPIRY_KEYWORDS), ("issued_date", _ISSUE_KEYWORDS)) if any(w in tl for w in words)
+    }
+
+    pos = 0
+    n = len(t)
+    while kinds and pos < n:
+        m = _combined(frozenset(kinds)).search(t, pos)
+        if m is None:
+            break
+        # Reprendre juste après le début (pas après la fin): un libellé englobant (nom en majuscules
+        # suivi d'autre texte) ne doit pas masquer un champ qui commence à l'intérieur.
+        pos = m.start() + 1
+        kind = str(m.lastgroup)
+        if kind == "passport_label":
+            cand = re.sub(r"[^A-Z0-9]", "", m.group("passport_label_value").upper())
+            if 6 <= len(cand) <= 12:
+                found["passport_number"] = FieldMatch("passport_number", cand, m.start("passport_label_value"), m.end("passport_label_value"), CONF_LABEL, "label")
+                kinds -= {"passport_label", "passport_token"}
+        elif kind == "passport_token":
+            passport_token = FieldMatch("passport_number", m.group(kind).upper(), m.start(), m.end(), CONF_PASSPORT_FALLBACK, "fallback")
+            kinds.discard("passport_token")
+        elif kind == "date":
+            iso = _to_iso_date(m.group(kind)) or ""
+            if not iso:
+                continue
+            ctx = tl[max(0, m.start() - _DATE_CONTEXT) : m.end() + _DATE_CONTEXT]
+            if first_date is None:
+                first_date = FieldMatch("issued_date", iso, m.start(), m.end(), CONF_DATE_FALLBACK, "fallback")
+            if "expires_date" in pending_dates and any(k in ctx for k in _EXPIRY_KEYWORDS):
+                dates["expires_date"] = FieldMatch("expires_date", iso, m.start(), m.end(), CONF_DATE_CONTEXT, "date_context")
+                pending_dates.discard("expires_date")
+            if "issued_date" in pending_dates and any(k in ctx for k in _ISSUE_KEYWORDS):
+                dates["issued_date"] = FieldMatch("issued_date", iso, m.start(), m.end(), CONF_DATE_CONTEXT, "date_context")
+                pending_dates.discard("issued_date")
+            if not pending_dates:
+                kinds.discard("date")
+        else:
+            value = _LABELLED[kind](m.group(f"{kind}_value"))
+            kinds.discard(kind)
+            if value is None or value == "":
+                continue
+            found[kind] = FieldMatch(kind, value, m.start(f"{kind}_value"), m.end(f"{kind}_value"), CONF_LABEL, "label")
+
+    if "passport_number" not in found and passport_token is not None:
+        found["passport_number"] = passport_token
+    if not dates and first_date is not None:
+        dates["issued_date"] = first_date
+
+    out: dict[str, FieldMatch] = {}
+    if "passport_number" in found:
+        out["passport_number"] = found["passport_number"]
+    out.update(dates)
+    for k in _OUTPUT_ORDER[1:]:
+        if k in found:
+            out[k] = found[k]
+    return out
+
+
+def extract_fields(text: str) -> dict[str, Any]:
+    return {k: m.value for k, m in extract_field_matches(text).items()}
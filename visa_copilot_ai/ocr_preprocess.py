@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Optional
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    """
+    Préparation d'une image avant tesseract.
+
+    - target_dpi / page_width_in: largeur cible = dpi x largeur physique supposée du document
+      (une photo de téléphone n'a pas de DPI fiable). On ne fait que réduire, jamais agrandir.
+    - binarize: seuil d'Otsu (texte noir sur fond blanc).
+    - deskew: correction d'inclinaison par profil de projection (angles +/- max_skew_deg).
+    """
+
+    name: str
+    target_dpi: int = 300
+    page_width_in: float = 8.27  # A4
+    grayscale: bool = True
+    binarize: bool = False
+    deskew: bool = False
+    max_skew_deg: float = 5.0
+
+    @property
+    def max_width(self) -> int:
+        return max(200, int(self.target_dpi * self.page_width_in))
+
+
+PRESETS: dict[str, PreprocessConfig] = {
+    # Comportement historique: image pleine résolution, couleur.
+    "none": PreprocessConfig(name="none", target_dpi=0, grayscale=False),
+    "fast": PreprocessConfig(name="fast", target_dpi=200, binarize=True),
+    "balanced": PreprocessConfig(name="balanced", target_dpi=300),
+    "accurate": PreprocessConfig(name="accurate", target_dpi=300, binarize=True, deskew=True),
+}
+
+
+# Largeur décodée acceptée en mode draft: >= 85% de la largeur cible.
+DRAFT_TOLERANCE = 0.85
+
+
+def default_preset() -> PreprocessConfig:
+    name = os.getenv("GLOBALVISA_OCR_IMAGE_PRESET", "balanced").strip().lower()
+    return PRESETS.get(name) or PRESETS["balanced"]
+
+
+def open_image(stream: BinaryIO, config: PreprocessConfig) -> Any:
+    """
+    Ouvre l'image en corrigeant l'orientation EXIF. Les JPEG sont décodés en mode "draft"
+    (réduction DCT 1/2, 1/4, 1/8) au plus près de la taille cible: bien moins de pixels à décoder.
+    """
+
+    from PIL import Image, ImageOps
+
+    img = Image.open(stream)
+    if img.format == "JPEG" and (config.grayscale or config.target_dpi > 0):
+        w, h = img.size
+        exif_rotated = img.getexif().get(0x0112, 1) in {5, 6, 7, 8}
+        if exif_rotated:
+            w, h = h, w
+        scale = 1.0
+        if config.target_dpi > 0:
+            # Tolérance: décoder un peu sous la cible évite un redimensionnement complet ensuite.
+            scale = min(1.0, DRAFT_TOLERANCE * config.max_width / float(w))
+        req = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if exif_rotated:
+            req = (req[1], req[0])
+        # Grayscale: le décodeur JPEG sort directement la luminance (pas de conversion YCbCr->RGB->L).
+        img.draft("L" if config.grayscale else "RGB", req)
+    return ImageOps.exif_transpose(img)
+
+
+def otsu_threshold(img: Any) -> int:
+    hist = img.histogram()[:256]
+    total = sum(hist)
+    if total == 0:
+        return 128
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_b = 0.0
+    w_b = 0
+    best_t, best_var = 128, -1.0
+    for t in range(256):
+        w_b += hist[t]
+        if w_b == 0:
+            continue
+        w_f = total - w_b
+        if w_f == 0:
+            break
+        sum_b += t * hist[t]
+        m_b = sum_b / w_b
+        m_f = (sum_all - sum_b) / w_f
+        var = w_b * w_f * (m_b - m_f) ** 2
+        if var > best_var:
+            best_t, best_var = t, var
+    return best_t
+
+
+def _row_profile_score(img: Any) -> float:
+    from PIL import Image
+
+    # Moyenne par ligne via un redimensionnement BOX à 1 colonne (rapide, sans numpy).
+    rows = list(img.resize((1, img.height), Image.BOX).getdata())
+    n = len(rows)
+    mean = sum(rows) / n
+    return sum((r - mean) ** 2 for r in rows) / n
+
+
+def estimate_skew(gray: Any, *, max_deg: float = 5.0, step: float = 0.5) -> float:
+    """
+    Angle (degrés) qui maximise la variance du profil horizontal: lignes de texte alignées
+    => alternance nette lignes sombres / interlignes clairs.
+    """
+
+    from PIL import Image
+
+    thumb = gray.copy()
+    thumb.thumbnail((600, 600))
+    thr = otsu_threshold(thumb)
+    ink = thumb.point(lambda p: 255 if p < thr else 0)  # texte = blanc sur noir pour la rotation
+    best_angle, best_score = 0.0, -1.0
+    n = int(max_deg / step)
+    for i in range(-n, n + 1):
+        angle = i * step
+        score = _row_profile_score(ink.rotate(angle, resample=Image.NEAREST, expand=False, fillcolor=0))
+        if score > best_score:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def preprocess_image(stream: BinaryIO, config: Optional[PreprocessConfig] = None) -> Any:
+    """
+    Image prête pour tesseract selon `config` (défaut: GLOBALVISA_OCR_IMAGE_PRESET).
+    """
+
+    from PIL import Image
+
+    cfg = config or default_preset()
+    img = open_image(stream, cfg)
+    img = img.convert("L" if cfg.grayscale else "RGB")
+    if cfg.target_dpi > 0 and img.width > cfg.max_width:
+        # reducing_gap: réduction entière rapide puis filtre bilinéaire (qualité proche de LANCZOS pour du texte).
+        size = (cfg.max_width, max(1, round(img.height * cfg.max_width / img.width)))
+        img = img.resize(size, Image.BILINEAR, reducing_gap=3.0)
+    if cfg.grayscale and cfg.deskew:
+        angle = estimate_skew(img, max_deg=cfg.max_skew_deg)
+        if angle:
+            img = img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    if cfg.grayscale and cfg.binarize:
+        thr = otsu_threshold(img)
+        img = img.point(lambda p: 255 if p > thr else 0)
+    return img
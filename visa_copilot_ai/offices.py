@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 import os
 from dataclasses import dataclass, field
 from typing import Any, Optional
 
-import importlib.resources as pkg_resources
+from .content_cache import CachedJson, DerivedCache, load_json, resource_path
 
 
 @dataclass(frozen=True)
@@ -48,23 +47,26 @@ def _norm(s: Any) -> str:
     return " ".join(str(s or "").strip().split())
 
 
-def _load_offices() -> dict[str, Any]:
+def _offices_entry() -> CachedJson:
     """
     Source:
     - embedded: visa_copilot_ai/resources/offices.json
     - override: GLOBALVISA_OFFICES_PATH (modifiable sans toucher au code)
+    Servi depuis le cache de contenu (revalidation par mtime/size).
     """
 
     override = os.getenv("GLOBALVISA_OFFICES_PATH", "").strip()
     if override:
         try:
-            with open(override, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return load_json(override)
         except Exception:
             pass
 
-    with pkg_resources.files("visa_copilot_ai").joinpath("resources/offices.json").open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_json(resource_path("offices.json"))
+
+
+def _load_offices() -> dict[str, Any]:
+    return _offices_entry().data
 
 
 def _parse_office(raw: dict[str, Any]) -> Office:
@@ -150,6 +152,82 @@ def _critical_hours(hours: list[OfficeHours]) -> list[str]:
     return out
 
 
+def _sort_key(o: Office) -> tuple[str, str, str]:
+    return (o.country.lower(), o.city.lower(), o.name.lower())
+
+
+class OfficeIndex:
+    """
+    Offices d'une version de contenu, parsés une fois et indexés.
+
+    - `offices` / `dicts`: dans l'ordre de l'API (pays, ville, nom; tri stable), dicts sérialisés une fois
+      (`critical_hours_days` inclus)
+    - index par clé normalisée (minuscules) -> rangs croissants: pays, ville, type, service
+    - une requête filtrée parcourt la plus courte des listes concernées, jamais tout le pack;
+      `q` (sous-chaîne) ne teste que ces candidats
+    """
+
+    def __init__(self, raw_items: list[Any]) -> None:
+        parsed = [_parse_office(raw) for raw in raw_items if isinstance(raw, dict)]
+        parsed.sort(key=_sort_key)
+        self.offices: list[Office] = parsed
+        self.dicts: list[dict[str, Any]] = [office_to_dict(o) for o in parsed]
+        self.by_country: dict[str, list[int]] = {}
+        self.by_city: dict[str, list[int]] = {}
+        self.by_type: dict[str, list[int]] = {}
+        self.by_service: dict[str, list[int]] = {}
+        self._keys: list[tuple[str, str, str, frozenset[str]]] = []
+        self._hay: list[str] = []
+        for rank, o in enumerate(parsed):
+            key = (o.country.lower(), o.city.lower(), o.type, frozenset(o.services))
+            self._keys.append(key)
+            self._hay.append(" ".join([o.name, o.country, o.city, o.address, " ".join(o.services)]).lower())
+            self.by_country.setdefault(key[0], []).append(rank)
+            self.by_city.setdefault(key[1], []).append(rank)
+            self.by_type.setdefault(key[2], []).append(rank)
+            for svc in key[3]:
+                self.by_service.setdefault(svc, []).append(rank)
+
+    def __len__(self) -> int:
+        return len(self.offices)
+
+    def search(self, *, country: str = "", city: str = "", office_type: str = "", service: str = "", q: str = "") -> list[int]:
+        """
+        Rangs des offices correspondants (ordre de l'API). Filtres déjà normalisés (_norm + minuscules).
+        """
+
+        lists = []
+        for value, index in ((country, self.by_country), (city, self.by_city), (office_type, self.by_type), (service, self.by_service)):
+            if value:
+                lists.append(index.get(value, []))
+        ranks = min(lists, key=len) if lists else range(len(self.offices))
+        if not ranks:
+            return []
+        out = []
+        keys, hay = self._keys, self._hay
+        for r in ranks:
+            c, ci, t, svc = keys[r]
+            if (country and c != country) or (city and ci != city) or (office_type and t != office_type):
+                continue
+            if service and service not in svc:
+                continue
+            if q and q not in hay[r]:
+                continue
+            out.append(r)
+        return out
+
+
+_INDEXES = DerivedCache(OfficeIndex)
+
+
+def office_index(items: list[Any]) -> OfficeIndex:
+    """
+    OfficeIndex pour cette liste d'offices bruts, réutilisé tant que c'est le même objet (voir DerivedCache).
+    """
+
+    return _INDEXES.get(items)
+
+
 def list_offices(
     *,
     country: Optional[str] = None,
@@ -161,41 +239,22 @@ def list_offices(
 ) -> list[dict[str, Any]]:
     """
     Retourne une liste filtrée (prête pour l'API/UI).
+    Copies de surface des dicts pré-sérialisés: l'appelant peut y ajouter des clés, pas modifier les sous-objets.
     """
 
     src = data if isinstance(data, dict) else _load_offices()
     items = src.get("offices") if isinstance(src.get("offices"), list) else []
-
-    c = _norm(country).lower()
-    ci = _norm(city).lower()
-    t = _norm(office_type).lower()
-    s = _norm(service).lower()
-    query = _norm(q).lower()
-
-    out: list[Office] = []
-    for raw in items:
-        if not isinstance(raw, dict):
-            continue
-        o = _parse_office(raw)
-
-        if c and _norm(o.country).lower() != c:
-            continue
-        if ci and _norm(o.city).lower() != ci:
-            continue
-        if t and _norm(o.type).lower() != t:
-            continue
-        if s and s not in [x.lower() for x in o.services]:
-            continue
-        if query:
-            hay = " ".join([o.name, o.country, o.city, o.address, " ".join(o.services)]).lower()
-            if query not in hay:
-                continue
-
-        out.append(o)
-
-    out.sort(key=lambda x: (_norm(x.country).lower(), _norm(x.city).lower(), _norm(x.name).lower()))
-
-    return [office_to_dict(x) for x in out]
+    index = office_index(items)
+
+    ranks = index.search(
+        country=_norm(country).lower(),
+        city=_norm(city).lower(),
+        office_type=_norm(office_type).lower(),
+        service=_norm(service).lower(),
+        q=_norm(q).lower(),
+    )
+    dicts = index.dicts
+    return [dict(dicts[r]) for r in ranks]
 
 
 def office_to_dict(o: Office) -> dict[str, Any]: